@@ -864,3 +864,97 @@ RESOLVER_PROXY_CACHE_TIMEOUT = int(get_env("RESOLVER_PROXY_CACHE_TIMEOUT", 3600)
 
 # Advanced validator for ImportStorageSerializer in enterprise
 IMPORT_STORAGE_SERIALIZER_VALIDATE = None
+
+# QOCR document parsing
+QOCR_OUTPUT_DIR = get_env("QOCR_OUTPUT_DIR", "/label-studio/output")
+# Number of long-lived parse worker processes with preloaded models, 0 parses inside the web worker
+QOCR_WORKER_POOL_SIZE = int(get_env("QOCR_WORKER_POOL_SIZE", 0))
+# Seconds a request waits for a pool worker to finish a document before it gives up
+QOCR_WORKER_TASK_TIMEOUT = float(get_env("QOCR_WORKER_TASK_TIMEOUT", 3600))
+# Asynchronous parse jobs, OCR of long documents needs far more than the RQ DEFAULT_TIMEOUT
+QOCR_UPLOAD_DIR = get_env("QOCR_UPLOAD_DIR", os.path.join(QOCR_OUTPUT_DIR, "uploads"))
+QOCR_JOB_QUEUE = get_env("QOCR_JOB_QUEUE", "default")
+QOCR_JOB_TIMEOUT = int(get_env("QOCR_JOB_TIMEOUT", 3600))
+QOCR_JOB_RESULT_TTL = int(get_env("QOCR_JOB_RESULT_TTL", 86400))
+# Jobs of up to QOCR_INTERACTIVE_MAX_PAGES pages go to the `high` queue, others to QOCR_JOB_QUEUE. Parse workers run
+# `rqworker critical high default low --worker-class qocr.service.job_worker.PriorityWorker`, which shares its time
+# between the queues by weight and serves a queue whose oldest job waited this many seconds next
+QOCR_JOB_AGING_SECONDS = int(get_env("QOCR_JOB_AGING_SECONDS", 600))
+# Spread parses over worker nodes started with `manage.py qocr_node`: `redis` through the Redis of the
+# QOCR_COORDINATOR_QUEUE RQ queue, `local` with a node inside the web process, empty parses on this host.
+# Every host mounts QOCR_OUTPUT_DIR, documents and outputs are exchanged through it
+QOCR_COORDINATOR = get_env("QOCR_COORDINATOR", "")
+QOCR_COORDINATOR_QUEUE = get_env("QOCR_COORDINATOR_QUEUE", "default")
+QOCR_COORDINATOR_JOB_TIMEOUT = int(get_env("QOCR_COORDINATOR_JOB_TIMEOUT", 3600))
+QOCR_COORDINATOR_MAX_ATTEMPTS = int(get_env("QOCR_COORDINATOR_MAX_ATTEMPTS", 2))
+# Parses a worker node runs at once, and how often it reports them; silent nodes are reaped after the timeout
+QOCR_NODE_CAPACITY = int(get_env("QOCR_NODE_CAPACITY", 1))
+QOCR_NODE_HEARTBEAT_INTERVAL = int(get_env("QOCR_NODE_HEARTBEAT_INTERVAL", 5))
+QOCR_NODE_HEARTBEAT_TIMEOUT = int(get_env("QOCR_NODE_HEARTBEAT_TIMEOUT", 20))
+# Content-addressed cache of parse results, 0 disables caching; trimmed every QOCR_ARTIFACT_SWEEP_INTERVAL seconds
+QOCR_CACHE_DIR = get_env("QOCR_CACHE_DIR", os.path.join(QOCR_OUTPUT_DIR, "cache"))
+QOCR_CACHE_MAX_BYTES = int(get_env("QOCR_CACHE_MAX_BYTES", 5 * 1024 * 1024 * 1024))
+# Also cache single pages, so a re-uploaded document with pages added or replaced only parses the changed pages;
+# opt-in, as it stores every page next to the document entry in QOCR_CACHE_DIR
+QOCR_PAGE_CACHE = get_bool_env("QOCR_PAGE_CACHE", False)
+# Parse page ranges of large documents in parallel processes, 0 or 1 parses each document in one call
+QOCR_PAGE_PARALLELISM = int(get_env("QOCR_PAGE_PARALLELISM", 0))
+QOCR_PAGES_PER_CHUNK = int(get_env("QOCR_PAGES_PER_CHUNK", 8))
+# Content-addressed store of extracted images, served to markdown in the reference image mode
+QOCR_IMAGE_STORE_DIR = get_env("QOCR_IMAGE_STORE_DIR", os.path.join(QOCR_OUTPUT_DIR, "image_store"))
+QOCR_IMAGE_BASE_URL = get_env("QOCR_IMAGE_BASE_URL", "/api/qocr/images/")
+QOCR_IMAGE_STORE_MAX_BYTES = int(get_env("QOCR_IMAGE_STORE_MAX_BYTES", 0))
+# Download handles of `archive=download` parses point into the artifact store and expire with it
+QOCR_ARCHIVE_BASE_URL = get_env("QOCR_ARCHIVE_BASE_URL", "/api/qocr/archives/")
+# Profiles of superuser parses sent with `profile`, stored in the artifact store like archives; the stacks of
+# the request thread and the threads it starts are sampled each QOCR_PROFILE_SAMPLE_INTERVAL_MS milliseconds
+QOCR_PROFILE_BASE_URL = get_env("QOCR_PROFILE_BASE_URL", "/api/qocr/profiles/")
+QOCR_PROFILE_SAMPLE_INTERVAL_MS = int(get_env("QOCR_PROFILE_SAMPLE_INTERVAL_MS", 5))
+# Per-request parse workspaces, kept until released, QOCR_ARTIFACT_TTL seconds idle or evicted over the size cap
+QOCR_ARTIFACT_DIR = get_env("QOCR_ARTIFACT_DIR", os.path.join(QOCR_OUTPUT_DIR, "artifacts"))
+QOCR_ARTIFACT_MAX_BYTES = int(get_env("QOCR_ARTIFACT_MAX_BYTES", 10 * 1024 * 1024 * 1024))
+QOCR_ARTIFACT_TTL = int(get_env("QOCR_ARTIFACT_TTL", 3600))
+QOCR_ARTIFACT_SWEEP_INTERVAL = int(get_env("QOCR_ARTIFACT_SWEEP_INTERVAL", 300))
+# Office documents are converted to PDF by persistent headless LibreOffice instances run by unoserver (the qocr
+# extra), which needs LibreOffice with its Python UNO bindings on the host (e.g. `libreoffice python3-uno`)
+QOCR_OFFICE_CONVERTERS = int(get_env("QOCR_OFFICE_CONVERTERS", 2))
+QOCR_OFFICE_CONVERT_TIMEOUT = int(get_env("QOCR_OFFICE_CONVERT_TIMEOUT", 120))
+QOCR_OFFICE_PORT_BASE = int(get_env("QOCR_OFFICE_PORT_BASE", 2002))
+QOCR_OFFICE_CACHE_DIR = get_env("QOCR_OFFICE_CACHE_DIR", os.path.join(QOCR_CACHE_DIR, "office"))
+QOCR_OFFICE_CACHE_MAX_BYTES = int(get_env("QOCR_OFFICE_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+# Without unoserver, convert each office document with a cold `soffice --convert-to` instead of rejecting it
+QOCR_OFFICE_SOFFICE_FALLBACK = get_bool_env("QOCR_OFFICE_SOFFICE_FALLBACK", False)
+# Shared OCR engine of /api/qocr/ocr/, requests are micro-batched up to a batch size or a wait in milliseconds
+QOCR_OCR_LANG = get_env("QOCR_OCR_LANG", "korean")
+QOCR_OCR_MAX_BATCH_SIZE = int(get_env("QOCR_OCR_MAX_BATCH_SIZE", 32))
+QOCR_OCR_MAX_WAIT_MS = int(get_env("QOCR_OCR_MAX_WAIT_MS", 10))
+QOCR_OCR_TIMEOUT = int(get_env("QOCR_OCR_TIMEOUT", 120))
+# Images per layout inference pass of /api/qocr/layout/, bounds the memory of large requests
+QOCR_LAYOUT_BATCH_SIZE = int(get_env("QOCR_LAYOUT_BATCH_SIZE", 16))
+# Threads recognizing table images of /api/qocr/table/ concurrently, each keeps its own table model
+QOCR_TABLE_WORKERS = int(get_env("QOCR_TABLE_WORKERS", 4))
+# Parses running at once per host, further requests wait in a bounded queue per web process shared fairly between
+# users and are answered with 429 once it is full, 0 disables admission control
+QOCR_ADMISSION_MAX_CONCURRENT = int(get_env("QOCR_ADMISSION_MAX_CONCURRENT", 2))
+QOCR_ADMISSION_MAX_QUEUE = int(get_env("QOCR_ADMISSION_MAX_QUEUE", 8))
+QOCR_ADMISSION_QUEUE_TIMEOUT = int(get_env("QOCR_ADMISSION_QUEUE_TIMEOUT", 60))
+# Lock files of the slots shared by the web processes of a host, empty limits each process on its own
+QOCR_ADMISSION_DIR = get_env("QOCR_ADMISSION_DIR", os.path.join(QOCR_OUTPUT_DIR, "admission"))
+# Slots only interactive (critical/high priority) parses may take, and seconds after which a waiting parse of any
+# priority is served first; parses of up to QOCR_INTERACTIVE_MAX_PAGES pages count as interactive
+QOCR_ADMISSION_RESERVED_SLOTS = int(get_env("QOCR_ADMISSION_RESERVED_SLOTS", 1))
+QOCR_ADMISSION_AGING_SECONDS = int(get_env("QOCR_ADMISSION_AGING_SECONDS", 30))
+QOCR_INTERACTIVE_MAX_PAGES = int(get_env("QOCR_INTERACTIVE_MAX_PAGES", 2))
+# Seconds a parse may take before it stops at the next page range and answers with the pages parsed so far,
+# requests may ask for less with `deadline`, 0 leaves parses unbounded
+QOCR_PARSE_DEADLINE = int(get_env("QOCR_PARSE_DEADLINE", 0))
+# Stop parses whose client closed the connection, checked every QOCR_DISCONNECT_CHECK_INTERVAL seconds; parses
+# of more than QOCR_PAGES_PER_CHUNK pages then run as one mineru call per range to have a boundary to stop at
+QOCR_CANCEL_ON_DISCONNECT = get_bool_env("QOCR_CANCEL_ON_DISCONNECT", False)
+QOCR_DISCONNECT_CHECK_INTERVAL = float(get_env("QOCR_DISCONNECT_CHECK_INTERVAL", 1.0))
+# Directory where every process on the host writes its QOCR metrics, so /metrics adds up all web and RQ workers;
+# empty reports the metrics of the process answering the scrape. Use a local directory and clear it at start-up
+QOCR_METRICS_DIR = get_env("QOCR_METRICS_DIR", "")
+QOCR_METRICS_FLUSH_INTERVAL = float(get_env("QOCR_METRICS_FLUSH_INTERVAL", 5.0))
+# Seconds between checks of ml_models_versions for new model versions, resolved invoke_configs are reused meanwhile
+QOCR_MODEL_REGISTRY_CHECK_INTERVAL = int(get_env("QOCR_MODEL_REGISTRY_CHECK_INTERVAL", 5))
@@ -30,6 +30,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from drf_yasg.utils import swagger_auto_schema
 from io_storages.localfiles.models import LocalFilesImportStorage
+from qocr.metrics import REGISTRY
 from ranged_fileresponse import RangedFileResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -92,8 +93,8 @@ def health(request):
 
 
 def metrics(request):
-    """Empty page for metrics evaluation"""
-    return HttpResponse("")
+    """QOCR metrics in the Prometheus text format, of all processes on the host with QOCR_METRICS_DIR"""
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 class TriggerAPIError(APIView):
@@ -0,0 +1 @@
+"""Synthetic-document benchmarks of the QOCR parse pipeline, see `qocr.benchmarks.run`"""
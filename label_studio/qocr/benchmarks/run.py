@@ -0,0 +1,290 @@
+"""Benchmark `ParseService.process_document` and `ParseDocumentView` on synthetic documents.
+
+Run from the `label_studio` directory, e.g.
+
+    python -m qocr.benchmarks.run --concurrency 1,4,8 --requests 16 --output qocr-benchmark.json
+
+Every scenario (driver x workload x concurrency) runs in a fresh process, so its peak RSS is its own.
+With the default `stub` backend no model weights are needed and the numbers are the overhead of the
+service itself; `--model-ms-per-page` adds simulated inference time, `--backend mineru` runs the models.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+DRIVERS = ("service", "view")
+
+
+@dataclass(frozen=True)
+class Workload:
+    name: str
+    pages: int
+    images_per_page: int = 0
+    tables_per_page: int = 0
+
+
+WORKLOADS = {
+    workload.name: workload
+    for workload in (
+        Workload("text", pages=10),
+        Workload("images", pages=10, images_per_page=3),
+        Workload("tables", pages=10, tables_per_page=3),
+        Workload("mixed_long", pages=100, images_per_page=1, tables_per_page=1),
+    )
+}
+
+
+def _peak_rss() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """Linearly interpolated percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _setup_django(work_dir: str, backend: str, cache: bool) -> None:
+    """Point every QOCR directory at `work_dir` and keep parsing in this process, where the stub is installed"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.label_studio")
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.QOCR_OUTPUT_DIR = work_dir
+    settings.QOCR_CACHE_DIR = os.path.join(work_dir, "cache")
+    settings.QOCR_IMAGE_STORE_DIR = os.path.join(work_dir, "image_store")
+    settings.QOCR_ARTIFACT_DIR = os.path.join(work_dir, "artifacts")
+    settings.QOCR_CACHE_MAX_BYTES = settings.QOCR_CACHE_MAX_BYTES if cache else 0
+    settings.QOCR_WORKER_POOL_SIZE = 0
+    settings.QOCR_OFFICE_CONVERTERS = 0
+    if backend != "mineru":
+        settings.QOCR_PAGE_PARALLELISM = 0
+
+
+class _BenchmarkUser:
+    """Request user for the view driver, authenticated without a database"""
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+    pk = id = None
+
+
+def _service_call(pdf_bytes: bytes, image_mode: str):
+    from ..functions import resolve_invoke_config
+    from ..metrics import stage_timer
+    from ..service.parse_service import ParseService
+    from ..views import DEFAULT_INVOKE_CONFIG
+
+    service = ParseService.from_settings()
+    invoke_config = resolve_invoke_config(DEFAULT_INVOKE_CONFIG)
+
+    def call() -> tuple[dict[str, float], int]:
+        with stage_timer(observe=False) as timer:
+            output = service.process_document(
+                pdf_path="benchmark.pdf",
+                max_pages=0,
+                invoke_config=invoke_config,
+                pdf_bytes=pdf_bytes,
+                image_mode=image_mode,
+            )
+        service.artifact_store.release(output.workspace)
+        return timer.stages, len(output.markdown)
+
+    return call
+
+
+def _view_call(pdf_bytes: bytes, image_mode: str):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from ..views import ParseDocumentView
+
+    view = ParseDocumentView.as_view()
+    factory = APIRequestFactory()
+
+    def call() -> tuple[dict[str, float], int]:
+        upload = SimpleUploadedFile("benchmark.pdf", pdf_bytes, content_type="application/pdf")
+        request = factory.post(
+            "/api/qocr/parse-document/", {"file": upload, "image_mode": image_mode}, format="multipart"
+        )
+        force_authenticate(request, user=_BenchmarkUser())
+        response = view(request)
+        response.render()
+        if response.status_code != 200:
+            raise RuntimeError(f"ParseDocumentView answered {response.status_code}: {response.content[:200]!r}")
+        stages = {}
+        for entry in filter(None, response.get("Server-Timing", "").split(", ")):
+            stage, _, duration = entry.partition(";dur=")
+            stages[stage] = float(duration) / 1000
+        return stages, len(response.content)
+
+    return call
+
+
+def run_scenario(scenario: dict) -> dict:
+    """Run one scenario, executed in a fresh process"""
+    from .stub_parse import load_parse_backend, use_parse_backend
+    from .synthetic_pdf import synthetic_pdf
+
+    workload = Workload(**scenario["workload"])
+    pdf_bytes = synthetic_pdf(
+        workload.pages, workload.images_per_page, workload.tables_per_page, seed=scenario["seed"]
+    )
+    with tempfile.TemporaryDirectory(prefix="qocr-benchmark-") as work_dir:
+        _setup_django(work_dir, scenario["backend"], scenario["cache"])
+        make_call = _view_call if scenario["driver"] == "view" else _service_call
+        call = make_call(pdf_bytes, scenario["image_mode"])
+
+        with use_parse_backend(load_parse_backend(scenario["backend"], scenario["model_ms_per_page"])):
+            # The first call pays imports and lazy setup, it is not measured
+            call()
+            baseline_rss = _peak_rss()
+
+            def timed_call() -> tuple[float, dict[str, float], int]:
+                started = time.perf_counter()
+                stages, response_bytes = call()
+                return time.perf_counter() - started, stages, response_bytes
+
+            latencies = []
+            stage_totals: dict[str, float] = {}
+            response_bytes = 0
+            errors = []
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=scenario["concurrency"]) as executor:
+                futures = [executor.submit(timed_call) for _ in range(scenario["requests"])]
+                for future in futures:
+                    try:
+                        latency, stages, size = future.result()
+                    except Exception as e:
+                        errors.append(f"{type(e).__name__}: {e}")
+                        continue
+                    latencies.append(latency)
+                    response_bytes += size
+                    for stage, seconds in stages.items():
+                        stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+            wall_seconds = time.perf_counter() - started
+
+    latencies.sort()
+    completed = len(latencies)
+    return {
+        "driver": scenario["driver"],
+        "workload": asdict(workload),
+        "concurrency": scenario["concurrency"],
+        "requests": scenario["requests"],
+        "completed": completed,
+        "error_count": len(errors),
+        "errors": errors[:5],
+        "document_bytes": len(pdf_bytes),
+        "wall_seconds": round(wall_seconds, 4),
+        "pages_per_second": round(completed * workload.pages / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_seconds": {
+            "p50": round(_percentile(latencies, 50), 4),
+            "p95": round(_percentile(latencies, 95), 4),
+            "p99": round(_percentile(latencies, 99), 4),
+            "mean": round(sum(latencies) / completed, 4) if completed else 0.0,
+            "max": round(latencies[-1], 4) if latencies else 0.0,
+        },
+        "stage_seconds_mean": {
+            stage: round(seconds / completed, 4) for stage, seconds in sorted(stage_totals.items())
+        },
+        "response_bytes_mean": response_bytes // completed if completed else 0,
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": _peak_rss(),
+    }
+
+
+def _csv(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", type=_csv, default=list(DRIVERS), help=f"Comma separated, of {DRIVERS}")
+    parser.add_argument(
+        "--workloads", type=_csv, default=list(WORKLOADS), help=f"Comma separated, of {tuple(WORKLOADS)}"
+    )
+    parser.add_argument("--concurrency", type=_csv, default=["1", "4", "8"], help="Comma separated thread counts")
+    parser.add_argument("--requests", type=int, default=16, help="Documents per scenario, after one warmup call")
+    parser.add_argument("--backend", default="stub", help="stub, mineru or module:callable replacing do_parse")
+    parser.add_argument("--model-ms-per-page", type=float, default=0.0, help="Simulated inference time of the stub")
+    parser.add_argument("--image-mode", choices=("base64", "reference"), default="base64")
+    parser.add_argument("--cache", action="store_true", help="Keep the parse result cache enabled")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic documents")
+    parser.add_argument("--output", default=f"qocr-benchmark-{time.strftime('%Y%m%d_%H%M%S')}.json")
+    args = parser.parse_args(argv)
+
+    unknown = [driver for driver in args.drivers if driver not in DRIVERS]
+    unknown += [workload for workload in args.workloads if workload not in WORKLOADS]
+    if unknown:
+        parser.error(f"Unknown drivers or workloads: {', '.join(unknown)}")
+
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "backend": args.backend,
+        "model_ms_per_page": args.model_ms_per_page,
+        "image_mode": args.image_mode,
+        "cache": args.cache,
+        "seed": args.seed,
+        "scenarios": [],
+    }
+    ctx = mp.get_context("spawn")
+    for driver in args.drivers:
+        for workload_name in args.workloads:
+            for concurrency in map(int, args.concurrency):
+                scenario = {
+                    "driver": driver,
+                    "workload": asdict(WORKLOADS[workload_name]),
+                    "concurrency": concurrency,
+                    "requests": max(args.requests, concurrency),
+                    "backend": args.backend,
+                    "model_ms_per_page": args.model_ms_per_page,
+                    "image_mode": args.image_mode,
+                    "cache": args.cache,
+                    "seed": args.seed,
+                }
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+                    result = executor.submit(run_scenario, scenario).result()
+                report["scenarios"].append(result)
+                latency = result["latency_seconds"]
+                print(
+                    f"{driver:8} {workload_name:11} c={concurrency:<3} {result['pages_per_second']:>9.2f} pages/s  "
+                    f"p50={latency['p50']:.3f}s p95={latency['p95']:.3f}s p99={latency['p99']:.3f}s  "
+                    f"peak_rss={(result['peak_rss_bytes'] or 0) / 2**20:.0f}MiB"
+                    + (f"  errors={result['error_count']}" if result["error_count"] else ""),
+                    flush=True,
+                )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
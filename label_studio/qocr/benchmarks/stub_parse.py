@@ -0,0 +1,211 @@
+import hashlib
+import importlib
+import os
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+import ujson
+from mineru.cli.common import prepare_env
+
+DoParse = Callable[..., None]
+
+
+def _png_bytes(width: int, height: int, rgb: bytes) -> bytes:
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    stride = width * 3
+    raw = b"".join(b"\x00" + rgb[y * stride : (y + 1) * stride] for y in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _table_html(rows: list[str]) -> str:
+    cells = [[cell.strip() for cell in row.strip().strip("|").split("|")] for row in rows]
+    body = "".join("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in cells)
+    return f"<table>{body}</table>"
+
+
+def _page_blocks(lines: list[str]) -> list[tuple[str, str]]:
+    """Group the text lines of a page into (type, content) blocks, `| a | b |` lines form tables"""
+    blocks: list[tuple[str, list[str]]] = []
+    for line in lines:
+        block_type = "table" if line.startswith("|") else "text"
+        if blocks and blocks[-1][0] == block_type:
+            blocks[-1][1].append(line)
+        else:
+            blocks.append((block_type, [line]))
+    return [
+        (block_type, _table_html(block_lines) if block_type == "table" else " ".join(block_lines))
+        for block_type, block_lines in blocks
+    ]
+
+
+def _middle_block(block_type: str, bbox: list[int], span: dict) -> dict:
+    line = {"bbox": bbox, "spans": [span]}
+    if block_type == "text":
+        return {"type": "text", "bbox": bbox, "lines": [line]}
+    # Images and tables wrap their span in a body block, like mineru's middle JSON
+    body = {"type": f"{block_type}_body", "bbox": bbox, "lines": [line]}
+    return {"type": block_type, "bbox": bbox, "blocks": [body]}
+
+
+class StubParse:
+    """Stand-in for `mineru.cli.common.do_parse` that needs no model weights.
+
+    It writes the files mineru writes (markdown, content list, middle JSON, extracted images and the
+    layout/origin PDFs) from what the document actually contains: text lines become paragraphs,
+    `| a | b |` lines become HTML tables and embedded RGB images are extracted as PNGs. Model inference
+    is replaced by sleeping `model_ms_per_page`, so 0 measures only the overhead of the service around
+    the models, and a measured per-page model time gives an end-to-end estimate.
+    """
+
+    def __init__(self, model_ms_per_page: float = 0.0) -> None:
+        self.model_ms_per_page = model_ms_per_page
+
+    def __call__(
+        self,
+        output_dir: str,
+        pdf_file_names: list[str],
+        pdf_bytes_list: list[bytes],
+        p_lang_list: list[str],
+        parse_method: str = "auto",
+        start_page_id: int = 0,
+        end_page_id: int | None = None,
+        f_draw_layout_bbox: bool = True,
+        f_dump_orig_pdf: bool = True,
+        **kwargs,
+    ) -> None:
+        for file_name, pdf_bytes in zip(pdf_file_names, pdf_bytes_list):
+            local_image_dir, local_md_dir = prepare_env(output_dir, file_name, parse_method)
+            pdf = pdfium.PdfDocument(pdf_bytes)
+            try:
+                last_page = len(pdf) - 1
+                if end_page_id is not None and end_page_id >= 0:
+                    last_page = min(end_page_id, last_page)
+                pages = [self._parse_page(pdf, i, local_image_dir) for i in range(start_page_id, last_page + 1)]
+            finally:
+                pdf.close()
+            if self.model_ms_per_page > 0:
+                time.sleep(self.model_ms_per_page * len(pages) / 1000)
+            self._write_outputs(file_name, local_md_dir, pages, pdf_bytes, f_draw_layout_bbox, f_dump_orig_pdf)
+
+    def _parse_page(self, pdf: pdfium.PdfDocument, page_idx: int, image_dir: str) -> dict:
+        page = pdf[page_idx]
+        try:
+            width, height = page.get_size()
+            textpage = page.get_textpage()
+            try:
+                lines = [line.strip() for line in textpage.get_text_range().splitlines() if line.strip()]
+            finally:
+                textpage.close()
+
+            images = []
+            for image in page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,)):
+                metadata = image.get_metadata()
+                data = bytes(image.get_data(decode_simple=True))
+                # Only 8 bit RGB images, like the ones of the synthetic documents, are extracted
+                if len(data) != metadata.width * metadata.height * 3:
+                    continue
+                png = _png_bytes(metadata.width, metadata.height, data)
+                name = f"{hashlib.sha256(png).hexdigest()}.png"
+                with open(os.path.join(image_dir, name), "wb") as f:
+                    f.write(png)
+                images.append(name)
+        finally:
+            page.close()
+        return {"size": [width, height], "blocks": _page_blocks(lines), "images": images}
+
+    def _write_outputs(
+        self,
+        file_name: str,
+        md_dir: str,
+        pages: list[dict],
+        pdf_bytes: bytes,
+        draw_layout: bool,
+        dump_orig_pdf: bool,
+    ) -> None:
+        markdown_parts = []
+        content_list = []
+        pdf_info = []
+        for page_number, page in enumerate(pages):
+            width, height = page["size"]
+            blocks = list(page["blocks"])
+            blocks.extend(("image", name) for name in page["images"])
+            # Blocks are stacked down the page, their boxes only need to be plausible
+            step = height / max(len(blocks), 1)
+            para_blocks = []
+            for i, (block_type, content) in enumerate(blocks):
+                bbox = [50, int(i * step), int(width - 50), int((i + 1) * step)]
+                scaled_bbox = [int(bbox[0] * 1000 / width), int(bbox[1] * 1000 / height)]
+                scaled_bbox += [int(bbox[2] * 1000 / width), int(bbox[3] * 1000 / height)]
+                item = {"type": block_type, "page_idx": page_number, "bbox": scaled_bbox}
+                if block_type == "image":
+                    markdown_parts.append(f"![](images/{content})")
+                    item["img_path"] = f"images/{content}"
+                    span = {"type": "image", "bbox": bbox, "image_path": content}
+                elif block_type == "table":
+                    markdown_parts.append(content)
+                    item["table_body"] = content
+                    span = {"type": "table", "bbox": bbox, "html": content}
+                else:
+                    markdown_parts.append(content)
+                    item["text"] = content
+                    span = {"type": "text", "bbox": bbox, "content": content}
+                content_list.append(item)
+                para_blocks.append(_middle_block(block_type, bbox, span))
+            pdf_info.append({"page_idx": page_number, "page_size": [width, height], "para_blocks": para_blocks})
+
+        with open(os.path.join(md_dir, f"{file_name}.md"), "w", encoding="utf-8") as f:
+            f.write("\n\n".join(markdown_parts))
+        with open(os.path.join(md_dir, f"{file_name}_content_list.json"), "w", encoding="utf-8") as f:
+            ujson.dump(content_list, f, ensure_ascii=False)
+        with open(os.path.join(md_dir, f"{file_name}_middle.json"), "w", encoding="utf-8") as f:
+            ujson.dump({"pdf_info": pdf_info, "_backend": "stub"}, f, ensure_ascii=False)
+        # mineru draws boxes onto a copy of the document, writing the copy keeps the I/O comparable
+        if draw_layout:
+            with open(os.path.join(md_dir, f"{file_name}_layout.pdf"), "wb") as f:
+                f.write(pdf_bytes)
+        if dump_orig_pdf:
+            with open(os.path.join(md_dir, f"{file_name}_origin.pdf"), "wb") as f:
+                f.write(pdf_bytes)
+
+
+def load_parse_backend(spec: str, model_ms_per_page: float = 0.0) -> DoParse | None:
+    """Resolve a backend: `stub`, `mineru` (None, the real do_parse stays in place) or `module:callable`"""
+    if spec == "mineru":
+        return None
+    if spec == "stub":
+        return StubParse(model_ms_per_page)
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Parse backend must be stub, mineru or module:callable, got {spec!r}")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+@contextmanager
+def use_parse_backend(do_parse: DoParse | None) -> Iterator[None]:
+    """Route every `do_parse` call of the parse service in this process to `do_parse`.
+
+    Page pool processes import the real function, so stubs only apply with page parallelism disabled.
+    """
+    from ..service import parse_service
+
+    if do_parse is None:
+        yield
+        return
+    original = parse_service.do_parse
+    parse_service.do_parse = do_parse
+    try:
+        yield
+    finally:
+        parse_service.do_parse = original
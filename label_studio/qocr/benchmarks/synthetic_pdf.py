@@ -0,0 +1,134 @@
+import random
+import zlib
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+LINE_HEIGHT = 14
+IMAGE_HEIGHT = 160
+TABLE_COLUMNS = 4
+
+_WORDS = (
+    "document layout parsing table figure page model result value total section report data text line "
+    "column row image caption summary analysis revenue quarter region product index reference method"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _image_stream(rng: random.Random, width: int, height: int) -> bytes:
+    """Flate-compressed RGB pixels: a gradient with noise, compressing about as well as a scanned figure"""
+    stripes = bytes((x * 7) & 0xFF for x in range(width))
+    pixels = bytearray(width * height * 3)
+    for y in range(height):
+        start, stop = y * width * 3, (y + 1) * width * 3
+        pixels[start:stop:3] = bytes([y * 255 // max(height - 1, 1)]) * width
+        pixels[start + 1 : stop : 3] = rng.randbytes(width)
+        pixels[start + 2 : stop : 3] = stripes
+    return zlib.compress(bytes(pixels), 6)
+
+
+def synthetic_pdf(
+    pages: int,
+    images_per_page: int = 0,
+    tables_per_page: int = 0,
+    table_rows: int = 6,
+    image_size: tuple[int, int] = (256, 192),
+    seed: int = 0,
+) -> bytes:
+    """Build a PDF of `pages` A4 pages with text, embedded RGB images and ruled tables.
+
+    Only the standard library is used, so documents of any shape can be generated where the pipeline's
+    dependencies are missing. The same arguments always produce the same bytes. Table rows are drawn as
+    single `| cell | cell |` text lines inside a grid, which the stub parser turns back into tables.
+    """
+    rng = random.Random(seed)
+    image_width, image_height = image_size
+    objects: list[bytes] = [b"", b""]  # catalog and page tree, filled in last
+    page_ids = []
+
+    # Pages share a font, every page gets its own image XObjects
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    font_id = len(objects)
+
+    for _ in range(pages):
+        ops = [b"0.6 w"]
+        image_refs = []
+        y = PAGE_HEIGHT - MARGIN
+
+        def text_lines(count: int) -> None:
+            nonlocal y
+            for _ in range(count):
+                if y < MARGIN + LINE_HEIGHT:
+                    return
+                y -= LINE_HEIGHT
+                ops.append(f"BT /F1 10 Tf {MARGIN} {y} Td ({_escape(_sentence(rng))}) Tj ET".encode())
+
+        text_lines(4)
+        for _ in range(images_per_page):
+            if y < MARGIN + IMAGE_HEIGHT:
+                break
+            stream = _image_stream(rng, image_width, image_height)
+            objects.append(
+                f"<< /Type /XObject /Subtype /Image /Width {image_width} /Height {image_height} "
+                f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode /Length {len(stream)} >>\n"
+                "stream\n".encode() + stream + b"\nendstream"
+            )
+            name = f"Im{len(image_refs)}"
+            image_refs.append((name, len(objects)))
+            y -= IMAGE_HEIGHT
+            draw_width = IMAGE_HEIGHT * image_width // image_height
+            ops.append(f"q {draw_width} 0 0 {IMAGE_HEIGHT} {MARGIN} {y} cm /{name} Do Q".encode())
+            text_lines(2)
+
+        for _ in range(tables_per_page):
+            if y < MARGIN + (table_rows + 1) * LINE_HEIGHT:
+                break
+            top = y
+            table_width = PAGE_WIDTH - 2 * MARGIN
+            for _ in range(table_rows):
+                y -= LINE_HEIGHT
+                cells = [rng.choice(_WORDS)] + [str(rng.randint(0, 9999)) for _ in range(TABLE_COLUMNS - 1)]
+                row = _escape("| " + " | ".join(cells) + " |")
+                ops.append(f"BT /F1 9 Tf {MARGIN + 4} {y + 3} Td ({row}) Tj ET".encode())
+                ops.append(f"{MARGIN} {y} {table_width} {LINE_HEIGHT} re S".encode())
+            for column in range(1, TABLE_COLUMNS):
+                x = MARGIN + column * table_width // TABLE_COLUMNS
+                ops.append(f"{x} {y} m {x} {top} l S".encode())
+            text_lines(2)
+
+        text_lines(PAGE_HEIGHT)
+
+        content = b"\n".join(ops)
+        objects.append(f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream")
+        content_id = len(objects)
+        xobjects = " ".join(f"/{name} {object_id} 0 R" for name, object_id in image_refs)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> /XObject << {xobjects} >> >> "
+            f"/Contents {content_id} 0 R >>".encode()
+        )
+        page_ids.append(len(objects))
+
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    parts = [b"%PDF-1.4\n"]
+    offset = len(parts[0])
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(offset)
+        part = f"{i} 0 obj\n".encode() + obj + b"\nendobj\n"
+        parts.append(part)
+        offset += len(part)
+    parts.append(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    parts.extend(f"{object_offset:010d} 00000 n \n".encode() for object_offset in offsets)
+    parts.append(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{offset}\n%%EOF\n".encode())
+    return b"".join(parts)
@@ -0,0 +1,400 @@
+import os
+import time
+from typing import Iterator
+
+from mineru.utils.enum_class import ModelInvokeConfig as MineruModelInvokeConfig
+from mineru.utils.enum_class import ModelInvokeConfigDict
+
+try:
+    from loguru import logger
+except ImportError:
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+from .file_handler import compress_markdown_images
+from .metrics import (
+    CACHE_HITS,
+    DOCUMENT_PAGES,
+    PAGES,
+    PARSE_SECONDS,
+    PARSES_STOPPED,
+    REGISTRY,
+    current_timer,
+    timed,
+)
+from .model.entity import OCROutput
+from .service.archive import ArchiveMode, keep_archive, save_archive
+from .service.artifact_store import get_artifact_store
+from .service.cancellation import CancellationToken, ParseCancelled
+from .service.coordinator import get_coordinator
+from .service.model_registry import get_model_registry
+from .service.parse_service import ImageMode, ParseService
+from .service.result_cache import get_result_cache
+from .service.worker_pool import get_parse_pool
+
+MODEL_INFO = {"name": "Q-OCR", "version": "2025-04-21"}
+
+
+def convert_to_mineru_config(config, weight: str | None = None):
+    """Convert local ModelInvokeConfig to mineru ModelInvokeConfig format, loading `weight` when it is given"""
+    mineru_config = {
+        "model_type": config["type"],
+        "model_subtype": config.get("sub_type"),
+        "model_name": config["name"],
+        "model_version": config["version"],
+    }
+    if weight:
+        mineru_config["model_path"] = weight
+    return MineruModelInvokeConfig.model_validate(mineru_config)
+
+
+def resolve_invoke_config(config: dict, weights: dict[str, str] | None = None) -> ModelInvokeConfigDict:
+    """Convert a validated `ParseDocumentRequest` payload to the invoke_config mineru expects.
+
+    `weights` maps payload keys to the weight locations of their registered versions, see
+    `ModelRegistry.weights()`; other models are located by mineru from their name and version.
+    """
+    weights = weights or {}
+    return {
+        "layout": convert_to_mineru_config(config.get("layout", {}), weights.get("layout")),
+        "ocrcls": convert_to_mineru_config(config.get("ocr_cls", {}), weights.get("ocr_cls")),
+        "ocrdet": convert_to_mineru_config(config.get("ocr_det", {}), weights.get("ocr_det")),
+        "ocrrec": convert_to_mineru_config(config.get("ocr_rec", {}), weights.get("ocr_rec")),
+    }
+
+
+def parse_document(
+    file_path: str,
+    filename: str,
+    invoke_config: ModelInvokeConfigDict,
+    max_pages: int = 0,
+    file_bytes: bytes | None = None,
+    image_mode: ImageMode = "base64",
+    archive_mode: ArchiveMode = "inline",
+    start_page: int = 0,
+    table_enable: bool = False,
+    figure_enable: bool = True,
+    debug_pdfs: bool = False,
+    cancel_token: CancellationToken | None = None,
+) -> dict:
+    """Parse a document and build the `ParseDocumentResponse` payload (markdown and zipped outputs).
+
+    `file_path` may be a bare file name when the content is passed in memory as `file_bytes`.
+    Parsing starts at the page index `start_page` and covers at most `max_pages` pages, 0 meaning all.
+    In the `reference` image mode the markdown links images by content hash instead of inlining them.
+    In the `download` archive mode the payload carries a handle of the archive instead of its base64 data,
+    and the archive includes the layout PDF when `debug_pdfs` asked mineru to render it.
+    A parse stopped by the deadline of `cancel_token` is answered with the pages before it, marked `partial`
+    with the 1-based `next_page` to resume from; a cancelled one raises `ParseCancelled`.
+    """
+    started = time.perf_counter()
+    options = {
+        "max_pages": max_pages,
+        "image_mode": image_mode,
+        "start_page": start_page,
+        "table_enable": table_enable,
+        "figure_enable": figure_enable,
+        "debug_pdfs": debug_pdfs,
+    }
+    # Parse on a worker node when a coordinator spreads parses over hosts, else on a pre-warmed worker when the
+    # pool is enabled
+    try:
+        coordinator = get_coordinator()
+        parse_pool = get_parse_pool()
+        if coordinator is not None:
+            output = coordinator.submit(
+                invoke_config, cancel_token, pdf_path=file_path, pdf_bytes=file_bytes, **options
+            )
+        elif parse_pool is not None:
+            output = parse_pool.wait(
+                parse_pool.submit(invoke_config, cancel_token, pdf_path=file_path, pdf_bytes=file_bytes, **options)
+            )
+        else:
+            parse_service = ParseService.from_settings()
+            output = parse_service.process_document(
+                pdf_path=file_path,
+                invoke_config=invoke_config,
+                pdf_bytes=file_bytes,
+                cancel_token=cancel_token,
+                **options,
+            )
+    except ParseCancelled as e:
+        PARSES_STOPPED.inc(reason=e.reason)
+        raise
+    _record_parse([output], time.perf_counter() - started)
+
+    response_data = _build_response_data(filename, output, archive_mode)
+    if output.partial:
+        PARSES_STOPPED.inc(reason="deadline")
+        response_data.update(partial=True, next_page=start_page + output.page_count + 1)
+    return response_data
+
+
+def stream_parse_document(
+    file_path: str,
+    filename: str,
+    invoke_config: ModelInvokeConfigDict,
+    max_pages: int = 0,
+    file_bytes: bytes | None = None,
+    image_mode: ImageMode = "base64",
+    archive_mode: ArchiveMode = "inline",
+    start_page: int = 0,
+    table_enable: bool = False,
+    figure_enable: bool = True,
+    cancel_token: CancellationToken | None = None,
+) -> Iterator[dict]:
+    """Yield a `page` record per parsed page, then a `summary` record with the zipped outputs.
+
+    Records are produced while the document is still being parsed; a failure ends the stream with an `error` record.
+    Once the deadline of `cancel_token` passed, the summary covers the pages streamed so far and is marked `partial`.
+    With a coordinator or a worker pool every page is cut out and parsed there like a one-page `parse_document`,
+    this process only converts and cuts the document and assembles the pages.
+    """
+    from django.conf import settings
+
+    started = time.perf_counter()
+    parse_service = ParseService.from_settings()
+    coordinator = get_coordinator()
+    parse_pool = get_parse_pool()
+    page_options = {
+        "max_pages": 1,
+        "image_mode": image_mode,
+        "table_enable": table_enable,
+        "figure_enable": figure_enable,
+    }
+
+    def parse_page(pdf_path: str) -> OCROutput:
+        if coordinator is not None:
+            return coordinator.submit(invoke_config, pdf_path=pdf_path, **page_options)
+        return parse_pool.wait(parse_pool.submit(invoke_config, pdf_path=pdf_path, **page_options))
+
+    markdown_parts = []
+    content_list = []
+    images_path = None
+    workspace = None
+    partial = False
+    try:
+        if coordinator is not None or parse_pool is not None:
+            pages = parse_service.iter_submitted_pages(
+                parse_page,
+                pdf_path=file_path,
+                max_pages=max_pages,
+                staging_dir=settings.QOCR_UPLOAD_DIR,
+                pdf_bytes=file_bytes,
+                start_page=start_page,
+                cancel_token=cancel_token,
+            )
+        else:
+            pages = parse_service.iter_pages(
+                pdf_path=file_path,
+                max_pages=max_pages,
+                invoke_config=invoke_config,
+                pdf_bytes=file_bytes,
+                image_mode=image_mode,
+                start_page=start_page,
+                table_enable=table_enable,
+                figure_enable=figure_enable,
+                cancel_token=cancel_token,
+            )
+        try:
+            for page in pages:
+                markdown_parts.append(page.markdown)
+                content_list.extend(page.content_list)
+                images_path = page.images_path
+                workspace = page.workspace
+                yield {
+                    "type": "page",
+                    "page": page.page_idx,
+                    "markdown": page.markdown,
+                    "content_list": page.content_list,
+                }
+        except ParseCancelled as e:
+            PARSES_STOPPED.inc(reason=e.reason)
+            if e.reason != "deadline":
+                raise
+            partial = True
+        if archive_mode == "download":
+            archive = _archive_handle(
+                save_archive(
+                    get_artifact_store(),
+                    filename,
+                    markdown="\n\n".join(markdown_parts),
+                    content_list=content_list,
+                    images_path=images_path,
+                    workspace=workspace,
+                )
+            )
+            # The workspace now backs the download and is left to the TTL of the artifact store
+            workspace = None
+        else:
+            archive = {
+                "file_data": compress_markdown_images(
+                    file_name=filename,
+                    markdown="\n\n".join(markdown_parts),
+                    content_list=content_list,
+                    images_base_path=images_path,
+                )
+            }
+    except Exception as e:
+        logger.exception(f"Error streaming document {filename}: {e}")
+        yield {"type": "error", "message": str(e)}
+        return
+    finally:
+        # Also reached when the client disconnects and the response closes the generator
+        get_artifact_store().release(workspace)
+
+    page_count = len(markdown_parts)
+    PARSE_SECONDS.observe(time.perf_counter() - started)
+    PAGES.inc(page_count)
+    DOCUMENT_PAGES.observe(page_count)
+    yield {
+        "type": "summary",
+        "page_count": page_count,
+        **archive,
+        **({"partial": True, "next_page": start_page + page_count + 1} if partial else {}),
+        "model_info": MODEL_INFO,
+    }
+
+
+def parse_documents(
+    file_paths: list[str],
+    filenames: list[str],
+    invoke_config: ModelInvokeConfigDict,
+    max_pages: int = 0,
+    image_mode: ImageMode = "base64",
+    archive_mode: ArchiveMode = "inline",
+    start_page: int = 0,
+    table_enable: bool = False,
+    figure_enable: bool = True,
+    debug_pdfs: bool = False,
+) -> list[dict]:
+    """Parse several documents in one batched mineru call, returning a `ParseDocumentResponse` payload per file"""
+    started = time.perf_counter()
+    options = {
+        "max_pages": max_pages,
+        "image_mode": image_mode,
+        "start_page": start_page,
+        "table_enable": table_enable,
+        "figure_enable": figure_enable,
+        "debug_pdfs": debug_pdfs,
+    }
+    coordinator = get_coordinator()
+    parse_pool = get_parse_pool()
+    if coordinator is not None:
+        outputs = coordinator.submit_batch(invoke_config, pdf_paths=file_paths, **options)
+    elif parse_pool is not None:
+        outputs = parse_pool.wait(parse_pool.submit_batch(invoke_config, pdf_paths=file_paths, **options))
+    else:
+        parse_service = ParseService.from_settings()
+        outputs = parse_service.process_documents(pdf_paths=file_paths, invoke_config=invoke_config, **options)
+    _record_parse(outputs, time.perf_counter() - started)
+
+    return [_build_response_data(filename, output, archive_mode) for filename, output in zip(filenames, outputs)]
+
+
+def _record_parse(outputs: list[OCROutput], seconds: float) -> None:
+    """Record a finished parse call in the metrics registry and the stage timer of the request"""
+    parsed = [output for output in outputs if not output.cached]
+    CACHE_HITS.inc(len(outputs) - len(parsed))
+    if parsed:
+        PARSE_SECONDS.observe(seconds)
+    for output in parsed:
+        PAGES.inc(output.page_count)
+        DOCUMENT_PAGES.observe(output.page_count)
+
+    # Stages of a parse on a pooled worker were timed in the worker process
+    timer = current_timer()
+    if timer is not None:
+        for output in outputs:
+            timer.merge(output.timings)
+
+
+def _archive_handle(archive_id: str) -> dict:
+    from django.conf import settings
+
+    return {"archive_id": archive_id, "archive_url": f"{settings.QOCR_ARCHIVE_BASE_URL}{archive_id}/"}
+
+
+def _build_response_data(filename: str, output: OCROutput, archive_mode: ArchiveMode = "inline") -> dict:
+    if archive_mode == "download":
+        # The archive is streamed by the download endpoint, which reads the outputs from the workspace
+        with timed("archive"):
+            archive_id = save_archive(
+                get_artifact_store(),
+                filename,
+                markdown=output.markdown,
+                content_list=output.content_list,
+                images_path=output.images_path,
+                workspace=output.workspace,
+                model_pdf=output.model_pdf,
+            )
+        return {"markdown": output.markdown, **_archive_handle(archive_id), "model_info": MODEL_INFO}
+
+    # Zip archive with markdown & images, reused from the result cache when the document was parsed before
+    result_cache = get_result_cache()
+    encoded_compressed_file = None
+    if result_cache is not None and output.cache_key:
+        encoded_compressed_file = result_cache.get_archive(output.cache_key)
+    if encoded_compressed_file is None:
+        with timed("compress"):
+            encoded_compressed_file = compress_markdown_images(
+                file_name=filename,
+                markdown=output.markdown,
+                content_list=output.content_list,
+                images_base_path=output.images_path,
+            )
+        if result_cache is not None and output.cache_key:
+            result_cache.put_archive(output.cache_key, encoded_compressed_file)
+
+    # Outputs of uncached parses live in a workspace that is only needed until the archive is built
+    get_artifact_store().release(output.workspace)
+
+    return {
+        "markdown": output.markdown,
+        "file_data": encoded_compressed_file,
+        "model_info": MODEL_INFO,
+    }
+
+
+def parse_document_job(
+    upload_path: str,
+    filename: str,
+    config: dict,
+    max_pages: int = 0,
+    image_mode: ImageMode = "base64",
+    start_page: int = 0,
+    table_enable: bool = False,
+    figure_enable: bool = True,
+    debug_pdfs: bool = False,
+) -> dict:
+    """RQ job: parse an uploaded document, the result is kept in Redis for QOCR_JOB_RESULT_TTL seconds.
+
+    The result carries the download handle of the archive, never its base64 data, and the workspace behind the
+    handle is kept as long as the result.
+    """
+    from django.conf import settings
+
+    try:
+        response_data = parse_document(
+            upload_path,
+            filename,
+            # Resolved when the job runs, a version registered meanwhile loads its current weights
+            resolve_invoke_config(config, get_model_registry().weights(config)),
+            max_pages=max_pages,
+            image_mode=image_mode,
+            archive_mode="download",
+            start_page=start_page,
+            table_enable=table_enable,
+            figure_enable=figure_enable,
+            debug_pdfs=debug_pdfs,
+        )
+        keep_archive(get_artifact_store(), response_data["archive_id"], settings.QOCR_JOB_RESULT_TTL)
+        return response_data
+    finally:
+        try:
+            os.unlink(upload_path)
+        except OSError as e:
+            logger.warning(f"Failed to remove job upload {upload_path}: {e}")
+        # The RQ work-horse leaves through os._exit() without running atexit
+        REGISTRY.flush()
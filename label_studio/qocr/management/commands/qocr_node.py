@@ -0,0 +1,31 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from qocr.service.coordinator import CoordinatorNode, get_coordinator
+
+
+class Command(BaseCommand):
+    help = "Serve the parse jobs the QOCR coordinator routes to this host (QOCR_COORDINATOR=redis)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--capacity", type=int, default=None, help="Parses run at once, QOCR_NODE_CAPACITY by default"
+        )
+        parser.add_argument("--node-id", default=None, help="Node name, host name and process id by default")
+
+    def handle(self, *args, **options):
+        if settings.QOCR_COORDINATOR != "redis":
+            raise CommandError("Worker nodes serve the Redis coordinator, set QOCR_COORDINATOR=redis")
+
+        node = CoordinatorNode.from_settings(get_coordinator(), options["capacity"], options["node_id"])
+
+        def stop(signum, frame):
+            # Running parses finish on this node, `join()` hands the queued ones to other nodes
+            self.stdout.write(f"Stopping QOCR worker node {node.node_id}")
+            node.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        node.start()
+        node.join()
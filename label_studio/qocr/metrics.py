@@ -0,0 +1,461 @@
+"""Minimal metrics registry rendered in the Prometheus text format, plus per-request stage timers"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshots of exited processes are kept instead of compacted
+    fcntl = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+# Counters and histograms of exited processes, folded together by `Registry._compact()`
+AGGREGATE_FILE = "aggregate.json"
+COMPACT_LOCK_FILE = ".compact.lock"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Metric:
+    metric_type = ""
+    # Values that describe a running process rather than accumulate, dropped once the process is gone
+    live = False
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.registry: "Registry | None" = None
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def _changed(self) -> None:
+        if self.registry is not None and self.registry.shared_dir is not None:
+            self.registry._ensure_writer()
+
+    def dump(self) -> list:
+        """Values as JSON-compatible `[labels, value]` pairs, see `Registry.share()`"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def _combine(self, total, value):
+        return value if total is None else total + value
+
+    def merged(self, dumps: list[list]) -> dict:
+        """Values of several `dump()`s of the metric added up"""
+        values = {}
+        for dump in dumps:
+            for key, value in dump:
+                values[tuple(key)] = self._combine(values.get(tuple(key)), value)
+        return values
+
+    def samples(self, values: dict | None = None) -> Iterator[tuple[str, dict[str, str], float]]:
+        raise NotImplementedError
+
+    def render(self, values: dict | None = None) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for name, labels, value in self.samples(values):
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._changed()
+
+    def samples(self, values=None):
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in values.items():
+            yield f"{self.name}_total", self._labels(key), value
+
+
+class Gauge(_Metric):
+    """Gauge of the process, the sum over the live processes when the registry is shared"""
+
+    metric_type = "gauge"
+    live = True
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+        self._changed()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._changed()
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self, values=None):
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in values.items():
+            yield self.name, self._labels(key), value
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self._values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+        self._changed()
+
+    def _combine(self, total, value):
+        counts, value_sum = value
+        if total is None:
+            return list(counts), value_sum
+        return [a + b for a, b in zip(total[0], counts)], total[1] + value_sum
+
+    def samples(self, values=None):
+        if values is None:
+            with self._lock:
+                values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in values.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    """Metrics of the process, or of every process on the host once `share()` was called.
+
+    Under a multi-process server (gunicorn, uWSGI) every worker has its own metrics, and a scrape only reaches
+    one of them. Shared, each process writes a snapshot of its metrics to its own file in a directory, and
+    `render()` adds up the snapshots of all of them: counters and histograms of exited processes are kept, gauges
+    only count while their process runs. Snapshots of exited processes are folded into one aggregate file when
+    rendering, so forking servers and RQ work-horses do not grow the directory, and a forked child starts from
+    empty metrics instead of counting its parent's again. Clear the directory when the server starts, like
+    prometheus_client's.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.shared_dir: Path | None = None
+        self.flush_interval = 5.0
+        self._writer_pid: int | None = None
+        self._snapshot_path: Path | None = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        metric.registry = self
+        return metric
+
+    def share(self, directory: str, flush_interval: float = 5.0) -> None:
+        """Aggregate the processes writing to `directory`, each writes its snapshot every `flush_interval` seconds"""
+        self.shared_dir = Path(directory)
+        self.shared_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        if self.shared_dir is None:
+            return "\n".join(metric.render() for metric in metrics) + "\n"
+
+        self._ensure_writer()
+        self._write_snapshot()
+        self._compact()
+        snapshots = self._read_snapshots()
+        live = [snapshot for snapshot in snapshots if snapshot["pid"] is not None and _alive(snapshot["pid"])]
+        rendered = []
+        for metric in metrics:
+            dumps = [snapshot["metrics"].get(metric.name, []) for snapshot in (live if metric.live else snapshots)]
+            rendered.append(metric.render(metric.merged(dumps)))
+        return "\n".join(rendered) + "\n"
+
+    def flush(self) -> None:
+        """Write the snapshot of this process now, for processes that leave through `os._exit()` and skip atexit"""
+        if self.shared_dir is not None and self._writer_pid == os.getpid():
+            self._write_snapshot()
+
+    def _reset_in_child(self) -> None:
+        """Start a forked child from empty metrics, its parent keeps reporting its own"""
+        self._lock = threading.Lock()
+        self._writer_pid = None
+        self._snapshot_path = None
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+
+    def _ensure_writer(self) -> None:
+        """Start the snapshot writer of this process, after a fork the child starts its own"""
+        pid = os.getpid()
+        if self._writer_pid == pid:
+            return
+        with self._lock:
+            if self._writer_pid == pid:
+                return
+            self._writer_pid = pid
+            self._snapshot_path = self.shared_dir / f"{pid}-{uuid.uuid4().hex[:8]}.json"
+        threading.Thread(target=self._write_snapshots, name="qocr-metrics-writer", daemon=True).start()
+        atexit.register(self._write_snapshot)
+
+    def _write_snapshots(self) -> None:
+        pid = os.getpid()
+        while self._writer_pid == pid:
+            time.sleep(self.flush_interval)
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {"pid": os.getpid(), "metrics": {metric.name: metric.dump() for metric in metrics}}
+        tmp_path = self._snapshot_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(snapshot))
+            os.replace(tmp_path, self._snapshot_path)
+        except OSError:
+            # Metrics must not fail the request or the exit, the next snapshot tries again
+            pass
+
+    def _compact(self) -> None:
+        """Fold the snapshots of exited processes into the aggregate file and delete them, dropping their gauges.
+
+        Like prometheus_client's `mark_process_dead`, but run by whoever renders, under a lock shared by processes.
+        """
+        if fcntl is None:
+            return
+        with self._lock:
+            metrics = list(self._metrics.values())
+        aggregate_path = self.shared_dir / AGGREGATE_FILE
+        with open(self.shared_dir / COMPACT_LOCK_FILE, "ab") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead = []
+            for path in self.shared_dir.glob("*.json"):
+                if path.name == AGGREGATE_FILE:
+                    continue
+                try:
+                    snapshot = json.loads(path.read_text())
+                except (OSError, ValueError):
+                    continue
+                if not _alive(snapshot["pid"]):
+                    dead.append((path, snapshot))
+            if not dead:
+                return
+
+            try:
+                aggregate = json.loads(aggregate_path.read_text())["metrics"]
+            except (OSError, ValueError):
+                aggregate = {}
+            for metric in metrics:
+                if metric.live:
+                    continue
+                dumps = [snapshot["metrics"].get(metric.name, []) for _, snapshot in dead]
+                dumps.append(aggregate.get(metric.name, []))
+                aggregate[metric.name] = [[list(key), value] for key, value in metric.merged(dumps).items()]
+            tmp_path = aggregate_path.with_suffix(".tmp")
+            try:
+                tmp_path.write_text(json.dumps({"pid": None, "metrics": aggregate}))
+                os.replace(tmp_path, aggregate_path)
+            except OSError:
+                return
+            for path, _ in dead:
+                path.unlink(missing_ok=True)
+
+    def _read_snapshots(self) -> list[dict]:
+        snapshots = []
+        for path in self.shared_dir.glob("*.json"):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+REGISTRY = Registry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=REGISTRY._reset_in_child)
+
+STAGE_SECONDS = REGISTRY.register(
+    Histogram("qocr_stage_seconds", "Time spent in each stage of the document pipeline", ("stage",))
+)
+PARSE_SECONDS = REGISTRY.register(
+    Histogram("qocr_parse_seconds", "Wall time of a parse call (one document or one batch), cache hits excluded")
+)
+DOCUMENT_PAGES = REGISTRY.register(
+    Histogram(
+        "qocr_document_pages",
+        "Pages parsed per document",
+        buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+    )
+)
+PAGES = REGISTRY.register(Counter("qocr_pages", "Pages parsed, qocr_parse_seconds_sum divided by it gives s/page"))
+CACHE_HITS = REGISTRY.register(Counter("qocr_cache_hits", "Documents answered from the parse result cache"))
+PARSES_STOPPED = REGISTRY.register(
+    Counter("qocr_parses_stopped", "Parses stopped before their last page, by reason", ("reason",))
+)
+COORDINATOR_JOBS = REGISTRY.register(
+    Counter("qocr_coordinator_jobs", "Parses routed to worker nodes, by whether it had the models", ("affinity",))
+)
+COORDINATOR_REQUEUED = REGISTRY.register(
+    Counter("qocr_coordinator_requeued", "Parse jobs of dead or stopping worker nodes routed to another node")
+)
+ADMISSION_IN_FLIGHT = REGISTRY.register(Gauge("qocr_admission_in_flight", "Parse requests admitted and running"))
+ADMISSION_QUEUE_DEPTH = REGISTRY.register(Gauge("qocr_admission_queue_depth", "Parse requests waiting for admission"))
+ADMISSION_REJECTED = REGISTRY.register(
+    Counter("qocr_admission_rejected", "Parse requests answered with 429, by reason", ("reason",))
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "qocr_admission_wait_seconds",
+        "Time admitted parse requests waited in the queue, by priority class",
+        ("priority",),
+    )
+)
+
+
+def _share_from_settings() -> None:
+    try:
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+    except ImportError:
+        return
+    try:
+        directory = getattr(settings, "QOCR_METRICS_DIR", "")
+    except ImproperlyConfigured:
+        return
+    if directory:
+        REGISTRY.share(directory, settings.QOCR_METRICS_FLUSH_INTERVAL)
+
+
+_share_from_settings()
+
+
+class StageTimer:
+    """Accumulated wall time per pipeline stage of one request"""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def merge(self, stages: dict[str, float]) -> None:
+        for stage, seconds in stages.items():
+            self.add(stage, seconds)
+
+    def server_timing(self) -> str:
+        """Value of a `Server-Timing` header, durations in milliseconds"""
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items())
+
+
+_current_timer: ContextVar[StageTimer | None] = ContextVar("qocr_stage_timer", default=None)
+
+
+def current_timer() -> StageTimer | None:
+    return _current_timer.get()
+
+
+@contextmanager
+def stage_timer(observe: bool = True) -> Iterator[StageTimer]:
+    """Collect `timed()` stages of the enclosed code; nested calls share the outermost timer.
+
+    On exit the outermost timer records every stage in the `qocr_stage_seconds` histogram unless
+    `observe` is off, e.g. in worker processes whose timings are reported by the web process.
+    """
+    timer = _current_timer.get()
+    if timer is not None:
+        yield timer
+        return
+
+    timer = StageTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+        if observe:
+            for stage, seconds in timer.stages.items():
+                STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Add the wall time of the enclosed block to `stage` of the current timer, if any"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer = _current_timer.get()
+        if timer is not None:
+            timer.add(stage, time.perf_counter() - started)
@@ -20,6 +20,30 @@ class OCROutput(BaseModel):
     markdown: str
     content_list: list[dict]
     images_path: str
+    cache_key: str | None = Field(default=None, description="Parse result cache entry, if the output is cached")
+    workspace: str | None = Field(
+        default=None, description="Artifact store workspace holding the outputs, to be released once consumed"
+    )
+    page_count: int = Field(default=0, description="Number of pages parsed")
+    cached: bool = Field(default=False, description="Whether the output was answered from the parse result cache")
+    partial: bool = Field(
+        default=False, description="Whether a deadline stopped the parse early, the output covers the first pages"
+    )
+    timings: dict[str, float] = Field(
+        default_factory=dict, description="Seconds spent per pipeline stage when parsed in another process"
+    )
+
+
+class PageOutput(BaseModel):
+    """
+    Result of a single page, yielded by `ParseService.iter_pages()` while the rest of the document is parsed.
+    """
+
+    page_idx: int
+    markdown: str
+    content_list: list[dict]
+    images_path: str
+    workspace: str | None = None
 
 
 class ParsePDFOutput(BaseModel):
@@ -34,6 +58,8 @@ class ParsePDFOutput(BaseModel):
     model_pdf: str = Field(description="Model PDF path")
     origin_pdf: str = Field(description="Original PDF path")
     span_pdf: str = Field(description="Span PDF path")
+    page_count: int = Field(default=0, description="Number of pages parsed")
+    first_page: int = Field(default=0, description="Index of the first parsed page in the document")
 
 
 class ProcessDocumentOutput(BaseModel):
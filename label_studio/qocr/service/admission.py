@@ -0,0 +1,335 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: slots are only shared between the threads of one process
+    fcntl = None
+
+from ..metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request is not admitted, `retry_after` is the suggested wait in seconds"""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"Parse capacity exhausted ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# Priority classes, most urgent first, named after the RQ queues parse jobs of the same class go to
+PRIORITIES = ("critical", "high", "default", "low")
+# Share of freed slots each class gets while several classes wait
+PRIORITY_WEIGHTS = {"critical": 8, "high": 4, "default": 2, "low": 1}
+# Classes that may use the slots reserved for interactive work
+INTERACTIVE_PRIORITIES = ("critical", "high")
+
+
+class _Slots:
+    """The `count` parse slots of a host, numbered from 0.
+
+    With a `directory`, slot `i` is held through an exclusive `flock` on its lock file, so every process sharing
+    the directory draws from the same slots and a slot is freed when its holder dies. Without one, the slots are
+    only shared between the threads of this process.
+    """
+
+    def __init__(self, count: int, directory: str | None = None) -> None:
+        self.count = count
+        self.directory = directory if fcntl is not None else None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._held: dict[int, object] = {}
+
+    @property
+    def shared(self) -> bool:
+        return bool(self.directory)
+
+    def take(self, limit: int) -> int | None:
+        """Hold the lowest free slot below `limit`, None when they are all taken"""
+        for slot in range(min(limit, self.count)):
+            if slot in self._held:
+                continue
+            if not self.directory:
+                self._held[slot] = None
+                return slot
+            lock_file = open(os.path.join(self.directory, f"slot-{slot}.lock"), "ab")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            self._held[slot] = lock_file
+            return slot
+        return None
+
+    def release(self, slot: int) -> None:
+        lock_file = self._held.pop(slot, None)
+        if lock_file is not None:
+            # Closing the file drops the lock
+            lock_file.close()
+
+
+class _Waiter:
+    def __init__(self, user: str, priority: str) -> None:
+        self.user = user
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.event = threading.Event()
+        self.slot: int | None = None
+        self.rejected: str | None = None
+
+
+class AdmissionTicket:
+    """A granted slot, released once (explicitly or by leaving the `with` block)"""
+
+    def __init__(self, controller: "AdmissionController", slot: int) -> None:
+        self._controller = controller
+        self.slot = slot
+        self._started = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._controller._release(self.slot, time.monotonic() - self._started)
+
+    def __enter__(self) -> "AdmissionTicket":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, prioritized and per-user fair wait queue in front of the parse path.
+
+    At most `max_concurrent` requests run at once, of which `reserved_slots` only take `critical` and `high`
+    (interactive) requests, so a bulk import never holds every slot. Further requests wait in a queue of at most
+    `max_queue` entries. A freed slot goes to a priority class by smooth weighted round-robin over the classes
+    that wait (`PRIORITY_WEIGHTS`), except that a class whose oldest waiter waited `aging_seconds` is served
+    first, so no class starves. Within a class, slots are handed out round-robin between users, so one user
+    flooding the endpoint only delays their own requests.
+
+    When the queue is full, a newcomer displaces the newest waiter of the user with the most queued requests in the
+    lowest class below its own, or else the newest waiter of the user of its class with the most queued requests if
+    that user has more than the newcomer; otherwise the newcomer is rejected. Rejections carry a Retry-After
+    estimate from the average time a slot is held.
+
+    With a `slots_dir` the slots are shared by every process using the directory (file locks, see `_Slots`), so
+    the limit holds for all web workers of a host. Queues are per process: waiters look for a slot freed by
+    another process every `poll_interval` seconds, and fairness only applies among the waiters of one process.
+    Without a `slots_dir` the limit is per process.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int = 0,
+        queue_timeout: float = 60,
+        reserved_slots: int = 0,
+        aging_seconds: float = 30,
+        slots_dir: str | None = None,
+        poll_interval: float = 0.2,
+    ) -> None:
+        if max_concurrent < 1:
+            raise ValueError("Admission control needs at least one concurrent slot")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+        # At least one slot is left to every class
+        self.reserved_slots = min(max(reserved_slots, 0), max_concurrent - 1)
+        self.aging_seconds = aging_seconds
+        self.poll_interval = poll_interval
+        self._slots = _Slots(max_concurrent, slots_dir)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # Per class: users with waiters in round-robin order, each with its waiters in arrival order
+        self._queues: dict[str, OrderedDict[str, deque[_Waiter]]] = {p: OrderedDict() for p in PRIORITIES}
+        self._credits = dict.fromkeys(PRIORITIES, 0)
+        self._queued = 0
+        # Moving average of how long a slot is held, seeds the Retry-After estimate
+        self._hold_seconds = 10.0
+        ADMISSION_IN_FLIGHT.set(0)
+        ADMISSION_QUEUE_DEPTH.set(0)
+
+    def acquire(self, user: str, priority: str = "default") -> AdmissionTicket:
+        """Wait for a slot, raising `AdmissionRejected` when the queue is full or the wait times out"""
+        if priority not in PRIORITY_WEIGHTS:
+            raise ValueError(f"Unknown priority class {priority}")
+        started = time.monotonic()
+        with self._lock:
+            # Waiters come first for slots other processes freed since they last looked
+            self._dispatch()
+            # Requests only wait while the slots open to their class are taken, so a free one is theirs
+            if (slot := self._slots.take(self._limit(priority))) is not None:
+                self._in_flight += 1
+                ADMISSION_IN_FLIGHT.set(self._in_flight)
+                ADMISSION_WAIT_SECONDS.observe(0, priority=priority)
+                return AdmissionTicket(self, slot)
+            if self._queued >= self.max_queue and not self._displace_for(user, priority):
+                raise self._reject("queue_full")
+            waiter = _Waiter(user, priority)
+            self._queues[priority].setdefault(user, deque()).append(waiter)
+            self._queued += 1
+            ADMISSION_QUEUE_DEPTH.set(self._queued)
+
+        # Slots freed in this process are handed out by `_release`, those freed by other processes are polled for
+        wait_until = started + self.queue_timeout
+        poll_interval = self.poll_interval if self._slots.shared else self.queue_timeout
+        while (remaining := wait_until - time.monotonic()) > 0:
+            if waiter.event.wait(min(remaining, poll_interval)):
+                break
+            with self._lock:
+                self._dispatch()
+
+        with self._lock:
+            if waiter.slot is not None:
+                ADMISSION_WAIT_SECONDS.observe(time.monotonic() - started, priority=priority)
+                return AdmissionTicket(self, waiter.slot)
+            if waiter.rejected is None:
+                self._remove(waiter)
+                waiter.rejected = "timeout"
+            raise self._reject(waiter.rejected)
+
+    def _limit(self, priority: str) -> int:
+        if priority in INTERACTIVE_PRIORITIES:
+            return self.max_concurrent
+        return self.max_concurrent - self.reserved_slots
+
+    def _release(self, slot: int, held_seconds: float) -> None:
+        with self._lock:
+            self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held_seconds
+            self._in_flight -= 1
+            self._slots.release(slot)
+            self._dispatch()
+            ADMISSION_IN_FLIGHT.set(self._in_flight)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, called with the lock held"""
+        while self._queued:
+            if any(self._queues[p] for p in INTERACTIVE_PRIORITIES):
+                slot = self._slots.take(self.max_concurrent)
+            else:
+                slot = self._slots.take(self.max_concurrent - self.reserved_slots)
+            if slot is None:
+                return
+            priority = self._next_priority(slot)
+            if priority is None:
+                self._slots.release(slot)
+                return
+            # Hand the slot to the next user in turn, who moves to the back of the rotation
+            queues = self._queues[priority]
+            user, waiters = next(iter(queues.items()))
+            waiter = waiters.popleft()
+            queues.pop(user)
+            if waiters:
+                queues[user] = waiters
+            elif not queues:
+                self._credits[priority] = 0
+            self._queued -= 1
+            self._in_flight += 1
+            waiter.slot = slot
+            waiter.event.set()
+            ADMISSION_IN_FLIGHT.set(self._in_flight)
+            ADMISSION_QUEUE_DEPTH.set(self._queued)
+
+    def _next_priority(self, slot: int) -> str | None:
+        """Class served by `slot`: a starving class first, else by smooth weighted round-robin"""
+        eligible = [p for p in PRIORITIES if self._queues[p] and slot < self._limit(p)]
+        if not eligible:
+            return None
+        oldest = {p: min(waiters[0].enqueued_at for waiters in self._queues[p].values()) for p in eligible}
+        starving = min(eligible, key=oldest.get)
+        if time.monotonic() - oldest[starving] >= self.aging_seconds:
+            return starving
+
+        total_weight = sum(PRIORITY_WEIGHTS[p] for p in eligible)
+        for p in eligible:
+            self._credits[p] += PRIORITY_WEIGHTS[p]
+        # Ties go to the more urgent class, `eligible` is ordered by urgency
+        chosen = max(eligible, key=self._credits.get)
+        self._credits[chosen] -= total_weight
+        return chosen
+
+    def _displace_for(self, user: str, priority: str) -> bool:
+        """Free a queue entry for `user` by rejecting the newest waiter of a lower class or of a user holding more"""
+        lower = [p for p in PRIORITIES[PRIORITIES.index(priority) + 1 :] if self._queues[p]]
+        if lower:
+            return self._displace_newest(lower[-1], user)
+        queues = self._queues[priority]
+        if not queues:
+            return False
+        heaviest, waiters = max(queues.items(), key=lambda item: len(item[1]))
+        if heaviest == user or len(waiters) <= len(queues.get(user, ())) + 1:
+            return False
+        return self._displace_newest(priority, user, heaviest)
+
+    def _displace_newest(self, priority: str, user: str, victim: str | None = None) -> bool:
+        queues = self._queues[priority]
+        if victim is None:
+            # The user queueing the most, of equals the one who queued last
+            victim = max(queues.items(), key=lambda item: (len(item[1]), item[1][-1].enqueued_at))[0]
+        waiters = queues[victim]
+        waiter = waiters.pop()
+        if not waiters:
+            queues.pop(victim)
+            if not queues:
+                self._credits[priority] = 0
+        self._queued -= 1
+        waiter.rejected = "displaced"
+        waiter.event.set()
+        logger.debug(f"Displaced a queued {priority} parse of {victim} to admit {user}")
+        return True
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queues = self._queues[waiter.priority]
+        waiters = queues.get(waiter.user)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            queues.pop(waiter.user)
+            if not queues:
+                self._credits[waiter.priority] = 0
+        self._queued -= 1
+        ADMISSION_QUEUE_DEPTH.set(self._queued)
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        # Time until the queue ahead drains through all slots
+        retry_after = max(1, math.ceil(self._hold_seconds * (self._queued + 1) / self.max_concurrent))
+        ADMISSION_REJECTED.inc(reason=reason)
+        return AdmissionRejected(reason, retry_after)
+
+
+_controller: AdmissionController | None = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController | None:
+    """Process-wide admission controller, or None when QOCR_ADMISSION_MAX_CONCURRENT disables it"""
+    global _controller
+    from django.conf import settings
+
+    max_concurrent = getattr(settings, "QOCR_ADMISSION_MAX_CONCURRENT", 0)
+    if max_concurrent <= 0:
+        return None
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                max_concurrent=max_concurrent,
+                max_queue=settings.QOCR_ADMISSION_MAX_QUEUE,
+                queue_timeout=settings.QOCR_ADMISSION_QUEUE_TIMEOUT,
+                reserved_slots=settings.QOCR_ADMISSION_RESERVED_SLOTS,
+                aging_seconds=settings.QOCR_ADMISSION_AGING_SECONDS,
+                slots_dir=settings.QOCR_ADMISSION_DIR or None,
+            )
+        return _controller
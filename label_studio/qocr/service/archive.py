@@ -0,0 +1,161 @@
+import io
+import json
+import os
+import shutil
+import zipfile
+from pathlib import Path
+from typing import Iterator, Literal
+
+from loguru import logger
+
+from .artifact_store import ArtifactStore
+
+ArchiveMode = Literal["inline", "download"]
+
+MANIFEST_FILE = "archive.json"
+CHUNK_SIZE = 256 * 1024
+# Compressed image formats are stored as they are, deflating them again costs CPU and saves nothing
+STORED_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable file object collecting what `ZipFile` writes until it is drained"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_zip_archive(
+    file_name: str,
+    markdown: str,
+    content_list: list,
+    images_path: str | None,
+    model_pdf: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield a zip archive of the markdown, the content list, the extracted images and, when mineru rendered
+    one, the layout PDF in chunks.
+
+    The archive is written straight to the response with data descriptors, so it is never held in memory
+    as a whole; at most one `chunk_size` read of an image plus its compressed output is buffered.
+    """
+    stem = Path(file_name).stem or "document"
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f"{stem}.md", markdown)
+        archive.writestr(f"{stem}_content_list.json", json.dumps(content_list, ensure_ascii=False))
+        yield sink.drain()
+
+        files = []
+        if images_path:
+            try:
+                image_entries = [entry for entry in os.scandir(images_path) if entry.is_file()]
+            except FileNotFoundError:
+                logger.warning(f"Images of {file_name} were evicted before the archive was downloaded")
+                image_entries = []
+            files = [(entry.path, f"images/{entry.name}") for entry in sorted(image_entries, key=lambda e: e.name)]
+        if model_pdf and os.path.isfile(model_pdf):
+            files.append((model_pdf, f"{stem}_layout.pdf"))
+        for path, arcname in files:
+            try:
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                source = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            if Path(path).suffix.lower() in STORED_SUFFIXES:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with source, archive.open(info, mode="w") as target:
+                while chunk := source.read(chunk_size):
+                    target.write(chunk)
+                    if len(sink) >= chunk_size:
+                        yield sink.drain()
+            if len(sink) >= chunk_size:
+                yield sink.drain()
+    # Remaining entry data and the central directory
+    yield sink.drain()
+
+
+def save_archive(
+    store: ArtifactStore,
+    file_name: str,
+    markdown: str,
+    content_list: list,
+    images_path: str | None,
+    workspace: str | None = None,
+    model_pdf: str | None = None,
+) -> str:
+    """Record what the archive of a parse result contains and return its download handle.
+
+    The handle names the artifact workspace holding the manifest: `workspace` of the parse itself, or a
+    fresh one for results answered from the result cache. It stays valid until the workspace is evicted.
+    """
+    manifest = {
+        "file_name": file_name,
+        "markdown": markdown,
+        "content_list": content_list,
+        "images_path": images_path,
+        "model_pdf": model_pdf or None,
+    }
+    workspace = store.workspace_of(workspace)
+    if workspace is not None:
+        _write_manifest(workspace, manifest)
+        return workspace.name
+    with store.workspace() as workspace:
+        _write_manifest(workspace, manifest)
+    return workspace.name
+
+
+def keep_archive(store: ArtifactStore, archive_id: str, seconds: int) -> None:
+    """Keep the archive behind a handle downloadable for `seconds`, longer than the artifact store TTL.
+
+    Images and the layout PDF of a result answered from the result cache live in the cache, which may evict
+    them sooner, so they are copied into the workspace of the handle first.
+    """
+    manifest = load_archive(store, archive_id)
+    if manifest is None:
+        return
+    workspace = store.root_dir / archive_id
+    images_path = manifest.get("images_path")
+    if images_path and store.workspace_of(images_path) != workspace and os.path.isdir(images_path):
+        shutil.copytree(images_path, workspace / "images", dirs_exist_ok=True)
+        manifest["images_path"] = str(workspace / "images")
+    model_pdf = manifest.get("model_pdf")
+    if model_pdf and store.workspace_of(model_pdf) != workspace and os.path.isfile(model_pdf):
+        manifest["model_pdf"] = str(shutil.copy2(model_pdf, workspace / Path(model_pdf).name))
+    _write_manifest(workspace, manifest)
+    store.keep(archive_id, seconds)
+
+
+def _write_manifest(workspace: Path, manifest: dict) -> None:
+    tmp_file = workspace / f".{MANIFEST_FILE}.{os.getpid()}"
+    tmp_file.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_file, workspace / MANIFEST_FILE)
+
+
+def load_archive(store: ArtifactStore, archive_id: str) -> dict | None:
+    """Manifest saved by `save_archive`, or None for unknown, expired or malformed handles"""
+    workspace = store.get(archive_id)
+    if workspace is None:
+        return None
+    try:
+        return json.loads((workspace / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
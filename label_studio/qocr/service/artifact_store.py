@@ -0,0 +1,227 @@
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: leases are only visible inside the owning process
+    fcntl = None
+
+LEASE_FILE = ".lease"
+# Epoch seconds until which a workspace outlives the store TTL
+KEEP_FILE = ".keep"
+WORKSPACE_NAME_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _dir_size(path: Path) -> int:
+    size = 0
+    for p in path.rglob("*"):
+        try:
+            if p.is_file():
+                size += p.stat().st_size
+        except FileNotFoundError:
+            continue
+    return size
+
+
+class ArtifactStore:
+    """Managed disk space for parse outputs.
+
+    Every parse runs in its own workspace directory. While the parse is running the workspace is leased
+    (an exclusive `flock` on its lease file, so other processes sharing the directory see it too) and is
+    never evicted. Afterwards the workspace stays readable until the caller releases it, its TTL expires or
+    the store exceeds `max_bytes`, whichever comes first; over quota, the least recently used workspaces
+    are evicted first. `keep()` extends the TTL of a single workspace, such a workspace is evicted over quota
+    only after all others. `sweep()` applies TTL and quota and runs periodically on a background thread.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int = 0, ttl: int = 3600) -> None:
+        """
+        Args:
+            root_dir: Directory holding the workspaces
+            max_bytes: Size cap of all workspaces, 0 disables the quota
+            ttl: Seconds an idle workspace is kept, 0 keeps workspaces until they are released or evicted
+        """
+        self.root_dir = Path(root_dir)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self._active: set[Path] = set()
+        self._lock = threading.Lock()
+        self._sweeper: threading.Thread | None = None
+        self._also_sweep: list = []
+
+    @contextmanager
+    def workspace(self, keep: bool = True) -> Iterator[Path]:
+        """Create a fresh workspace that is protected from eviction until the block exits.
+
+        With `keep` the workspace outlives the block so its outputs can still be read, otherwise it is deleted.
+        """
+        path = self.root_dir / uuid.uuid4().hex
+        path.mkdir()
+        lease = open(path / LEASE_FILE, "wb")
+        with self._lock:
+            self._active.add(path)
+        try:
+            if fcntl is not None:
+                fcntl.flock(lease, fcntl.LOCK_EX)
+            yield path
+        finally:
+            with self._lock:
+                self._active.discard(path)
+            lease.close()
+            if not keep:
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                # The TTL and LRU clocks start once the parse is done
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    pass
+
+    def workspace_of(self, path: str | os.PathLike | None) -> Path | None:
+        """Workspace directory containing `path`, or None when `path` is outside the store"""
+        if not path:
+            return None
+        try:
+            relative_path = Path(path).relative_to(self.root_dir)
+        except ValueError:
+            return None
+        if not relative_path.parts:
+            return None
+        return self.root_dir / relative_path.parts[0]
+
+    def get(self, name: str) -> Path | None:
+        """Existing workspace called `name`, touched so it counts as recently used"""
+        if not WORKSPACE_NAME_PATTERN.match(name):
+            return None
+        path = self.root_dir / name
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def release(self, path: str | os.PathLike | None) -> None:
+        """Delete a workspace whose outputs are no longer needed, `path` may also point inside the workspace"""
+        workspace = self.workspace_of(path)
+        if workspace is None or workspace in self._active:
+            return
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    def keep(self, name: str, seconds: int) -> None:
+        """Keep the workspace called `name` for at least `seconds` from now, regardless of the store TTL"""
+        path = self.get(name)
+        if path is None:
+            return
+        tmp_file = path / f".{KEEP_FILE}.{os.getpid()}"
+        tmp_file.write_text(str(time.time() + seconds), encoding="utf-8")
+        os.replace(tmp_file, path / KEEP_FILE)
+
+    @staticmethod
+    def _kept_until(path: Path) -> float:
+        try:
+            return float((path / KEEP_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return 0
+
+    def _is_leased(self, path: Path) -> bool:
+        if path in self._active:
+            return True
+        if fcntl is None:
+            return False
+        try:
+            with open(path / LEASE_FILE, "rb") as lease:
+                fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        except OSError:
+            # No lease file: a workspace being created right now, or a stray directory
+            return False
+        return False
+
+    def sweep(self) -> None:
+        """Evict idle workspaces past their TTL, then least recently used ones until the store fits its quota"""
+        now = time.time()
+        entries = []
+        total_size = 0
+        for path in self.root_dir.iterdir():
+            if not path.is_dir() or self._is_leased(path):
+                continue
+            try:
+                last_used = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            kept = self._kept_until(path) > now
+            if self.ttl > 0 and now - last_used > self.ttl and not kept:
+                shutil.rmtree(path, ignore_errors=True)
+                logger.debug(f"Evicted expired parse workspace {path.name}")
+                continue
+            size = _dir_size(path)
+            entries.append((kept, last_used, size, path))
+            total_size += size
+
+        if self.max_bytes <= 0 or total_size <= self.max_bytes:
+            return
+        for _, _, size, path in sorted(entries, key=lambda entry: entry[:2]):
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+            logger.debug(f"Evicted parse workspace {path.name} ({size} bytes)")
+            if total_size <= self.max_bytes:
+                break
+
+    def start_sweeper(self, interval: int, *also_sweep) -> None:
+        """Sweep this store (and any other object with a `sweep()` method) every `interval` seconds.
+
+        Calling it again once the sweeper runs adds `also_sweep` to the objects swept by the running thread.
+        """
+        if interval <= 0:
+            return
+        with self._lock:
+            self._also_sweep.extend(also_sweep)
+            if self._sweeper is not None:
+                return
+
+            def run() -> None:
+                while True:
+                    time.sleep(interval)
+                    with self._lock:
+                        stores = [self, *self._also_sweep]
+                    for store in stores:
+                        try:
+                            store.sweep()
+                        except Exception as e:
+                            logger.warning(f"QOCR sweep of {type(store).__name__} failed: {e}")
+
+            self._sweeper = threading.Thread(target=run, name="qocr-artifact-sweeper", daemon=True)
+            self._sweeper.start()
+
+
+_store: ArtifactStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide artifact store configured by the QOCR_ARTIFACT_* settings, swept in the background"""
+    global _store
+    from django.conf import settings
+
+    from .image_store import get_image_store
+
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(
+                settings.QOCR_ARTIFACT_DIR,
+                max_bytes=settings.QOCR_ARTIFACT_MAX_BYTES,
+                ttl=settings.QOCR_ARTIFACT_TTL,
+            )
+            _store.start_sweeper(settings.QOCR_ARTIFACT_SWEEP_INTERVAL, get_image_store())
+        return _store
@@ -0,0 +1,150 @@
+import itertools
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from loguru import logger
+
+
+class ParseCancelled(RuntimeError):
+    """Raised when a parse stops before its last page, `reason` is "disconnect" or "deadline" """
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f"Parse stopped ({self.reason})"
+
+
+class CancellationToken:
+    """Stop signal of one parse, checked by the parser between page ranges.
+
+    The token is stopped once `cancel()` was called, e.g. because the client disconnected, or once
+    `deadline` (a `time.time()` timestamp, comparable across processes) has passed. A cancelled parse
+    has nobody to answer and is abandoned; a parse past its deadline answers with the pages it finished.
+    """
+
+    def __init__(self, deadline: float | None = None) -> None:
+        self.deadline = deadline
+        self._reason: str | None = None
+        self._callbacks: list[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def reason(self) -> str | None:
+        """Reason passed to `cancel()`, else "deadline" once it has passed, else None"""
+        if self._reason is not None:
+            return self._reason
+        if self.deadline is not None and time.time() >= self.deadline:
+            return "deadline"
+        return None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._reason is not None
+
+    @property
+    def stopped(self) -> bool:
+        return self.reason is not None
+
+    def cancel(self, reason: str = "disconnect") -> None:
+        with self._lock:
+            if self._reason is not None:
+                return
+            self._reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(reason)
+
+    def on_cancel(self, callback: Callable[[str], None]) -> None:
+        """Call `callback(reason)` once the token is cancelled, right away if it already is"""
+        with self._lock:
+            if self._reason is None:
+                self._callbacks.append(callback)
+                return
+        callback(self._reason)
+
+
+def client_socket(environ: dict) -> socket.socket | None:
+    """Duplicate of the client connection of a WSGI request, for servers that expose it (gunicorn, uWSGI).
+
+    Behind a proxy this is the connection of the proxy, which nginx closes when its client goes away.
+    """
+    try:
+        sock = environ.get("gunicorn.socket")
+        if sock is not None:
+            return sock.dup()
+        import uwsgi
+
+        return socket.fromfd(uwsgi.connection_fd(), socket.AF_INET, socket.SOCK_STREAM)
+    except (ImportError, AttributeError, OSError):
+        return None
+
+
+def _peer_closed(sock: socket.socket) -> bool:
+    """Whether the peer closed the connection, the request body has been read by then so nothing is consumed"""
+    try:
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+    except (BlockingIOError, InterruptedError):
+        return False
+    except OSError:
+        return True
+
+
+class DisconnectMonitor:
+    """Background thread cancelling the token of a parse once its client closed the connection.
+
+    Every watched connection is peeked each `interval` seconds, one non-blocking syscall per running parse.
+    """
+
+    def __init__(self, interval: float = 1.0) -> None:
+        self.interval = interval
+        self._watched: dict[int, tuple[socket.socket, CancellationToken]] = {}
+        self._watch_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @contextmanager
+    def watch(self, sock: socket.socket, token: CancellationToken) -> Iterator[None]:
+        """Cancel `token` when the peer of `sock` disconnects while the block runs"""
+        watch_id = next(self._watch_ids)
+        with self._lock:
+            self._watched[watch_id] = (sock, token)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="qocr-disconnect-monitor", daemon=True)
+                self._thread.start()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._watched.pop(watch_id, None)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                watched = list(self._watched.values())
+            for sock, token in watched:
+                if not token.stopped and _peer_closed(sock):
+                    logger.debug("Client of a running parse disconnected, stopping it at the next page boundary")
+                    token.cancel("disconnect")
+
+
+_monitor: DisconnectMonitor | None = None
+_monitor_lock = threading.Lock()
+
+
+def get_disconnect_monitor() -> DisconnectMonitor | None:
+    """Process-wide disconnect monitor, or None when QOCR_CANCEL_ON_DISCONNECT is off"""
+    global _monitor
+    from django.conf import settings
+
+    if not getattr(settings, "QOCR_CANCEL_ON_DISCONNECT", False):
+        return None
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = DisconnectMonitor(interval=settings.QOCR_DISCONNECT_CHECK_INTERVAL)
+        return _monitor
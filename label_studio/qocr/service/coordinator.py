@@ -0,0 +1,689 @@
+import atexit
+import json
+import math
+import os
+import pickle
+import shutil
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+from mineru.utils.enum_class import ModelInvokeConfigDict
+
+from ..metrics import COORDINATOR_JOBS, COORDINATOR_REQUEUED, stage_timer
+from ..model.entity import OCROutput
+from .cancellation import CancellationToken, ParseCancelled
+from .parse_service import REQUEST_ERRORS, ParseService, invoke_config_key
+from .worker_pool import ParseWorkerPool, get_parse_pool
+
+
+class CoordinatorError(RuntimeError):
+    """Raised when no worker node can take a parse, or a routed parse fails or does not finish in time"""
+
+
+@dataclass
+class NodeStatus:
+    node_id: str
+    capacity: int
+    # invoke_config keys whose models the node has loaded
+    models: list[str]
+    queued: int = 0
+    in_flight: int = 0
+    # Stopping nodes finish their running jobs but take no new ones
+    accepting: bool = True
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.in_flight - self.queued
+
+
+class CoordinatorBackend(ABC):
+    """Shared state of a coordinator: node heartbeats, per-node job queues, results and cancellations.
+
+    Jobs and results are opaque bytes. A popped job stays in the node's running list until it is acknowledged,
+    so the jobs of a node that died can be handed to another one.
+    """
+
+    @abstractmethod
+    def heartbeat(self, node_id: str, status: dict, ttl: float) -> None:
+        """Mark the node alive for `ttl` seconds, reporting its `capacity`, `models` and whether it is `accepting`"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def leave(self, node_id: str) -> None:
+        """Drop the heartbeat of a node that stopped, jobs still queued for it are reaped like those of a dead node"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def nodes(self) -> list[NodeStatus]:
+        """Live nodes with their queue lengths"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def dead_nodes(self) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def drain(self, node_id: str) -> tuple[list[bytes], list[bytes]]:
+        """Forget a dead node and take its running and queued jobs, an empty result when another reaper drains it"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def take_queued(self, node_id: str) -> list[bytes]:
+        """Take the jobs queued for a stopping node, leaving the ones it is running"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def push(self, node_id: str, job: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def pop(self, node_id: str, timeout: float) -> bytes | None:
+        """Next job of the node, moved to its running list, or None after `timeout` seconds"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def ack(self, node_id: str, job: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put_result(self, job_id: str, result: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def wait_result(self, job_id: str, timeout: float) -> bytes | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def cancel(self, job_id: str, reason: str, ttl: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def cancel_reason(self, job_id: str) -> str | None:
+        raise NotImplementedError
+
+
+def _seconds(timeout: float) -> int:
+    # Blocking Redis commands before 6.0 take whole seconds, and 0 blocks forever
+    return max(1, math.ceil(timeout))
+
+
+class RedisCoordinatorBackend(CoordinatorBackend):
+    """Coordinator state in Redis, shared by the web processes and the worker nodes of every host"""
+
+    def __init__(self, connection, prefix: str = "qocr:coordinator") -> None:
+        self.redis = connection
+        self.prefix = prefix
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def _node_ids(self) -> list[str]:
+        members = self.redis.smembers(self._key("nodes"))
+        return sorted(member.decode() if isinstance(member, bytes) else member for member in members)
+
+    def heartbeat(self, node_id: str, status: dict, ttl: float) -> None:
+        pipe = self.redis.pipeline()
+        pipe.set(self._key("node", node_id), json.dumps(status), ex=_seconds(ttl))
+        pipe.sadd(self._key("nodes"), node_id)
+        pipe.execute()
+
+    def leave(self, node_id: str) -> None:
+        self.redis.delete(self._key("node", node_id))
+
+    def nodes(self) -> list[NodeStatus]:
+        node_ids = self._node_ids()
+        pipe = self.redis.pipeline()
+        for node_id in node_ids:
+            pipe.get(self._key("node", node_id))
+            pipe.llen(self._key("jobs", node_id))
+            pipe.llen(self._key("running", node_id))
+        replies = pipe.execute()
+        nodes = []
+        for i, node_id in enumerate(node_ids):
+            status, queued, in_flight = replies[3 * i : 3 * i + 3]
+            if status is None:
+                continue
+            status = json.loads(status)
+            nodes.append(
+                NodeStatus(
+                    node_id, status["capacity"], status["models"], queued, in_flight, status.get("accepting", True)
+                )
+            )
+        return nodes
+
+    def dead_nodes(self) -> list[str]:
+        node_ids = self._node_ids()
+        pipe = self.redis.pipeline()
+        for node_id in node_ids:
+            pipe.exists(self._key("node", node_id))
+        return [node_id for node_id, alive in zip(node_ids, pipe.execute()) if not alive]
+
+    def drain(self, node_id: str) -> tuple[list[bytes], list[bytes]]:
+        if not self.redis.set(self._key("drain", node_id), 1, nx=True, ex=60):
+            return [], []
+        drained = []
+        for name in ("running", "jobs"):
+            jobs = []
+            # Oldest first, jobs are pushed on the left
+            while (job := self.redis.rpop(self._key(name, node_id))) is not None:
+                jobs.append(job)
+            drained.append(jobs)
+        self.redis.srem(self._key("nodes"), node_id)
+        return drained[0], drained[1]
+
+    def take_queued(self, node_id: str) -> list[bytes]:
+        jobs = []
+        while (job := self.redis.rpop(self._key("jobs", node_id))) is not None:
+            jobs.append(job)
+        return jobs
+
+    def push(self, node_id: str, job: bytes) -> None:
+        self.redis.lpush(self._key("jobs", node_id), job)
+
+    def pop(self, node_id: str, timeout: float) -> bytes | None:
+        return self.redis.brpoplpush(self._key("jobs", node_id), self._key("running", node_id), _seconds(timeout))
+
+    def ack(self, node_id: str, job: bytes) -> None:
+        self.redis.lrem(self._key("running", node_id), 1, job)
+
+    def put_result(self, job_id: str, result: bytes, ttl: float) -> None:
+        pipe = self.redis.pipeline()
+        pipe.rpush(self._key("result", job_id), result)
+        pipe.expire(self._key("result", job_id), _seconds(ttl))
+        pipe.execute()
+
+    def wait_result(self, job_id: str, timeout: float) -> bytes | None:
+        reply = self.redis.blpop([self._key("result", job_id)], _seconds(timeout))
+        return reply[1] if reply is not None else None
+
+    def cancel(self, job_id: str, reason: str, ttl: float) -> None:
+        self.redis.set(self._key("cancel", job_id), reason, ex=_seconds(ttl))
+
+    def cancel_reason(self, job_id: str) -> str | None:
+        reason = self.redis.get(self._key("cancel", job_id))
+        return reason.decode() if isinstance(reason, bytes) else reason
+
+
+class LocalCoordinatorBackend(CoordinatorBackend):
+    """In-memory stand-in of the Redis backend, for nodes running as threads of a single process"""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        # node id -> (expiry, status)
+        self._heartbeats: dict[str, tuple[float, dict]] = {}
+        self._jobs: dict[str, deque[bytes]] = defaultdict(deque)
+        self._running: dict[str, list[bytes]] = defaultdict(list)
+        # job id -> (expiry, value)
+        self._results: dict[str, tuple[float, bytes]] = {}
+        self._cancelled: dict[str, tuple[float, str]] = {}
+
+    def heartbeat(self, node_id: str, status: dict, ttl: float) -> None:
+        with self._cond:
+            self._heartbeats[node_id] = (time.monotonic() + ttl, status)
+
+    def leave(self, node_id: str) -> None:
+        with self._cond:
+            if node_id in self._heartbeats:
+                self._heartbeats[node_id] = (0.0, self._heartbeats[node_id][1])
+
+    def nodes(self) -> list[NodeStatus]:
+        now = time.monotonic()
+        with self._cond:
+            return [
+                NodeStatus(
+                    node_id,
+                    status["capacity"],
+                    status["models"],
+                    len(self._jobs[node_id]),
+                    len(self._running[node_id]),
+                    status.get("accepting", True),
+                )
+                for node_id, (expiry, status) in sorted(self._heartbeats.items())
+                if expiry > now
+            ]
+
+    def dead_nodes(self) -> list[str]:
+        now = time.monotonic()
+        with self._cond:
+            return [node_id for node_id, (expiry, _) in self._heartbeats.items() if expiry <= now]
+
+    def drain(self, node_id: str) -> tuple[list[bytes], list[bytes]]:
+        with self._cond:
+            if self._heartbeats.pop(node_id, None) is None:
+                return [], []
+            return self._running.pop(node_id, []), list(self._jobs.pop(node_id, ()))
+
+    def take_queued(self, node_id: str) -> list[bytes]:
+        with self._cond:
+            return list(self._jobs.pop(node_id, ()))
+
+    def push(self, node_id: str, job: bytes) -> None:
+        with self._cond:
+            self._jobs[node_id].append(job)
+            self._cond.notify_all()
+
+    def pop(self, node_id: str, timeout: float) -> bytes | None:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._jobs[node_id], timeout):
+                return None
+            job = self._jobs[node_id].popleft()
+            self._running[node_id].append(job)
+            return job
+
+    def ack(self, node_id: str, job: bytes) -> None:
+        with self._cond:
+            if job in self._running[node_id]:
+                self._running[node_id].remove(job)
+
+    def put_result(self, job_id: str, result: bytes, ttl: float) -> None:
+        now = time.monotonic()
+        with self._cond:
+            for expired in [key for key, (expiry, _) in self._results.items() if expiry <= now]:
+                del self._results[expired]
+            for expired in [key for key, (expiry, _) in self._cancelled.items() if expiry <= now]:
+                del self._cancelled[expired]
+            self._results.setdefault(job_id, (now + ttl, result))
+            self._cond.notify_all()
+
+    def wait_result(self, job_id: str, timeout: float) -> bytes | None:
+        with self._cond:
+            if not self._cond.wait_for(lambda: job_id in self._results, timeout):
+                return None
+            return self._results.pop(job_id)[1]
+
+    def cancel(self, job_id: str, reason: str, ttl: float) -> None:
+        with self._cond:
+            self._cancelled[job_id] = (time.monotonic() + ttl, reason)
+
+    def cancel_reason(self, job_id: str) -> str | None:
+        with self._cond:
+            entry = self._cancelled.get(job_id)
+        return entry[1] if entry is not None else None
+
+
+def _pick_node(nodes: list[NodeStatus], config_key: str) -> NodeStatus:
+    """Node with the models of `config_key` and a free slot, else the node with the most free slots, which loads
+    them, else the least loaded node with the models"""
+    affine = [node for node in nodes if config_key in node.models]
+    free_affine = [node for node in affine if node.free > 0]
+    if free_affine:
+        return max(free_affine, key=lambda node: node.free)
+    free = [node for node in nodes if node.free > 0]
+    if free:
+        return max(free, key=lambda node: node.free)
+    return min(affine or nodes, key=lambda node: (node.in_flight + node.queued) / max(node.capacity, 1))
+
+
+class ParseCoordinator:
+    """Spreads parses over worker nodes on several hosts.
+
+    Nodes (`CoordinatorNode`, started with `manage.py qocr_node`) report their capacity and the invoke_configs whose
+    models they have loaded in heartbeats. A parse goes to a node holding its models with a free slot, else to the
+    node with the most free slots, else it queues at the least loaded node holding the models. Nodes whose heartbeat
+    stops are reaped by the remaining nodes: their queued jobs are routed again, and so are their running jobs until
+    a job has been started `max_attempts` times.
+
+    Nodes read documents and write outputs under `shared_dir` (QOCR_OUTPUT_DIR), which every host mounts; documents
+    elsewhere, e.g. Django's temporary uploads, are copied to `upload_dir` inside it first.
+    """
+
+    def __init__(
+        self,
+        backend: CoordinatorBackend,
+        shared_dir: str,
+        upload_dir: str,
+        job_timeout: float = 3600,
+        max_attempts: int = 2,
+        result_ttl: float = 600,
+    ) -> None:
+        self.backend = backend
+        self.shared_dir = Path(shared_dir).resolve()
+        self.upload_dir = Path(upload_dir)
+        self.job_timeout = job_timeout
+        self.max_attempts = max(max_attempts, 1)
+        self.result_ttl = result_ttl
+
+    def submit(
+        self, invoke_config: ModelInvokeConfigDict, cancel_token: CancellationToken | None = None, **kwargs
+    ) -> OCROutput:
+        """Parse a document with `ParseService.process_document` on a worker node and wait for the output"""
+        return self._run("process_document", invoke_config, kwargs, cancel_token)
+
+    def submit_batch(self, invoke_config: ModelInvokeConfigDict, **kwargs) -> list[OCROutput]:
+        """Parse several documents with one `ParseService.process_documents` call on a worker node"""
+        return self._run("process_documents", invoke_config, kwargs)
+
+    def _run(
+        self,
+        method: str,
+        invoke_config: ModelInvokeConfigDict,
+        kwargs: dict,
+        cancel_token: CancellationToken | None = None,
+    ) -> OCROutput | list[OCROutput]:
+        job_id = uuid.uuid4().hex
+        staging_dir = self.upload_dir / job_id
+        try:
+            job = {
+                "job_id": job_id,
+                "method": method,
+                "invoke_config": invoke_config,
+                "kwargs": self._stage(kwargs, staging_dir),
+                "cancellable": cancel_token is not None,
+                "deadline": cancel_token.deadline if cancel_token is not None else None,
+                "attempts": 0,
+            }
+            self.route(job)
+            if cancel_token is not None:
+                cancel_token.on_cancel(lambda reason: self.backend.cancel(job_id, reason, self.result_ttl))
+            result = self.backend.wait_result(job_id, self.job_timeout)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        if result is None:
+            raise CoordinatorError(f"Parse job {job_id} did not finish within {self.job_timeout}s")
+        status, payload = pickle.loads(result)
+        if status == "raise":
+            raise payload
+        if status != "ok":
+            raise CoordinatorError(payload)
+        if isinstance(payload, list):
+            return [OCROutput.model_validate(item) for item in payload]
+        return OCROutput.model_validate(payload)
+
+    def _stage(self, kwargs: dict, staging_dir: Path) -> dict:
+        """Job arguments with documents outside the shared directory copied into it"""
+        kwargs = dict(kwargs)
+        # With `pdf_bytes` the content travels with the job and `pdf_path` only names it
+        if kwargs.get("pdf_path") and kwargs.get("pdf_bytes") is None:
+            kwargs["pdf_path"] = self._stage_file(kwargs["pdf_path"], staging_dir / "0")
+        if kwargs.get("pdf_paths"):
+            kwargs["pdf_paths"] = [
+                self._stage_file(path, staging_dir / str(i)) for i, path in enumerate(kwargs["pdf_paths"])
+            ]
+        return kwargs
+
+    def _stage_file(self, path: str, target_dir: Path) -> str:
+        if Path(path).resolve().is_relative_to(self.shared_dir):
+            return path
+        target_dir.mkdir(parents=True, exist_ok=True)
+        # The name is kept, output names and office conversion depend on it
+        target = target_dir / Path(path).name
+        shutil.copyfile(path, target)
+        return str(target)
+
+    def route(self, job: dict) -> str:
+        """Queue a job at the node picked for its invoke_config, returning the node id"""
+        nodes = [node for node in self.backend.nodes() if node.accepting]
+        if not nodes:
+            raise CoordinatorError("No QOCR worker node is alive")
+        config_key = invoke_config_key(job["invoke_config"])
+        node = _pick_node(nodes, config_key)
+        COORDINATOR_JOBS.inc(affinity="hit" if config_key in node.models else "miss")
+        self.backend.push(node.node_id, pickle.dumps(job))
+        return node.node_id
+
+    def reap(self) -> None:
+        """Route the jobs of nodes whose heartbeat expired to live nodes"""
+        for node_id in self.backend.dead_nodes():
+            running, queued = self.backend.drain(node_id)
+            if running or queued:
+                logger.warning(f"QOCR worker node {node_id} is gone, requeueing {len(running) + len(queued)} jobs")
+            for raw_job, started in [*((job, True) for job in running), *((job, False) for job in queued)]:
+                job = pickle.loads(raw_job)
+                if started:
+                    job["attempts"] += 1
+                self._reroute(job)
+
+    def hand_over(self, node_id: str) -> None:
+        """Route the jobs still queued for a stopping node to the other nodes, its running jobs stay with it"""
+        queued = self.backend.take_queued(node_id)
+        if queued:
+            logger.info(f"QOCR worker node {node_id} is stopping, handing over {len(queued)} queued jobs")
+        for raw_job in queued:
+            self._reroute(pickle.loads(raw_job))
+
+    def _reroute(self, job: dict) -> None:
+        """Route a job taken from another node again, or answer it with an error when it cannot run anymore"""
+        if job["attempts"] >= self.max_attempts:
+            message = f"Parse job {job['job_id']} was lost with {job['attempts']} worker nodes"
+            self.backend.put_result(job["job_id"], pickle.dumps(("error", message)), self.result_ttl)
+            return
+        try:
+            self.route(job)
+        except CoordinatorError as e:
+            self.backend.put_result(job["job_id"], pickle.dumps(("error", str(e))), self.result_ttl)
+            return
+        COORDINATOR_REQUEUED.inc()
+
+
+class _NodeCancellationToken(CancellationToken):
+    """Token of a job on a worker node, cancelled through the coordinator backend by the process waiting for it"""
+
+    def __init__(self, deadline: float | None, job_id: str, backend: CoordinatorBackend) -> None:
+        super().__init__(deadline)
+        self._job_id = job_id
+        self._backend = backend
+
+    @property
+    def reason(self) -> str | None:
+        if self._reason is None:
+            reason = self._backend.cancel_reason(self._job_id)
+            if reason is not None:
+                self.cancel(reason)
+        return super().reason
+
+
+class CoordinatorNode:
+    """Worker node serving the parse jobs a `ParseCoordinator` routes to it.
+
+    Up to `capacity` jobs run at once, on the node's worker pool when one is given, else in this process. A heartbeat
+    thread reports the capacity and the loaded models every `heartbeat_interval` seconds, and reaps dead nodes.
+    A stopping node stays alive until its running jobs are done, only its queued jobs are handed to other nodes.
+    """
+
+    # Invoke_configs reported as loaded by nodes parsing in-process, mineru keeps their models in memory
+    MAX_REPORTED_MODELS = 8
+
+    def __init__(
+        self,
+        coordinator: ParseCoordinator,
+        capacity: int = 1,
+        node_id: str | None = None,
+        heartbeat_interval: float = 5,
+        heartbeat_timeout: float = 20,
+        service: ParseService | None = None,
+        parse_pool: ParseWorkerPool | None = None,
+    ) -> None:
+        self.coordinator = coordinator
+        self.backend = coordinator.backend
+        self.capacity = max(capacity, 1)
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = max(heartbeat_timeout, 2 * heartbeat_interval)
+        self.service = service
+        self.parse_pool = parse_pool
+        self._models: OrderedDict[str, None] = OrderedDict()
+        self._models_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._left = threading.Event()
+        self._heartbeat_thread: threading.Thread | None = None
+        self._serve_threads: list[threading.Thread] = []
+
+    @classmethod
+    def from_settings(
+        cls, coordinator: ParseCoordinator, capacity: int | None = None, node_id: str | None = None
+    ) -> "CoordinatorNode":
+        """Node configured from the QOCR_NODE_* Django settings, parsing on the worker pool if it is enabled"""
+        from django.conf import settings
+
+        parse_pool = get_parse_pool()
+        return cls(
+            coordinator,
+            capacity=capacity or settings.QOCR_NODE_CAPACITY,
+            node_id=node_id,
+            heartbeat_interval=settings.QOCR_NODE_HEARTBEAT_INTERVAL,
+            heartbeat_timeout=settings.QOCR_NODE_HEARTBEAT_TIMEOUT,
+            service=None if parse_pool is not None else ParseService.from_settings(),
+            parse_pool=parse_pool,
+        )
+
+    def start(self) -> None:
+        self._heartbeat()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop, name=f"qocr-node-heartbeat-{self.node_id}", daemon=True
+        )
+        self._heartbeat_thread.start()
+        for i in range(self.capacity):
+            thread = threading.Thread(target=self._serve, name=f"qocr-node-{self.node_id}-{i}", daemon=True)
+            thread.start()
+            self._serve_threads.append(thread)
+        logger.info(f"QOCR worker node {self.node_id} serving {self.capacity} jobs at once")
+
+    def stop(self) -> None:
+        """Take no further jobs, the ones running finish; `join()` waits for them"""
+        self._stopping.set()
+        try:
+            # Routing skips the node from now on, while the heartbeat keeps its running jobs from being reaped
+            self._heartbeat()
+        except Exception as e:
+            logger.warning(f"QOCR worker node {self.node_id} heartbeat failed: {e}")
+
+    def join(self) -> None:
+        """Wait for the running jobs after `stop()`, then hand over the queued ones and leave"""
+        for thread in self._serve_threads:
+            thread.join()
+        self.coordinator.hand_over(self.node_id)
+        self._left.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+        # Jobs routed before the other processes saw the node stop are drained by the reapers once it is gone,
+        # nothing is running here anymore
+        self.backend.leave(self.node_id)
+        logger.info(f"QOCR worker node {self.node_id} stopped")
+
+    def models(self) -> list[str]:
+        if self.parse_pool is not None:
+            return self.parse_pool.loaded_configs()
+        with self._models_lock:
+            return list(self._models)
+
+    def _heartbeat(self) -> None:
+        status = {
+            "capacity": self.capacity,
+            "models": self.models(),
+            "host": socket.gethostname(),
+            "accepting": not self._stopping.is_set(),
+        }
+        self.backend.heartbeat(self.node_id, status, self.heartbeat_timeout)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._left.wait(self.heartbeat_interval):
+            try:
+                self._heartbeat()
+                self.coordinator.reap()
+            except Exception as e:
+                logger.warning(f"QOCR worker node {self.node_id} heartbeat failed: {e}")
+
+    def _serve(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                raw_job = self.backend.pop(self.node_id, self.heartbeat_interval)
+            except Exception as e:
+                logger.warning(f"QOCR worker node {self.node_id} cannot fetch jobs: {e}")
+                self._stopping.wait(self.heartbeat_interval)
+                continue
+            if raw_job is None:
+                continue
+            job = pickle.loads(raw_job)
+            result = self._run(job)
+            try:
+                self.backend.put_result(job["job_id"], pickle.dumps(result), self.coordinator.result_ttl)
+                self.backend.ack(self.node_id, raw_job)
+            except Exception as e:
+                logger.warning(f"QOCR worker node {self.node_id} lost the result of job {job['job_id']}: {e}")
+
+    def _run(self, job: dict) -> tuple[str, object]:
+        invoke_config = job["invoke_config"]
+        kwargs = dict(job["kwargs"])
+        if job["cancellable"]:
+            kwargs["cancel_token"] = _NodeCancellationToken(job["deadline"], job["job_id"], self.backend)
+        try:
+            # Stage timings travel back with the output and are recorded by the web process
+            with stage_timer(observe=False) as timer:
+                output = self._execute(job["method"], invoke_config, kwargs)
+        except (ParseCancelled, *REQUEST_ERRORS) as e:
+            # Raised as they are by the submitter, which answers them like an in-process parse
+            return "raise", e
+        except Exception as e:
+            logger.exception(f"QOCR worker node {self.node_id} failed job {job['job_id']}: {e}")
+            return "error", f"{type(e).__name__}: {e}"
+
+        if self.service is not None:
+            with self._models_lock:
+                self._models[invoke_config_key(invoke_config)] = None
+                self._models.move_to_end(invoke_config_key(invoke_config))
+                while len(self._models) > self.MAX_REPORTED_MODELS:
+                    self._models.popitem(last=False)
+        outputs = output if isinstance(output, list) else [output]
+        # Outputs of the worker pool carry the timings of the worker process
+        if outputs and not outputs[0].timings:
+            outputs[0].timings = timer.stages
+        if isinstance(output, list):
+            return "ok", [item.model_dump() for item in output]
+        return "ok", output.model_dump()
+
+    def _execute(
+        self, method: str, invoke_config: ModelInvokeConfigDict, kwargs: dict
+    ) -> OCROutput | list[OCROutput]:
+        if self.parse_pool is None:
+            return getattr(self.service, method)(invoke_config=invoke_config, **kwargs)
+        if method == "process_documents":
+            return self.parse_pool.wait(self.parse_pool.submit_batch(invoke_config, **kwargs))
+        return self.parse_pool.wait(self.parse_pool.submit(invoke_config, **kwargs))
+
+
+_coordinator: ParseCoordinator | None = None
+_coordinator_lock = threading.Lock()
+
+
+def get_coordinator() -> ParseCoordinator | None:
+    """Process-wide coordinator of QOCR_COORDINATOR, or None when parses stay on this host.
+
+    With `redis` jobs go to the nodes started by `manage.py qocr_node` on any host, with `local` to a node running
+    inside this process, which exercises the same routing without Redis.
+    """
+    global _coordinator
+    from django.conf import settings
+
+    mode = getattr(settings, "QOCR_COORDINATOR", "")
+    if not mode:
+        return None
+    with _coordinator_lock:
+        if _coordinator is None:
+            if mode == "redis":
+                import django_rq
+
+                backend = RedisCoordinatorBackend(django_rq.get_connection(settings.QOCR_COORDINATOR_QUEUE))
+            elif mode == "local":
+                backend = LocalCoordinatorBackend()
+            else:
+                raise CoordinatorError(f"Unknown QOCR_COORDINATOR {mode!r}, expected 'redis' or 'local'")
+            _coordinator = ParseCoordinator(
+                backend,
+                shared_dir=settings.QOCR_OUTPUT_DIR,
+                upload_dir=settings.QOCR_UPLOAD_DIR,
+                job_timeout=settings.QOCR_COORDINATOR_JOB_TIMEOUT,
+                max_attempts=settings.QOCR_COORDINATOR_MAX_ATTEMPTS,
+            )
+            if mode == "local":
+                node = CoordinatorNode.from_settings(_coordinator)
+                node.start()
+                atexit.register(node.stop)
+        return _coordinator
@@ -0,0 +1,94 @@
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+from loguru import logger
+
+from .result_cache import file_digest
+
+IMAGE_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.(jpg|jpeg|png|gif|webp)$")
+
+
+class ImageStore:
+    """Content-addressed store of extracted images.
+
+    An image is stored once under the sha256 of its bytes, however many pages or documents contain it,
+    so markdown in reference mode can link to `<base url><sha256>.<ext>` and clients can cache it forever.
+    When `max_bytes` is set, `sweep()` evicts the images least recently referenced by a parse.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int = 0) -> None:
+        self.root_dir = Path(root_dir)
+        self.max_bytes = max_bytes
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+    def put(self, image_path: str) -> str:
+        """Add an image file to the store and return its content-addressed name"""
+        ext = Path(image_path).suffix.lower() or ".jpg"
+        name = f"{file_digest(image_path)}{ext}"
+        target = self.path(name)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            staging = target.with_name(f".{name}.{os.getpid()}.{threading.get_ident()}")
+            try:
+                os.link(image_path, staging)
+            except OSError:
+                # Different filesystem, fall back to a copy
+                shutil.copyfile(image_path, staging)
+            os.replace(staging, target)
+        else:
+            # mtime of the image is the LRU clock
+            os.utime(target)
+        return name
+
+    def path(self, name: str) -> Path:
+        return self.root_dir / name[:2] / name
+
+    def get(self, name: str) -> Path | None:
+        """Path of a stored image, or None for unknown or malformed names"""
+        if not IMAGE_NAME_PATTERN.match(name):
+            return None
+        path = self.path(name)
+        return path if path.is_file() else None
+
+    def sweep(self) -> None:
+        """Delete least recently referenced images until the store fits into `max_bytes`"""
+        if self.max_bytes <= 0:
+            return
+        entries = []
+        total_size = 0
+        for path in self.root_dir.glob("*/*"):
+            if not IMAGE_NAME_PATTERN.match(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        if total_size <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            path.unlink(missing_ok=True)
+            total_size -= size
+            if total_size <= self.max_bytes:
+                break
+        logger.debug(f"Image store trimmed to {total_size} bytes")
+
+
+_store: ImageStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """Process-wide image store rooted at QOCR_IMAGE_STORE_DIR"""
+    global _store
+    from django.conf import settings
+
+    with _store_lock:
+        if _store is None:
+            _store = ImageStore(settings.QOCR_IMAGE_STORE_DIR, max_bytes=settings.QOCR_IMAGE_STORE_MAX_BYTES)
+        return _store
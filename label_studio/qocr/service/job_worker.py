@@ -0,0 +1,62 @@
+from rq import Worker
+from rq.utils import utcnow
+
+from .admission import PRIORITY_WEIGHTS
+
+
+class PriorityWorker(Worker):
+    """RQ worker sharing its time between the priority queues like the admission controller shares slots.
+
+    A stock rqworker drains `critical` before it looks at `high` and so on, so a steady flow of interactive jobs
+    starves bulk imports. After each dequeue this worker puts one queue first for the next one: the queue whose
+    oldest job has waited `aging_seconds` if there is one, else the queue picked by smooth weighted round-robin
+    over the queues holding jobs (`PRIORITY_WEIGHTS`, 1 for other queues). The others follow in the order the
+    worker was given. Credits are per worker process, several workers each share their own time the same way.
+
+    Only the QOCR parse workers use it, other RQ workers keep the stock class:
+
+        python manage.py rqworker critical high default low --worker-class qocr.service.job_worker.PriorityWorker
+    """
+
+    def __init__(self, *args, aging_seconds: float | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if aging_seconds is None:
+            from django.conf import settings
+
+            aging_seconds = getattr(settings, "QOCR_JOB_AGING_SECONDS", 600)
+        self.aging_seconds = aging_seconds
+        self._credits = {queue.name: 0 for queue in self.queues}
+
+    def reorder_queues(self, reference_queue) -> None:
+        # The hook rq's own RoundRobinWorker and RandomWorker override to set the order of the next dequeue
+        self._ordered_queues = self._prioritized_queues()
+
+    def _prioritized_queues(self) -> list:
+        waiting = [queue for queue in self.queues if queue.count]
+        for queue in self.queues:
+            if queue not in waiting:
+                self._credits[queue.name] = 0
+        if not waiting:
+            return self.queues[:]
+
+        waited = {queue.name: self._head_wait(queue) for queue in waiting}
+        starving = max(waiting, key=lambda queue: waited[queue.name])
+        if waited[starving.name] >= self.aging_seconds:
+            chosen = starving
+        else:
+            total_weight = sum(PRIORITY_WEIGHTS.get(queue.name, 1) for queue in waiting)
+            for queue in waiting:
+                self._credits[queue.name] += PRIORITY_WEIGHTS.get(queue.name, 1)
+            # Ties go to the queue given first, i.e. the more urgent one
+            chosen = max(waiting, key=lambda queue: self._credits[queue.name])
+            self._credits[chosen.name] -= total_weight
+        return [chosen] + [queue for queue in self.queues if queue is not chosen]
+
+    @staticmethod
+    def _head_wait(queue) -> float:
+        """Seconds the next job of `queue` has been waiting, 0 when it is gone meanwhile"""
+        job_ids = queue.get_job_ids(0, 1)
+        job = queue.fetch_job(job_ids[0]) if job_ids else None
+        if job is None or job.enqueued_at is None:
+            return 0
+        return (utcnow() - job.enqueued_at).total_seconds()
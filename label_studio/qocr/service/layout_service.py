@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import Iterable, Iterator
+
+from loguru import logger
+from mineru.utils.enum_class import ModelInvokeConfigDict
+from PIL import Image
+
+from .parse_service import invoke_config_key
+
+
+def _poly_to_bbox(poly: list[float]) -> list[float]:
+    xs, ys = poly[0::2], poly[1::2]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+class LayoutService:
+    """Layout detection over many page images with a model loaded once per process and invoke_config.
+
+    Images are opened, inferred and closed in chunks of `batch_size`, so memory stays bounded by one
+    chunk however many files a request carries.
+    """
+
+    def __init__(self, invoke_config: ModelInvokeConfigDict, batch_size: int = 16) -> None:
+        self.invoke_config = invoke_config
+        self.batch_size = max(batch_size, 1)
+        self._model = None
+        # The layout model is not safe for concurrent inference
+        self._lock = threading.Lock()
+
+    def _load_model(self):
+        if self._model is None:
+            from mineru.backend.pipeline.pipeline_analyze import ModelSingleton
+
+            started = time.monotonic()
+            # The same singleton do_parse uses, a parse with this invoke_config afterwards reuses the weights
+            pipeline_model = ModelSingleton().get_model(
+                lang=None, formula_enable=False, table_enable=False, invoke_config=self.invoke_config
+            )
+            self._model = pipeline_model.layout_model
+            logger.info(f"Loaded layout model in {time.monotonic() - started:.1f}s")
+        return self._model
+
+    def layout(self, image_paths: Iterable[str]) -> Iterator[list[dict]]:
+        """Yield the layout blocks (category_id, bbox, score) of every image, in input order"""
+        chunk = []
+        for image_path in image_paths:
+            chunk.append(image_path)
+            if len(chunk) == self.batch_size:
+                yield from self._layout_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self._layout_chunk(chunk)
+
+    def _layout_chunk(self, image_paths: list[str]) -> list[list[dict]]:
+        images = []
+        try:
+            for image_path in image_paths:
+                with Image.open(image_path) as image:
+                    images.append(image.convert("RGB"))
+            with self._lock:
+                predictions = self._load_model().batch_predict(images, self.batch_size)
+        finally:
+            for image in images:
+                image.close()
+
+        return [
+            [
+                {
+                    "category_id": int(block["category_id"]),
+                    "bbox": _poly_to_bbox(block["poly"]),
+                    "score": round(float(block["score"]), 3),
+                }
+                for block in blocks
+            ]
+            for blocks in predictions
+        ]
+
+
+_services: dict[str, LayoutService] = {}
+_services_lock = threading.Lock()
+
+
+def get_layout_service(invoke_config: ModelInvokeConfigDict) -> LayoutService:
+    """Process-wide layout service of an invoke_config, batched by QOCR_LAYOUT_BATCH_SIZE"""
+    from django.conf import settings
+
+    key = invoke_config_key(invoke_config)
+    with _services_lock:
+        if key not in _services:
+            _services[key] = LayoutService(invoke_config, batch_size=settings.QOCR_LAYOUT_BATCH_SIZE)
+        return _services[key]
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+from django.db import DatabaseError, connections, transaction
+from loguru import logger
+
+T = TypeVar("T")
+
+_GENERATION_SQL = "SELECT count(*), max(trained_at) FROM ml_models_versions"
+_VERSIONS_SQL = """
+    SELECT m.type, m.name, v.version, v.weight
+    FROM ml_models_versions v
+    JOIN ml_models m ON m.id = v.ml_model
+"""
+
+
+class ModelRegistryError(ValueError):
+    """Raised when an invoke_config names a model version that is not registered"""
+
+
+@dataclass(frozen=True)
+class RegisteredModel:
+    model_type: str
+    name: str
+    version: str
+    weight: str
+
+
+def model_type_of(config: dict) -> str:
+    """`model_type` enum value of an invoke_config entry, e.g. type "ocr" with sub_type "det" is "ocrdet" """
+    return f"{config.get('type', '')}{config.get('sub_type') or ''}"
+
+
+class ModelRegistry:
+    """In-process view of the `ml_models` / `ml_models_versions` tables with memoized config resolution.
+
+    Registered versions are loaded once and reloaded only when the table generation (row count and latest
+    `trained_at`) changes, which is checked at most every `check_interval` seconds. Values derived from the
+    registry, such as resolved invoke_configs, are memoized with `memoize()` and dropped on every reload,
+    so a newly inserted version is picked up without a restart while repeated requests cost a dict lookup.
+
+    Without the tables (e.g. a SQLite development database) the registry is empty and nothing is checked.
+    """
+
+    def __init__(self, using: str = "default", check_interval: float = 5.0, max_memoized: int = 256) -> None:
+        self.using = using
+        self.check_interval = check_interval
+        self.max_memoized = max_memoized
+        self._lock = threading.Lock()
+        self._generation: tuple | None = None
+        self._checked_at = float("-inf")
+        self._models: dict[tuple[str, str, str], RegisteredModel] = {}
+        self._memo: OrderedDict[str, object] = OrderedDict()
+
+    def get(self, model_type: str, name: str, version: str) -> RegisteredModel | None:
+        self._refresh()
+        return self._models.get((model_type, name, version))
+
+    def check(self, invoke_config: dict) -> dict[str, RegisteredModel]:
+        """Registered model of every invoke_config entry, raising `ModelRegistryError` for unknown versions.
+
+        Entries of a model type without any registered version are not managed by the registry and skipped.
+        """
+        self._refresh()
+        managed_types = {model_type for model_type, _, _ in self._models}
+        resolved = {}
+        unknown = []
+        for key, config in invoke_config.items():
+            model_type = model_type_of(config)
+            if model_type not in managed_types:
+                continue
+            model = self._models.get((model_type, config.get("name"), config.get("version")))
+            if model is None:
+                unknown.append(f"{key}={config.get('name')}@{config.get('version')}")
+            else:
+                resolved[key] = model
+        if unknown:
+            raise ModelRegistryError(f"Unregistered model versions: {', '.join(unknown)}")
+        return resolved
+
+    def weights(self, invoke_config: dict) -> dict[str, str]:
+        """Weight location of every registered invoke_config entry, keyed like the invoke_config; see `check()`"""
+        return {key: model.weight for key, model in self.check(invoke_config).items() if model.weight}
+
+    def memoize(self, key: str, build: Callable[[], T]) -> T:
+        """Value of `build()` for `key`, computed once per registry generation; exceptions are not cached"""
+        self._refresh()
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        value = build()
+        with self._lock:
+            self._memo[key] = value
+            while len(self._memo) > self.max_memoized:
+                self._memo.popitem(last=False)
+        return value
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            try:
+                # A savepoint keeps a failing query from breaking the transaction of the request
+                with transaction.atomic(using=self.using), connections[self.using].cursor() as cursor:
+                    cursor.execute(_GENERATION_SQL)
+                    generation = tuple(cursor.fetchone())
+                    if generation == self._generation:
+                        return
+                    cursor.execute(_VERSIONS_SQL)
+                    rows = cursor.fetchall()
+            except DatabaseError as e:
+                if self._generation is not None or self._models:
+                    logger.warning(f"Model registry is unavailable, keeping {len(self._models)} known versions: {e}")
+                    return
+                logger.debug(f"Model registry tables are not available: {e}")
+                generation, rows = None, []
+
+            self._models = {
+                (model_type, name, version): RegisteredModel(model_type, name, version, weight)
+                for model_type, name, version, weight in rows
+            }
+            self._memo.clear()
+            if generation != self._generation:
+                logger.info(f"Loaded {len(self._models)} registered model versions")
+            self._generation = generation
+
+
+_registry: ModelRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide model registry, re-checked every QOCR_MODEL_REGISTRY_CHECK_INTERVAL seconds"""
+    global _registry
+    from django.conf import settings
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(check_interval=settings.QOCR_MODEL_REGISTRY_CHECK_INTERVAL)
+        return _registry
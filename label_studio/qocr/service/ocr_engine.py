@@ -0,0 +1,163 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+from loguru import logger
+
+
+@dataclass
+class OCRLine:
+    text: str
+    score: float
+    box: list[list[float]] = field(default_factory=list)
+
+
+@dataclass
+class _Request:
+    future: Future
+    image: np.ndarray | None = None  # full image: detection + recognition
+    crops: list[np.ndarray] | None = None  # pre-cut text crops: recognition only
+
+
+def decode_image(data: bytes) -> np.ndarray:
+    """BGR image array as expected by mineru's OCR models"""
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Unreadable image")
+    return image
+
+
+class OCREngine:
+    """Shared OCR engine with cross-request dynamic micro-batching.
+
+    Callers submit images (or pre-cut text crops) and get a Future. A single scheduler thread owns the
+    model: it waits for the first request, keeps collecting until `max_batch_size` requests are queued or
+    `max_wait_ms` has passed, runs text detection per image and one batched recognition pass over the crops
+    of the whole batch, then scatters the results back. An idle engine answers a lone request after at most
+    `max_wait_ms`, a busy one amortizes recognition over many requests.
+    """
+
+    def __init__(self, lang: str = "korean", max_batch_size: int = 32, max_wait_ms: int = 10) -> None:
+        self.lang = lang
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max(max_wait_ms, 0) / 1000
+        self._queue: queue.Queue[_Request] = queue.Queue()
+        self._model = None
+        self._scheduler = threading.Thread(target=self._run, name="qocr-ocr-scheduler", daemon=True)
+        self._scheduler.start()
+
+    def submit(self, image: np.ndarray) -> "Future[list[OCRLine]]":
+        """Detect and recognize the text lines of an image"""
+        future: Future = Future()
+        self._queue.put(_Request(future=future, image=image))
+        return future
+
+    def recognize(self, crops: list[np.ndarray]) -> "Future[list[tuple[str, float]]]":
+        """Recognize pre-cut text crops, e.g. table cells, batched together with other requests"""
+        future: Future = Future()
+        if not crops:
+            future.set_result([])
+            return future
+        self._queue.put(_Request(future=future, crops=crops))
+        return future
+
+    def _load_model(self):
+        if self._model is None:
+            from mineru.model.ocr.paddleocr2pytorch.pytorch_paddle import PytorchPaddleOCR
+
+            started = time.monotonic()
+            self._model = PytorchPaddleOCR(lang=self.lang)
+            logger.info(f"Loaded OCR models ({self.lang}) in {time.monotonic() - started:.1f}s")
+        return self._model
+
+    def _next_batch(self) -> list[_Request]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = [request for request in self._next_batch() if request.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self._process_batch(batch)
+            except Exception as e:
+                logger.exception(f"OCR batch of {len(batch)} requests failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+    def _process_batch(self, batch: list[_Request]) -> list:
+        from mineru.utils.ocr_utils import get_rotate_crop_image, sorted_boxes
+
+        model = self._load_model()
+        drop_score = getattr(model, "drop_score", 0.5)
+
+        # Detection runs per image, every crop of the batch then goes through one recognition pass
+        crops: list[np.ndarray] = []
+        spans: list[tuple[int, int, list]] = []
+        for request in batch:
+            start = len(crops)
+            boxes = []
+            if request.crops is not None:
+                crops.extend(request.crops)
+            else:
+                dt_boxes, _ = model.text_detector(request.image)
+                if dt_boxes is not None and len(dt_boxes):
+                    boxes = sorted_boxes(dt_boxes)
+                    crops.extend(
+                        get_rotate_crop_image(request.image, np.array(box, dtype=np.float32)) for box in boxes
+                    )
+            spans.append((start, len(crops), boxes))
+
+        rec_res = []
+        if crops:
+            rec_res, _ = model.text_recognizer(crops)
+
+        results = []
+        for request, (start, end, boxes) in zip(batch, spans):
+            if request.crops is not None:
+                results.append([(text, float(score)) for text, score in rec_res[start:end]])
+                continue
+            results.append(
+                [
+                    OCRLine(text=text, score=float(score), box=np.asarray(box).tolist())
+                    for box, (text, score) in zip(boxes, rec_res[start:end])
+                    if score >= drop_score
+                ]
+            )
+        return results
+
+
+_engine: OCREngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OCREngine:
+    """Process-wide OCR engine configured by the QOCR_OCR_* settings"""
+    global _engine
+    from django.conf import settings
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = OCREngine(
+                lang=settings.QOCR_OCR_LANG,
+                max_batch_size=settings.QOCR_OCR_MAX_BATCH_SIZE,
+                max_wait_ms=settings.QOCR_OCR_MAX_WAIT_MS,
+            )
+        return _engine
@@ -0,0 +1,294 @@
+import atexit
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from importlib.util import find_spec
+from pathlib import Path
+
+from loguru import logger
+
+from .result_cache import bytes_digest
+
+try:
+    import fcntl
+except ImportError:  # Windows: profiles are not shared between processes
+    fcntl = None
+
+OFFICE_SUFFIXES = {".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx"}
+
+
+class OfficeConversionError(RuntimeError):
+    """Raised when an office document cannot be converted to PDF"""
+
+
+def is_office_document(path: str) -> bool:
+    return Path(path).suffix.lower() in OFFICE_SUFFIXES
+
+
+class _ConverterSlot:
+    """One persistent headless LibreOffice with its own user profile.
+
+    With unoserver the office process stays up and documents are sent over its XML-RPC port. The `soffice`
+    fallback, only used when enabled, starts LibreOffice cold for each document, on a profile that is already
+    initialized, which skips the expensive first-start setup; separate profiles also let the slots convert
+    concurrently. Slots with the same index in other processes share the server (or, for soffice, take turns
+    on the profile).
+    """
+
+    def __init__(
+        self, index: int, work_dir: Path, use_unoserver: bool, port_base: int, soffice_fallback: bool = False
+    ) -> None:
+        self.index = index
+        self.profile_dir = work_dir / f"profile_{index}"
+        self.use_unoserver = use_unoserver
+        self.soffice_fallback = soffice_fallback
+        self.port = port_base + 2 * index + 1
+        self.uno_port = port_base + 2 * index
+        self._process: subprocess.Popen | None = None
+
+    def convert(self, data: bytes, suffix: str, timeout: int) -> bytes:
+        if self.use_unoserver:
+            return self._convert_unoserver(data, timeout)
+        if not self.soffice_fallback:
+            raise OfficeConversionError("unoserver is not installed, install the qocr extra and LibreOffice")
+        return self._convert_soffice(data, suffix, timeout)
+
+    def _server_reachable(self) -> bool:
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                return True
+        except OSError:
+            return False
+
+    def _ensure_server(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            return
+        if self._server_reachable():
+            # Started by another process for the same slot
+            return
+        self._process = subprocess.Popen(
+            [
+                "unoserver",
+                "--interface",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--uno-port",
+                str(self.uno_port),
+                "--user-installation",
+                self.profile_dir.as_uri(),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        logger.info(f"Started unoserver {self._process.pid} on port {self.port}")
+
+    def _convert_unoserver(self, data: bytes, timeout: int) -> bytes:
+        from unoserver.client import UnoClient
+
+        self._ensure_server()
+        client = UnoClient(server="127.0.0.1", port=str(self.port))
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return client.convert(indata=data, convert_to="pdf")
+            except ConnectionError:
+                # The server is still starting, or has died and is restarted
+                if time.monotonic() > deadline:
+                    raise OfficeConversionError(f"unoserver on port {self.port} is not reachable")
+                self._ensure_server()
+                time.sleep(0.5)
+
+    def _convert_soffice(self, data: bytes, suffix: str, timeout: int) -> bytes:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.profile_dir.with_suffix(".lock"), "wb") as profile_lock:
+            # A second soffice on a profile in use would hand its document to the running instance
+            if fcntl is not None:
+                fcntl.flock(profile_lock, fcntl.LOCK_EX)
+            return self._run_soffice(data, suffix, timeout)
+
+    def _run_soffice(self, data: bytes, suffix: str, timeout: int) -> bytes:
+        with tempfile.TemporaryDirectory(prefix=f"qocr-office-{self.index}-") as tmp_dir:
+            source = Path(tmp_dir) / f"document{suffix}"
+            source.write_bytes(data)
+            try:
+                subprocess.run(
+                    [
+                        "soffice",
+                        f"-env:UserInstallation={self.profile_dir.as_uri()}",
+                        "--headless",
+                        "--norestore",
+                        "--nolockcheck",
+                        "--convert-to",
+                        "pdf",
+                        "--outdir",
+                        tmp_dir,
+                        str(source),
+                    ],
+                    check=True,
+                    timeout=timeout,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                )
+            except subprocess.TimeoutExpired:
+                raise OfficeConversionError(f"soffice did not convert the document within {timeout}s")
+            except (OSError, subprocess.CalledProcessError) as e:
+                raise OfficeConversionError(f"soffice failed: {e}")
+            target = source.with_suffix(".pdf")
+            if not target.exists():
+                raise OfficeConversionError("soffice did not produce a PDF")
+            return target.read_bytes()
+
+    def close(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+
+
+class OfficeConverterPool:
+    """Bounded pool of persistent office-to-PDF converters with a content-addressed cache of converted PDFs.
+
+    `convert()` blocks until a slot is free; `submit()` converts on a background thread so callers can parse
+    other documents while conversion runs. The cache is trimmed to `cache_max_bytes` by `sweep()`, which the
+    artifact sweeper thread calls periodically.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        work_dir: str,
+        cache_dir: str | None = None,
+        cache_max_bytes: int = 0,
+        timeout: int = 120,
+        port_base: int = 2002,
+        soffice_fallback: bool = False,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Office converter pool size must be at least 1")
+        self.timeout = timeout
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_max_bytes = cache_max_bytes
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        use_unoserver = find_spec("unoserver") is not None and shutil.which("unoserver") is not None
+        if not use_unoserver:
+            if not soffice_fallback:
+                logger.error("unoserver is not installed, office documents cannot be converted")
+            elif shutil.which("soffice") is None:
+                logger.warning("Neither unoserver nor soffice is installed, office documents cannot be converted")
+            else:
+                logger.warning("unoserver is not installed, every office document starts a cold soffice")
+        self._slots: queue.Queue[_ConverterSlot] = queue.Queue()
+        self._all_slots = [
+            _ConverterSlot(i, self.work_dir, use_unoserver, port_base, soffice_fallback) for i in range(size)
+        ]
+        for slot in self._all_slots:
+            self._slots.put(slot)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="qocr-office")
+        self._sweep_lock = threading.Lock()
+
+    def convert(self, data: bytes, suffix: str) -> bytes:
+        """PDF bytes of an office document"""
+        digest = bytes_digest(data)
+        if (pdf_bytes := self._cache_get(digest)) is not None:
+            return pdf_bytes
+
+        slot = self._slots.get()
+        started = time.monotonic()
+        try:
+            pdf_bytes = slot.convert(data, suffix.lower(), self.timeout)
+        finally:
+            self._slots.put(slot)
+        logger.debug(f"Converted {suffix} document {digest[:12]} to PDF in {time.monotonic() - started:.2f}s")
+
+        self._cache_put(digest, pdf_bytes)
+        return pdf_bytes
+
+    def submit(self, data: bytes, suffix: str) -> "Future[bytes]":
+        return self._executor.submit(self.convert, data, suffix)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for slot in self._all_slots:
+            slot.close()
+
+    def _cache_path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}.pdf"
+
+    def _cache_get(self, digest: str) -> bytes | None:
+        if self.cache_dir is None:
+            return None
+        path = self._cache_path(digest)
+        try:
+            pdf_bytes = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return pdf_bytes
+
+    def _cache_put(self, digest: str, pdf_bytes: bytes) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+        tmp_path.write_bytes(pdf_bytes)
+        os.replace(tmp_path, path)
+
+    def sweep(self) -> None:
+        """Delete least recently used converted PDFs until the cache fits into `cache_max_bytes`"""
+        if self.cache_dir is None or self.cache_max_bytes <= 0:
+            return
+        with self._sweep_lock:
+            entries = []
+            total_size = 0
+            for path in self.cache_dir.glob("*/*.pdf"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total_size <= self.cache_max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total_size -= size
+
+
+_pool: OfficeConverterPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_office_converter() -> OfficeConverterPool | None:
+    """Process-wide office converter pool, or None when QOCR_OFFICE_CONVERTERS disables conversion"""
+    global _pool
+    from django.conf import settings
+
+    from .artifact_store import get_artifact_store
+
+    size = getattr(settings, "QOCR_OFFICE_CONVERTERS", 0)
+    if size <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = OfficeConverterPool(
+                size=size,
+                work_dir=os.path.join(settings.QOCR_OUTPUT_DIR, "office"),
+                cache_dir=settings.QOCR_OFFICE_CACHE_DIR,
+                cache_max_bytes=settings.QOCR_OFFICE_CACHE_MAX_BYTES,
+                timeout=settings.QOCR_OFFICE_CONVERT_TIMEOUT,
+                port_base=settings.QOCR_OFFICE_PORT_BASE,
+                soffice_fallback=settings.QOCR_OFFICE_SOFFICE_FALLBACK,
+            )
+            atexit.register(_pool.shutdown)
+            get_artifact_store().start_sweeper(settings.QOCR_ARTIFACT_SWEEP_INTERVAL, _pool)
+        return _pool
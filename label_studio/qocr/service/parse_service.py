@@ -1,33 +1,384 @@
 import base64
+import hashlib
+import json
+import multiprocessing as mp
 import os
 import re
-import tempfile
+import shutil
+import threading
 import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import groupby, islice, takewhile
 from os import PathLike
 from pathlib import Path
-from typing import Literal
+from typing import Callable, Iterator, Literal
 
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+import ujson
 from loguru import logger
-from mineru.cli.common import do_parse, prepare_env, read_fn
-from mineru.data.data_reader_writer import FileBasedDataWriter
-from mineru.utils.enum_class import ModelInvokeConfigDict
+from mineru.backend.pipeline.pipeline_middle_json_mkcontent import union_make
+from mineru.cli.common import (
+    convert_pdf_bytes_to_bytes_by_pypdfium2,
+    do_parse,
+    image_suffixes,
+    images_bytes_to_pdf_bytes,
+    prepare_env,
+    read_fn,
+)
+from mineru.utils.enum_class import MakeMode, ModelInvokeConfigDict
 
-from ..model.entity import OCROutput, ParsePDFOutput
+from ..metrics import timed
+from ..model.entity import OCROutput, PageOutput, ParsePDFOutput
+from .artifact_store import ArtifactStore
+from .cancellation import CancellationToken, ParseCancelled
+from .image_store import ImageStore
+from .office_converter import OfficeConversionError, OfficeConverterPool, is_office_document
+from .result_cache import ParseResultCache, bytes_digest, file_digest
+
+# base64: images are inlined into the markdown as data URIs
+# reference: images are linked by content hash and served from the image store
+ImageMode = Literal["base64", "reference"]
+
+
+class PageRangeError(ValueError):
+    """Raised when the requested first page lies beyond the end of the document"""
+
+
+# Errors in the request rather than in the parser, passed back as they are by callers parsing in other processes
+REQUEST_ERRORS = (PageRangeError,)
+
+
+def invoke_config_key(invoke_config: ModelInvokeConfigDict) -> str:
+    """Stable identifier of a resolved invoke_config (model types, names and versions)"""
+    normalized = {
+        name: model.model_dump() if hasattr(model, "model_dump") else model
+        for name, model in sorted(invoke_config.items())
+    }
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _load_pdf_bytes(doc_path: str, data: bytes | None = None) -> bytes:
+    """PDF bytes of a document, from `data` when the caller already holds it in memory instead of re-reading"""
+    if data is None:
+        return read_fn(doc_path)
+    if Path(doc_path).suffix.lower() in image_suffixes:
+        return images_bytes_to_pdf_bytes(data)
+    return data
+
+
+def count_pages(doc_path: str, data: bytes | None = None) -> int | None:
+    """Page count of a PDF or image, None for office documents (known once converted) and unreadable files"""
+    if is_office_document(doc_path):
+        return None
+    if Path(doc_path).suffix.lower() in image_suffixes:
+        return 1
+    try:
+        pdf = pdfium.PdfDocument(data if data is not None else doc_path)
+    except pdfium.PdfiumError:
+        return None
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _last_page(pdf_data: bytes, end_page_id: int, start_page_id: int = 0) -> int:
+    """Index of the last page to parse, -1 for an empty document"""
+    pdf = pdfium.PdfDocument(pdf_data)
+    try:
+        page_count = len(pdf)
+    finally:
+        pdf.close()
+    if start_page_id > 0 and start_page_id >= page_count:
+        raise PageRangeError(f"First page {start_page_id + 1} is beyond the last page {page_count}")
+    return page_count - 1 if end_page_id < 0 else min(end_page_id, page_count - 1)
+
+
+def _page_digests(pdf_data: bytes, first_page: int, last_page: int) -> list[str]:
+    """Fingerprint per page from its size, text, object layout and raw image data.
+
+    Unlike the bytes of the file, the fingerprint of a page does not change when other pages are added,
+    removed or replaced, so it identifies pages across re-uploads of a grown or edited document.
+    """
+    digests = []
+    pdf = pdfium.PdfDocument(pdf_data)
+    try:
+        for page_idx in range(first_page, last_page + 1):
+            page = pdf[page_idx]
+            try:
+                digest = hashlib.sha256(repr((page.get_size(), page.get_rotation())).encode("utf-8"))
+                textpage = page.get_textpage()
+                try:
+                    digest.update(textpage.get_text_range().encode("utf-8", "surrogatepass"))
+                finally:
+                    textpage.close()
+                for obj in page.get_objects():
+                    digest.update(repr((obj.type, [round(v, 1) for v in obj.get_pos()])).encode("utf-8"))
+                    if obj.type == pdfium_c.FPDF_PAGEOBJ_IMAGE:
+                        digest.update(bytes(obj.get_data(decode_simple=False)))
+                digests.append(digest.hexdigest())
+            finally:
+                page.close()
+    finally:
+        pdf.close()
+    return digests
+
+
+def _page_ranges(first_page: int, last_page: int, pages_per_range: int) -> list[tuple[int, int]]:
+    """Inclusive (start, end) page ranges covering first_page..last_page"""
+    return [
+        (start, min(start + pages_per_range, last_page + 1) - 1)
+        for start in range(first_page, last_page + 1, pages_per_range)
+    ]
+
+
+def _runs_to_ranges(pages: list[int], pages_per_range: int) -> list[tuple[int, int]]:
+    """Inclusive page ranges covering the sorted, possibly non-contiguous `pages`"""
+    ranges = []
+    for _, run in groupby(enumerate(pages), key=lambda item: item[1] - item[0]):
+        run_pages = [page for _, page in run]
+        ranges.extend(_page_ranges(run_pages[0], run_pages[-1], pages_per_range))
+    return ranges
+
+
+def _move_images(source_dir: str, target_dir: str) -> None:
+    # Image names are content hashes, so relative "images/..." links stay valid after the move
+    if not os.path.isdir(source_dir):
+        return
+    for image in os.scandir(source_dir):
+        target = os.path.join(target_dir, image.name)
+        if not os.path.exists(target):
+            shutil.move(image.path, target)
+
+
+def _link_images(source_dir: str, target_dir: str) -> None:
+    """Like `_move_images`, but the source keeps its images, e.g. a result cache entry"""
+    if not os.path.isdir(source_dir):
+        return
+    for image in os.scandir(source_dir):
+        target = os.path.join(target_dir, image.name)
+        if os.path.exists(target):
+            continue
+        try:
+            os.link(image.path, target)
+        except OSError:
+            # Different filesystem, fall back to a copy
+            shutil.copyfile(image.path, target)
+
+
+def _read_json(path: str) -> dict | list | None:
+    """Decode a JSON output of mineru, None when it was not written"""
+    try:
+        with open(path, "rb") as f:
+            return ujson.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+# Block types of middle_json mapped to content list types
+_MIDDLE_BLOCK_TYPES = {
+    "title": "title",
+    "text": "text",
+    "list": "text",
+    "index": "text",
+    "interline_equation": "equation",
+    "image": "image",
+    "table": "table",
+}
+
+
+def _content_item(item: dict, page_offset: int = 0) -> dict:
+    """Compact content list entry from an item of mineru's content_list_json"""
+    item_type = item.get("type", "text")
+    entry = {
+        "type": item_type,
+        "content": item.get("text", ""),
+        "page_num": item.get("page_idx", 0) + page_offset,
+        "bbox": item.get("bbox") or [0, 0, 0, 0],
+    }
+    if item_type == "text" and item.get("text_level"):
+        entry["type"] = "title"
+        entry["level"] = item["text_level"]
+    elif item_type in ("image", "table"):
+        captions = item.get(f"{item_type}_caption") or []
+        entry["content"] = item.get("table_body") or " ".join(captions) or item_type
+        if item.get("img_path"):
+            entry["img_path"] = item["img_path"]
+    return entry
+
+
+def _block_spans(block: dict) -> Iterator[dict]:
+    for line in block.get("lines", []):
+        yield from line.get("spans", [])
+    for child in block.get("blocks", []):
+        yield from _block_spans(child)
+
+
+def _content_list_from_middle(middle: dict, page_offset: int = 0) -> list[dict]:
+    """Content list derived from the para blocks of middle_json, bboxes scaled to 0-1000 like content_list_json"""
+    content_list = []
+    for page_info in middle.get("pdf_info", []):
+        page_num = page_info.get("page_idx", 0) + page_offset
+        page_width, page_height = page_info.get("page_size") or (1000, 1000)
+        for block in page_info.get("para_blocks", []):
+            spans = list(_block_spans(block))
+            x0, y0, x1, y1 = block.get("bbox") or (0, 0, 0, 0)
+            entry = {
+                "type": _MIDDLE_BLOCK_TYPES.get(block.get("type"), "text"),
+                "content": " ".join(span["content"] for span in spans if span.get("content")),
+                "page_num": page_num,
+                "bbox": [
+                    int(x0 * 1000 / page_width),
+                    int(y0 * 1000 / page_height),
+                    int(x1 * 1000 / page_width),
+                    int(y1 * 1000 / page_height),
+                ],
+            }
+            if entry["type"] == "title":
+                entry["level"] = block.get("level", 1)
+            image_path = next((span["image_path"] for span in spans if span.get("image_path")), None)
+            if image_path:
+                entry["img_path"] = f"images/{image_path}"
+            content_list.append(entry)
+    return content_list
+
+
+def _load_content_list(parse_output: ParsePDFOutput, page_offset: int = 0, middle: dict | None = None) -> list[dict]:
+    """Content list of a parse with real page numbers and bboxes, from content_list_json or else middle_json"""
+    items = _read_json(parse_output.content_list_json)
+    if items is not None:
+        return [_content_item(item, page_offset) for item in items]
+    if middle is None:
+        middle = _read_json(parse_output.middle_json)
+    return _content_list_from_middle(middle, page_offset) if middle else []
+
+
+def _without_figures(page_info: dict) -> dict:
+    """Page of middle_json without its image blocks, for parses that do not want figures"""
+    para_blocks = [block for block in page_info.get("para_blocks", []) if block.get("type") != "image"]
+    return {**page_info, "para_blocks": para_blocks}
+
+
+def _document_item(file_name: str, page_num: int = 0) -> dict:
+    """Placeholder entry for documents without any recognized content"""
+    return {
+        "type": "document",
+        "content": f"Processed document: {file_name}",
+        "page_num": page_num,
+        "bbox": [0, 0, 0, 0],
+    }
+
+
+def _debug_pdf_flags(debug_pdfs: bool) -> dict[str, bool]:
+    """`do_parse` flags of the debug outputs: layout and span boxes drawn onto the document, its copy and
+    the raw model output, none of which the markdown or content list is built from"""
+    return {
+        "f_draw_layout_bbox": debug_pdfs,
+        "f_draw_span_bbox": debug_pdfs,
+        "f_dump_orig_pdf": debug_pdfs,
+        "f_dump_model_output": debug_pdfs,
+    }
+
+
+_page_executor: ProcessPoolExecutor | None = None
+_page_executor_lock = threading.Lock()
+
+
+def _get_page_executor(max_workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all page-parallel parses of this process, its workers keep their models loaded"""
+    global _page_executor
+    with _page_executor_lock:
+        if _page_executor is None:
+            _page_executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp.get_context("spawn"))
+        return _page_executor
+
+
+def _parse_page_range(
+    output_dir: str,
+    file_name: str,
+    pdf_bytes: bytes,
+    parse_method: str,
+    invoke_config: ModelInvokeConfigDict,
+    formula_enable: bool,
+    table_enable: bool,
+    language: str,
+    debug_pdfs: bool = False,
+) -> None:
+    """Run mineru on one page range, executed in a page pool process"""
+    do_parse(
+        output_dir=output_dir,
+        pdf_file_names=[file_name],
+        pdf_bytes_list=[pdf_bytes],
+        p_lang_list=[language],
+        parse_method=parse_method,
+        invoke_config=invoke_config,
+        p_formula_enable=formula_enable,
+        p_table_enable=table_enable,
+        **_debug_pdf_flags(debug_pdfs),
+    )
 
 
 class ParseService:
-    def __init__(self, output_dir: str = "/label-studio/output") -> None:
+    def __init__(
+        self,
+        output_dir: str = "/label-studio/output",
+        cache: ParseResultCache | None = None,
+        page_parallelism: int = 0,
+        pages_per_chunk: int = 8,
+        image_store: ImageStore | None = None,
+        image_base_url: str = "/api/qocr/images/",
+        artifact_store: ArtifactStore | None = None,
+        office_converter: OfficeConverterPool | None = None,
+        page_cache: bool = False,
+    ) -> None:
+        """
+        Args:
+            output_dir: Root directory of parse outputs, used when no `artifact_store` is given
+            cache: Optional parse result cache consulted before running mineru
+            page_parallelism: Number of processes parsing page ranges of one document in parallel,
+                0 or 1 parses the whole document with a single `do_parse` call
+            pages_per_chunk: Number of pages per range when parsing in parallel
+            image_store: Content-addressed store backing the `reference` image mode
+            image_base_url: URL prefix of image links in the `reference` image mode
+            artifact_store: Store providing the per-request workspaces mineru writes into
+            office_converter: Converter pool turning office documents into PDFs, None rejects office documents
+            page_cache: Also cache results per page in `cache`, so re-uploads of a document with pages
+                added or replaced only parse the pages that are new
+        """
         self.output_dir = Path(output_dir)
-        self.local_image_dir = self.output_dir / "images"
-        self.local_md_dir = self.output_dir
-        self.image_dir = self.local_image_dir.name
+        self.cache = cache
+        self.page_parallelism = page_parallelism
+        self.pages_per_chunk = max(pages_per_chunk, 1)
+        self.image_store = image_store
+        self.image_base_url = image_base_url
+        self.artifact_store = artifact_store or ArtifactStore(str(self.output_dir / "artifacts"))
+        self.office_converter = office_converter
+        self.page_cache = page_cache and cache is not None
 
-        # Create output directories
-        self.local_image_dir.mkdir(exist_ok=True)
+    @classmethod
+    def from_settings(cls, output_dir: str | None = None) -> "ParseService":
+        """ParseService configured from the QOCR_* Django settings"""
+        from django.conf import settings
 
-        # Initialize writers
-        self.image_writer = FileBasedDataWriter(str(self.local_image_dir))
-        self.md_writer = FileBasedDataWriter(str(self.local_md_dir))
+        from .artifact_store import get_artifact_store
+        from .image_store import get_image_store
+        from .office_converter import get_office_converter
+        from .result_cache import get_result_cache
+
+        return cls(
+            output_dir=output_dir or settings.QOCR_OUTPUT_DIR,
+            cache=get_result_cache(),
+            page_parallelism=settings.QOCR_PAGE_PARALLELISM,
+            pages_per_chunk=settings.QOCR_PAGES_PER_CHUNK,
+            image_store=get_image_store(),
+            image_base_url=settings.QOCR_IMAGE_BASE_URL,
+            artifact_store=get_artifact_store(),
+            office_converter=get_office_converter(),
+            page_cache=settings.QOCR_PAGE_CACHE,
+        )
 
     def process_document(
         self,
@@ -38,84 +389,518 @@ class ParseService:
         formula_enable: bool = False,  # 수식 인식 활성화
         table_enable: bool = False,  # 테이블 인식 활성화
         language: str = "korean",  # 언어 설정
+        pdf_bytes: bytes | None = None,
+        image_mode: ImageMode = "base64",
+        start_page: int = 0,
+        figure_enable: bool = True,
+        debug_pdfs: bool = False,
+        cancel_token: CancellationToken | None = None,
     ) -> OCROutput:
         """Process a PDF document and generate various outputs.
 
         Args:
-            pdf_path: Path to the PDF file
-            max_pages: Maximum number of pages to process
+            pdf_path: Path to the PDF file, or only its name when `pdf_bytes` is given
+            max_pages: Maximum number of pages to process, counted from `start_page`
             invoke_config: Model configuration dictionary
             is_ocr: Force OCR mode
             formula_enable: Enable formula recognition
             table_enable: Enable table recognition
             language: Language setting
+            pdf_bytes: Document content already held in memory, parsed without touching the disk
+            image_mode: Inline images as base64 or link them by content hash
+            start_page: Index of the first page to process
+            figure_enable: Keep figures in the markdown and content list
+            debug_pdfs: Render mineru's layout and span PDFs, reported as `model_pdf`
+            cancel_token: Stops the parse at the next page range boundary, raising `ParseCancelled` when it was
+                cancelled and returning a `partial` output once its deadline passed. Debug parses run as one
+                call and are not stopped.
 
         Returns:
             OCROutput containing processing results
         """
+        end_page_id = start_page + max_pages - 1 if max_pages > 0 else -1
+        workspace = None
         try:
-            # Get file name without suffix for output naming
-            name_without_suffix = Path(pdf_path).stem
+            with timed("cache_lookup"):
+                cache_key = self._cache_key(
+                    pdf_path,
+                    max_pages,
+                    invoke_config,
+                    is_ocr,
+                    formula_enable,
+                    table_enable,
+                    language,
+                    image_mode,
+                    pdf_bytes,
+                    start_page,
+                    figure_enable,
+                    debug_pdfs,
+                )
+                cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                logger.debug(f"Parse cache hit for {pdf_path}: {cache_key}")
+                return cached
+
+            with self.artifact_store.workspace() as workspace:
+                # Documents assembled from cached or separately parsed pages have no debug PDFs
+                if (self.page_cache or cancel_token is not None) and not debug_pdfs:
+                    output = self._process_by_page(
+                        pdf_path,
+                        workspace,
+                        start_page,
+                        end_page_id,
+                        invoke_config,
+                        is_ocr,
+                        formula_enable,
+                        table_enable,
+                        language,
+                        figure_enable,
+                        pdf_bytes,
+                        image_mode,
+                        cache_key,
+                        cancel_token,
+                    )
+                else:
+                    # Process PDF to markdown and other outputs
+                    md_content, txt_content, layout_pdf_path, parse_output = self._process_pdf_to_markdown(
+                        pdf_path,
+                        workspace,
+                        start_page,
+                        end_page_id,
+                        invoke_config,
+                        is_ocr,
+                        formula_enable,
+                        table_enable,
+                        language,
+                        figure_enable,
+                        debug_pdfs,
+                        pdf_bytes,
+                        image_mode,
+                    )
+                    output = self._build_output(
+                        pdf_path, md_content, layout_pdf_path, parse_output, cache_key, figure_enable
+                    )
+
+            # A cached output points into the cache, the workspace is not needed anymore
+            if output.workspace is None:
+                self.artifact_store.release(workspace)
+            return output
+
+        except ParseCancelled as e:
+            # Nobody is waiting for the outputs anymore
+            self.artifact_store.release(workspace)
+            logger.info(f"Stopped processing document {pdf_path}: {e}")
+            raise
+        except Exception as e:
+            logger.exception(f"Error processing document {pdf_path}: {str(e)}")
+            raise
+
+    def process_documents(
+        self,
+        pdf_paths: list[str],
+        max_pages: int,
+        invoke_config: ModelInvokeConfigDict,
+        is_ocr: bool = False,
+        formula_enable: bool = False,
+        table_enable: bool = False,
+        language: str = "korean",
+        image_mode: ImageMode = "base64",
+        start_page: int = 0,
+        figure_enable: bool = True,
+        debug_pdfs: bool = False,
+    ) -> list[OCROutput]:
+        """Process several documents with a single batched `do_parse` call.
+
+        mineru runs model inference over the pages of all documents together, so the per-call
+        overhead is paid once per batch. Cached documents are answered without entering the batch.
+        Office documents are converted on the converter pool while the other documents are parsed,
+        then parsed as a second batch.
+
+        Args:
+            pdf_paths: Paths to the PDF files
+            max_pages: Maximum number of pages to process per document, counted from `start_page`
+            invoke_config: Model configuration dictionary
+            is_ocr: Force OCR mode
+            formula_enable: Enable formula recognition
+            table_enable: Enable table recognition
+            language: Language setting, shared by all documents
+            image_mode: Inline images as base64 or link them by content hash
+            start_page: Index of the first page to process, shared by all documents
+            figure_enable: Keep figures in the markdown and content list
+            debug_pdfs: Render mineru's layout and span PDFs, reported as `model_pdf`
+
+        Returns:
+            OCROutput per document, in the order of `pdf_paths`
+        """
+        outputs: list[OCROutput | None] = [None] * len(pdf_paths)
+        cache_keys: list[str | None] = [None] * len(pdf_paths)
+        with timed("cache_lookup"):
+            for i, pdf_path in enumerate(pdf_paths):
+                cache_keys[i] = self._cache_key(
+                    pdf_path,
+                    max_pages,
+                    invoke_config,
+                    is_ocr,
+                    formula_enable,
+                    table_enable,
+                    language,
+                    image_mode,
+                    start_page=start_page,
+                    figure_enable=figure_enable,
+                    debug_pdfs=debug_pdfs,
+                )
+                if cache_keys[i] is not None:
+                    outputs[i] = self.cache.get(cache_keys[i])
+
+        pending = [i for i, output in enumerate(outputs) if output is None]
+        if not pending:
+            return outputs
+
+        conversions = {}
+        if self.office_converter is not None:
+            conversions = {
+                i: self.office_converter.submit(Path(pdf_paths[i]).read_bytes(), Path(pdf_paths[i]).suffix)
+                for i in pending
+                if is_office_document(pdf_paths[i])
+            }
+        batches = [[i for i in pending if i not in conversions], list(conversions)]
+
+        with self.artifact_store.workspace() as workspace:
+            try:
+                for batch_dir, batch in zip(("documents", "office"), batches):
+                    if not batch:
+                        continue
+                    if batch_dir == "office":
+                        # Converted PDFs are handed over in memory under a .pdf name
+                        doc_paths = [str(Path(pdf_paths[i]).with_suffix(".pdf")) for i in batch]
+                        with timed("office_convert"):
+                            pdf_bytes_list = [conversions[i].result() for i in batch]
+                    else:
+                        doc_paths = [pdf_paths[i] for i in batch]
+                        pdf_bytes_list = None
+                    parse_outputs = self._parse_pdfs(
+                        doc_paths,
+                        workspace / batch_dir,
+                        start_page,
+                        start_page + max_pages - 1 if max_pages > 0 else -1,
+                        invoke_config,
+                        is_ocr,
+                        formula_enable,
+                        table_enable,
+                        language,
+                        debug_pdfs,
+                        pdf_bytes_list,
+                    )
+
+                    for i, parse_output in zip(batch, parse_outputs):
+                        md_content, _, layout_pdf_path = self._read_parse_output(
+                            parse_output, image_mode, figure_enable
+                        )
+                        outputs[i] = self._build_output(
+                            pdf_paths[i], md_content, layout_pdf_path, parse_output, cache_keys[i], figure_enable
+                        )
+            except Exception as e:
+                logger.exception(f"Error processing batch of {len(pending)} documents: {str(e)}")
+                raise
+            finally:
+                for conversion in conversions.values():
+                    conversion.cancel()
+
+        if all(outputs[i].workspace is None for i in pending):
+            self.artifact_store.release(workspace)
+        return outputs
+
+    def _cache_key(
+        self,
+        pdf_path: str,
+        max_pages: int,
+        invoke_config: ModelInvokeConfigDict,
+        is_ocr: bool,
+        formula_enable: bool,
+        table_enable: bool,
+        language: str,
+        image_mode: ImageMode,
+        pdf_bytes: bytes | None = None,
+        start_page: int = 0,
+        figure_enable: bool = True,
+        debug_pdfs: bool = False,
+    ) -> str | None:
+        if self.cache is None:
+            return None
+        return ParseResultCache.make_key(
+            file_digest(pdf_path) if pdf_bytes is None else bytes_digest(pdf_bytes),
+            invoke_config_key(invoke_config),
+            max_pages=max_pages,
+            start_page=start_page,
+            is_ocr=is_ocr,
+            formula_enable=formula_enable,
+            table_enable=table_enable,
+            language=language,
+            image_mode=image_mode,
+            figure_enable=figure_enable,
+            debug_pdfs=debug_pdfs,
+        )
 
-            # Process PDF to markdown and other outputs
-            md_content, txt_content, layout_pdf_path, parse_output = self._process_pdf_to_markdown(
+    def _page_cache_key(
+        self,
+        page_digest: str,
+        invoke_config: ModelInvokeConfigDict,
+        is_ocr: bool,
+        formula_enable: bool,
+        table_enable: bool,
+        language: str,
+        figure_enable: bool,
+    ) -> str:
+        # Pages are cached before image replacement, so the image mode does not matter
+        return ParseResultCache.make_key(
+            page_digest,
+            invoke_config_key(invoke_config),
+            scope="page",
+            is_ocr=is_ocr,
+            formula_enable=formula_enable,
+            table_enable=table_enable,
+            language=language,
+            figure_enable=figure_enable,
+        )
+
+    def _build_output(
+        self,
+        pdf_path: str,
+        md_content: str,
+        layout_pdf_path: str,
+        parse_output: ParsePDFOutput,
+        cache_key: str | None,
+        figure_enable: bool = True,
+    ) -> OCROutput:
+        with timed("content_list"):
+            content_list = _load_content_list(parse_output, parse_output.first_page)
+            if not figure_enable:
+                content_list = [item for item in content_list if item["type"] != "image"]
+            content_list = content_list or [_document_item(Path(pdf_path).stem, parse_output.first_page)]
+
+        output = OCROutput(
+            model_pdf=layout_pdf_path,
+            markdown=md_content,
+            content_list=content_list,
+            images_path=parse_output.images_path,
+            workspace=parse_output.output_path,
+            page_count=parse_output.page_count,
+        )
+        if cache_key is not None:
+            with timed("cache_store"):
+                output = self.cache.put(cache_key, output)
+        return output
+
+    def _process_by_page(
+        self,
+        pdf_path: str,
+        output_dir: Path,
+        start_page_id: int,
+        end_page_id: int,
+        invoke_config: ModelInvokeConfigDict,
+        is_ocr: bool,
+        formula_enable: bool,
+        table_enable: bool,
+        language: str,
+        figure_enable: bool,
+        pdf_bytes: bytes | None,
+        image_mode: ImageMode,
+        cache_key: str | None,
+        cancel_token: CancellationToken | None = None,
+    ) -> OCROutput:
+        """Process a document range by range, reusing cached pages and stopping early when `cancel_token` says so.
+
+        With the page cache, pages whose results are cached are not parsed again. When nothing is cached and the
+        token has no page boundary to stop at, the document is parsed in one call as usual and its pages seed the
+        page cache. Otherwise the missing pages are parsed in runs of consecutive pages, the token is checked
+        between them, and the document is assembled from cached and fresh pages; it has no layout PDF then, as
+        mineru never saw the whole document. Past the deadline, the output covers the pages before the first
+        one left unparsed and is not cached, while its pages are, so a retry continues where it stopped.
+        """
+        pdf_data = self._load_document(pdf_path, pdf_bytes)
+        # The document is converted already, hand it over under a .pdf name
+        pdf_path = str(Path(pdf_path).with_suffix(".pdf"))
+        last_page = _last_page(pdf_data, end_page_id, start_page_id)
+        page_indices = range(start_page_id, last_page + 1)
+
+        page_keys = {}
+        cached_pages = {}
+        if self.page_cache:
+            with timed("cache_lookup"):
+                page_keys = {
+                    page_idx: self._page_cache_key(
+                        digest, invoke_config, is_ocr, formula_enable, table_enable, language, figure_enable
+                    )
+                    for page_idx, digest in enumerate(_page_digests(pdf_data, start_page_id, last_page), start_page_id)
+                }
+                for page_idx, page_key in page_keys.items():
+                    page = self.cache.get_page(page_key)
+                    if page is not None:
+                        # The page may have had another position when it was cached
+                        content_list = [{**item, "page_num": page_idx} for item in page.content_list]
+                        cached_pages[page_idx] = page.model_copy(
+                            update={"page_idx": page_idx, "content_list": content_list}
+                        )
+
+        single_range = len(page_indices) <= self.pages_per_chunk
+        if not cached_pages and (cancel_token is None or (single_range and not cancel_token.stopped)):
+            md_content, _, layout_pdf_path, parse_output = self._process_pdf_to_markdown(
                 pdf_path,
-                max_pages,
+                output_dir,
+                start_page_id,
+                end_page_id,
                 invoke_config,
                 is_ocr,
                 formula_enable,
                 table_enable,
                 language,
+                figure_enable,
+                False,
+                pdf_data,
+                image_mode,
             )
+            if page_keys:
+                with timed("cache_store"):
+                    for page in self._split_pages(parse_output, start_page_id, figure_enable):
+                        self.cache.put_page(page_keys[page.page_idx], page)
+            return self._build_output(pdf_path, md_content, layout_pdf_path, parse_output, cache_key, figure_enable)
 
-            # Generate content list from markdown
-            content_list = self._extract_content_list(md_content, name_without_suffix)
+        if cached_pages:
+            logger.debug(f"Reusing {len(cached_pages)} of {len(page_keys)} cached pages of {pdf_path}")
+        images_path = output_dir / "images"
+        images_path.mkdir()
+        pages = dict(cached_pages)
+        for page in cached_pages.values():
+            _link_images(page.images_path, str(images_path))
 
-            return OCROutput(
-                model_pdf=layout_pdf_path,
-                markdown=md_content,
-                content_list=content_list,
+        missing_pages = [page_idx for page_idx in page_indices if page_idx not in cached_pages]
+        for start_page, chunk in self._iter_page_ranges(
+            pdf_data,
+            output_dir / "chunks",
+            _runs_to_ranges(missing_pages, self.pages_per_chunk),
+            "ocr" if is_ocr else "auto",
+            invoke_config,
+            formula_enable,
+            table_enable,
+            language,
+            cancel_token=cancel_token,
+        ):
+            for page in self._split_pages(chunk, start_page, figure_enable):
+                if page_keys:
+                    with timed("cache_store"):
+                        self.cache.put_page(page_keys[page.page_idx], page)
+                pages[page.page_idx] = page
+            _move_images(chunk.images_path, str(images_path))
+        shutil.rmtree(output_dir / "chunks", ignore_errors=True)
+
+        parsed_pages = list(takewhile(pages.__contains__, page_indices))
+        partial = len(parsed_pages) < len(page_indices)
+        if partial:
+            # Ranges end early once the token stopped, pages mineru skipped leave a gap without one
+            if cancel_token is not None and cancel_token.cancelled:
+                raise ParseCancelled(cancel_token.reason)
+            logger.info(f"Parse stopped after {len(parsed_pages)} of {len(page_indices)} pages of {pdf_path}")
+
+        ordered_pages = [pages[page_idx] for page_idx in parsed_pages]
+        txt_content = "\n\n".join(page.markdown for page in ordered_pages if page.markdown)
+        with timed("images"):
+            md_content = self._replace_images(txt_content, str(images_path), image_mode)
+        content_list = [item for page in ordered_pages for item in page.content_list]
+        output = OCROutput(
+            model_pdf="",
+            markdown=md_content,
+            content_list=content_list or [_document_item(Path(pdf_path).stem, start_page_id)],
+            images_path=str(images_path),
+            workspace=str(output_dir),
+            page_count=len(ordered_pages),
+            partial=partial,
+        )
+        if cache_key is not None and not partial:
+            with timed("cache_store"):
+                output = self.cache.put(cache_key, output)
+        return output
+
+    def _split_pages(
+        self, parse_output: ParsePDFOutput, page_offset: int, figure_enable: bool = True
+    ) -> Iterator[PageOutput]:
+        """Per-page markdown (images still linked relatively) and content list of a parse starting at `page_offset`"""
+        middle = _read_json(parse_output.middle_json)
+        if middle is None:
+            logger.warning(f"Middle JSON 파일을 찾을 수 없습니다: {parse_output.middle_json}")
+            return
+
+        page_items = defaultdict(list)
+        for item in _load_content_list(parse_output, page_offset, middle):
+            if figure_enable or item["type"] != "image":
+                page_items[item["page_num"]].append(item)
+
+        for page_info in middle.get("pdf_info", []):
+            page_idx = page_offset + page_info.get("page_idx", 0)
+            if not figure_enable:
+                page_info = _without_figures(page_info)
+            yield PageOutput(
+                page_idx=page_idx,
+                markdown=union_make([page_info], MakeMode.MM_MD, Path(parse_output.images_path).name),
+                content_list=page_items.get(page_idx, []),
                 images_path=parse_output.images_path,
             )
 
-        except Exception as e:
-            logger.exception(f"Error processing document {pdf_path}: {str(e)}")
-            raise
-
     def _process_pdf_to_markdown(
         self,
         file_path: str,
-        end_pages: int,
+        output_dir: PathLike,
+        start_page_id: int,
+        end_page_id: int,
         invoke_config: ModelInvokeConfigDict,
         is_ocr: bool,
         formula_enable: bool,
         table_enable: bool,
         language: str,
+        figure_enable: bool = True,
+        debug_pdfs: bool = False,
+        pdf_bytes: bytes | None = None,
+        image_mode: ImageMode = "base64",
     ) -> tuple[str, str, str, ParsePDFOutput]:
         """PDF를 Markdown으로 변환하는 메인 함수"""
         # PDF 분석 및 변환
-        temp_dir = Path(tempfile.mkdtemp())
-        parse_output = self._parse_pdf(
+        parse_pdf = self._parse_pdf_parallel if self.page_parallelism > 1 else self._parse_pdf
+        parse_output = parse_pdf(
             file_path,
-            temp_dir,
-            end_pages - 1 if end_pages > 0 else -1,
+            output_dir,
+            start_page_id,
+            end_page_id,
             invoke_config,
             is_ocr,
             formula_enable,
             table_enable,
             language,
+            debug_pdfs,
+            pdf_bytes,
         )
 
+        md_content, txt_content, layout_pdf_path = self._read_parse_output(parse_output, image_mode, figure_enable)
+        return md_content, txt_content, layout_pdf_path, parse_output
+
+    def _read_parse_output(
+        self, parse_output: ParsePDFOutput, image_mode: ImageMode = "base64", figure_enable: bool = True
+    ) -> tuple[str, str, str]:
+        """Read the markdown written by mineru and locate the layout PDF"""
         # Markdown 파일 읽기
-        if not os.path.exists(parse_output.markdown):
-            logger.warning(f"Markdown 파일을 찾을 수 없습니다: {parse_output.markdown}")
-            txt_content = ""
-        else:
-            with open(parse_output.markdown, "r", encoding="utf-8") as f:
-                txt_content = f.read()
+        with timed("read_markdown"):
+            middle = None if figure_enable else _read_json(parse_output.middle_json)
+            if middle is not None:
+                # mineru always extracts figures, without them the markdown is rebuilt from middle_json
+                pdf_info = [_without_figures(page_info) for page_info in middle.get("pdf_info", [])]
+                txt_content = union_make(pdf_info, MakeMode.MM_MD, Path(parse_output.images_path).name)
+            elif not os.path.exists(parse_output.markdown):
+                logger.warning(f"Markdown 파일을 찾을 수 없습니다: {parse_output.markdown}")
+                txt_content = ""
+            else:
+                with open(parse_output.markdown, "r", encoding="utf-8") as f:
+                    txt_content = f.read()
 
-        # 이미지를 base64로 변환한 Markdown 생성
-        md_content = self._replace_image_with_base64(txt_content, parse_output.images_path)
+        with timed("images"):
+            md_content = self._replace_images(txt_content, parse_output.images_path, image_mode)
 
         # 레이아웃이 그려진 PDF 경로 확인
         layout_pdf_path = parse_output.layout_pdf
@@ -127,47 +912,125 @@ class ParseService:
                     layout_pdf_path = alt_path
                     break
             else:
-                logger.warning(f"Layout PDF를 찾을 수 없습니다: {layout_pdf_path}")
+                # Debug PDFs are only rendered on request
                 layout_pdf_path = ""
 
-        return md_content, txt_content, layout_pdf_path, parse_output
+        return md_content, txt_content, layout_pdf_path
 
     def _parse_pdf(
         self,
         doc_path: str,
         output_dir: PathLike,
+        start_page_id: int,
         end_page_id: int,
         invoke_config: ModelInvokeConfigDict,
         is_ocr: bool,
         formula_enable: bool,
         table_enable: bool,
         language: str,
+        debug_pdfs: bool = False,
+        pdf_bytes: bytes | None = None,
     ) -> ParsePDFOutput:
         """
         Parse PDF using mineru
 
         Returns: ParsePDFOutput
         """
+        return self._parse_pdfs(
+            [doc_path],
+            output_dir,
+            start_page_id,
+            end_page_id,
+            invoke_config,
+            is_ocr,
+            formula_enable,
+            table_enable,
+            language,
+            debug_pdfs,
+            [pdf_bytes],
+        )[0]
+
+    def _parse_pdfs(
+        self,
+        doc_paths: list[str],
+        output_dir: PathLike,
+        start_page_id: int,
+        end_page_id: int,
+        invoke_config: ModelInvokeConfigDict,
+        is_ocr: bool,
+        formula_enable: bool,
+        table_enable: bool,
+        language: str,
+        debug_pdfs: bool = False,
+        pdf_bytes_list: list[bytes | None] | None = None,
+    ) -> list[ParsePDFOutput]:
+        """
+        Parse PDFs using one batched mineru call
+
+        Returns: ParsePDFOutput per document
+        """
         os.makedirs(output_dir, exist_ok=True)
 
-        file_name = f"{str(Path(doc_path).stem)}_{time.strftime('%y%m%d_%H%M%S')}"
-        pdf_data = read_fn(doc_path)
+        timestamp = time.strftime("%y%m%d_%H%M%S")
+        if len(doc_paths) == 1:
+            file_names = [f"{str(Path(doc_paths[0]).stem)}_{timestamp}"]
+        else:
+            # Index suffix keeps output directories apart when documents share a stem
+            file_names = [f"{str(Path(doc_path).stem)}_{timestamp}_{i}" for i, doc_path in enumerate(doc_paths)]
+        pdf_data_list = [
+            self._load_document(doc_path, data)
+            for doc_path, data in zip(doc_paths, pdf_bytes_list or [None] * len(doc_paths))
+        ]
+
+        page_counts = [
+            _last_page(pdf_data, end_page_id, start_page_id) + 1 - start_page_id for pdf_data in pdf_data_list
+        ]
 
         parse_method = "ocr" if is_ocr else "auto"
-        local_image_dir, local_md_dir = prepare_env(str(output_dir), file_name, parse_method)
+        with timed("prepare_env"):
+            envs = [prepare_env(str(output_dir), file_name, parse_method) for file_name in file_names]
 
-        do_parse(
-            output_dir=str(output_dir),
-            pdf_file_names=[file_name],
-            pdf_bytes_list=[pdf_data],
-            p_lang_list=[language],
-            parse_method=parse_method,
-            invoke_config=invoke_config,
-            end_page_id=end_page_id,
-            p_formula_enable=formula_enable,
-            p_table_enable=table_enable,
-        )
+        with timed("do_parse"):
+            do_parse(
+                output_dir=str(output_dir),
+                pdf_file_names=file_names,
+                pdf_bytes_list=pdf_data_list,
+                p_lang_list=[language] * len(doc_paths),
+                parse_method=parse_method,
+                invoke_config=invoke_config,
+                start_page_id=start_page_id,
+                end_page_id=end_page_id,
+                p_formula_enable=formula_enable,
+                p_table_enable=table_enable,
+                **_debug_pdf_flags(debug_pdfs),
+            )
+
+        return [
+            self._make_parse_output(output_dir, file_name, local_image_dir, local_md_dir, page_count, start_page_id)
+            for file_name, (local_image_dir, local_md_dir), page_count in zip(file_names, envs, page_counts)
+        ]
+
+    def _load_document(self, doc_path: str, data: bytes | None = None) -> bytes:
+        """PDF bytes of a document, office documents are converted on the converter pool"""
+        if not is_office_document(doc_path):
+            with timed("read"):
+                return _load_pdf_bytes(doc_path, data)
+        if self.office_converter is None:
+            raise OfficeConversionError("Office document conversion is disabled")
+        with timed("office_convert"):
+            if data is None:
+                data = Path(doc_path).read_bytes()
+            return self.office_converter.convert(data, Path(doc_path).suffix)
 
+    def _make_parse_output(
+        self,
+        output_dir: PathLike,
+        file_name: str,
+        local_image_dir: str,
+        local_md_dir: str,
+        page_count: int = 0,
+        first_page: int = 0,
+    ) -> ParsePDFOutput:
         # mineru의 출력 구조에 맞게 경로 설정
         complete_path = Path(local_md_dir)
 
@@ -188,8 +1051,367 @@ class ParseService:
             model_pdf=str(complete_path / make_filename(file_name, "model", "pdf")),
             origin_pdf=str(complete_path / make_filename(file_name, "origin", "pdf")),
             span_pdf=str(complete_path / make_filename(file_name, "span", "pdf")),
+            page_count=page_count,
+            first_page=first_page,
         )
 
+    def _parse_pdf_parallel(
+        self,
+        doc_path: str,
+        output_dir: PathLike,
+        start_page_id: int,
+        end_page_id: int,
+        invoke_config: ModelInvokeConfigDict,
+        is_ocr: bool,
+        formula_enable: bool,
+        table_enable: bool,
+        language: str,
+        debug_pdfs: bool = False,
+        pdf_bytes: bytes | None = None,
+    ) -> ParsePDFOutput:
+        """
+        Split the document into page ranges, parse them on the page process pool and merge the outputs
+        into the layout `_parse_pdf` produces, so the rest of the pipeline does not notice the split.
+
+        Returns: ParsePDFOutput
+        """
+        pdf_data = self._load_document(doc_path, pdf_bytes)
+        last_page = _last_page(pdf_data, end_page_id, start_page_id)
+        if last_page + 1 - start_page_id <= self.pages_per_chunk:
+            # The document is converted already, hand it over under a .pdf name
+            return self._parse_pdf(
+                str(Path(doc_path).with_suffix(".pdf")),
+                output_dir,
+                start_page_id,
+                end_page_id,
+                invoke_config,
+                is_ocr,
+                formula_enable,
+                table_enable,
+                language,
+                debug_pdfs,
+                pdf_data,
+            )
+
+        os.makedirs(output_dir, exist_ok=True)
+        file_name = f"{str(Path(doc_path).stem)}_{time.strftime('%y%m%d_%H%M%S')}"
+        parse_method = "ocr" if is_ocr else "auto"
+        page_ranges = _page_ranges(start_page_id, last_page, self.pages_per_chunk)
+
+        chunks_dir = Path(output_dir) / f"{file_name}_chunks"
+        # Like a single do_parse call, the merged output numbers pages from the first parsed page
+        chunk_outputs = [
+            (start - start_page_id, chunk)
+            for start, chunk in self._iter_page_ranges(
+                pdf_data,
+                chunks_dir,
+                page_ranges,
+                parse_method,
+                invoke_config,
+                formula_enable,
+                table_enable,
+                language,
+                debug_pdfs,
+            )
+        ]
+        del pdf_data
+
+        local_image_dir, local_md_dir = prepare_env(str(output_dir), file_name, parse_method)
+        parse_output = self._make_parse_output(
+            output_dir, file_name, local_image_dir, local_md_dir, last_page + 1 - start_page_id, start_page_id
+        )
+        with timed("merge"):
+            self._merge_parse_outputs(chunk_outputs, parse_output)
+        shutil.rmtree(chunks_dir, ignore_errors=True)
+        return parse_output
+
+    def _iter_page_ranges(
+        self,
+        pdf_data: bytes,
+        chunks_dir: Path,
+        page_ranges: list[tuple[int, int]],
+        parse_method: str,
+        invoke_config: ModelInvokeConfigDict,
+        formula_enable: bool,
+        table_enable: bool,
+        language: str,
+        debug_pdfs: bool = False,
+        cancel_token: CancellationToken | None = None,
+    ) -> Iterator[tuple[int, ParsePDFOutput]]:
+        """
+        Parse page ranges and yield (first page, output) in page order as soon as each range is done.
+        Ranges run on the page process pool when page parallelism is enabled, otherwise one by one in-process.
+        Closing the generator early, or `cancel_token` stopping before a range, cancels ranges that have not
+        started yet; a range that is running always finishes, mineru cannot be interrupted within a call.
+        """
+        futures = []
+        if self.page_parallelism > 1:
+            executor = _get_page_executor(self.page_parallelism)
+            futures = [
+                executor.submit(
+                    _parse_page_range,
+                    str(chunks_dir),
+                    f"p{start:05d}",
+                    convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_data, start, end),
+                    parse_method,
+                    invoke_config,
+                    formula_enable,
+                    table_enable,
+                    language,
+                    debug_pdfs,
+                )
+                for start, end in page_ranges
+            ]
+
+        try:
+            for i, (start, end) in enumerate(page_ranges):
+                if cancel_token is not None and cancel_token.stopped:
+                    return
+                # With a page pool this is the wait for the range, i.e. the part of parsing not yet overlapped
+                with timed("do_parse"):
+                    if futures:
+                        futures[i].result()
+                    else:
+                        _parse_page_range(
+                            str(chunks_dir),
+                            f"p{start:05d}",
+                            convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_data, start, end),
+                            parse_method,
+                            invoke_config,
+                            formula_enable,
+                            table_enable,
+                            language,
+                            debug_pdfs,
+                        )
+                yield start, self._make_parse_output(
+                    chunks_dir,
+                    f"p{start:05d}",
+                    os.path.join(chunks_dir, f"p{start:05d}", parse_method, "images"),
+                    os.path.join(chunks_dir, f"p{start:05d}", parse_method),
+                )
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def iter_pages(
+        self,
+        pdf_path: str,
+        max_pages: int,
+        invoke_config: ModelInvokeConfigDict,
+        is_ocr: bool = False,
+        formula_enable: bool = False,
+        table_enable: bool = False,
+        language: str = "korean",
+        pdf_bytes: bytes | None = None,
+        image_mode: ImageMode = "base64",
+        start_page: int = 0,
+        figure_enable: bool = True,
+        cancel_token: CancellationToken | None = None,
+    ) -> Iterator[PageOutput]:
+        """Parse a document range by range and yield every page as soon as its range is finished.
+
+        The first range holds a single page so the first result arrives after one page of work; later
+        ranges use `pages_per_chunk`. All pages share one images directory, reported in `PageOutput.images_path`,
+        inside an artifact store workspace the caller releases once it no longer needs the images.
+
+        Args:
+            pdf_path: Path to the PDF file, or only its name when `pdf_bytes` is given
+            max_pages: Maximum number of pages to process, counted from `start_page`
+            invoke_config: Model configuration dictionary
+            is_ocr: Force OCR mode
+            formula_enable: Enable formula recognition
+            table_enable: Enable table recognition
+            language: Language setting
+            pdf_bytes: Document content already held in memory
+            image_mode: Inline images as base64 or link them by content hash
+            start_page: Index of the first page to process
+            figure_enable: Keep figures in the markdown and content list
+            cancel_token: Checked between ranges, once it stopped `ParseCancelled` is raised after the pages
+                parsed so far
+
+        Yields:
+            PageOutput per page, in page order
+        """
+        pdf_data = self._load_document(pdf_path, pdf_bytes)
+        last_page = _last_page(pdf_data, start_page + max_pages - 1 if max_pages > 0 else -1, start_page)
+        page_ranges = []
+        if last_page >= start_page:
+            page_ranges = [(start_page, start_page)] + _page_ranges(start_page + 1, last_page, self.pages_per_chunk)
+
+        parse_method = "ocr" if is_ocr else "auto"
+        name_without_suffix = Path(pdf_path).stem
+
+        with self.artifact_store.workspace() as output_dir:
+            images_path = output_dir / "images"
+            images_path.mkdir()
+
+            parsed_ranges = 0
+            for chunk_start, chunk in self._iter_page_ranges(
+                pdf_data,
+                output_dir / "chunks",
+                page_ranges,
+                parse_method,
+                invoke_config,
+                formula_enable,
+                table_enable,
+                language,
+                cancel_token=cancel_token,
+            ):
+                parsed_ranges += 1
+                _move_images(chunk.images_path, str(images_path))
+                for page in self._split_pages(chunk, chunk_start, figure_enable):
+                    yield PageOutput(
+                        page_idx=page.page_idx,
+                        markdown=self._replace_images(page.markdown, str(images_path), image_mode),
+                        content_list=page.content_list or [_document_item(name_without_suffix, page.page_idx)],
+                        images_path=str(images_path),
+                        workspace=str(output_dir),
+                    )
+
+            shutil.rmtree(output_dir / "chunks", ignore_errors=True)
+            if parsed_ranges < len(page_ranges):
+                raise ParseCancelled(cancel_token.reason)
+
+    def iter_submitted_pages(
+        self,
+        parse_page: Callable[[str], OCROutput],
+        pdf_path: str,
+        max_pages: int,
+        staging_dir: str,
+        pdf_bytes: bytes | None = None,
+        start_page: int = 0,
+        cancel_token: CancellationToken | None = None,
+    ) -> Iterator[PageOutput]:
+        """Like `iter_pages`, but every page is parsed elsewhere by its own `process_document` call.
+
+        Every page is cut into a one-page PDF under `staging_dir` and `parse_page(path)` parses it, e.g. on the
+        worker pool or a worker node, where the result and page caches answer pages parsed before. Workers only
+        ever read, hash and cache that page, not the whole document. Up to `pages_per_chunk` pages are parsed at
+        once, and their images are gathered in one artifact store workspace the caller releases.
+        """
+        pdf_data = self._load_document(pdf_path, pdf_bytes)
+        last_page = _last_page(pdf_data, start_page + max_pages - 1 if max_pages > 0 else -1, start_page)
+        page_indices = iter(range(start_page, last_page + 1))
+        staged_dir = Path(staging_dir) / uuid.uuid4().hex
+        file_name = f"{Path(pdf_path).stem}.pdf"
+
+        def submit(page_idx: int) -> tuple[int, Future]:
+            # Cut here rather than on the executor threads, pdfium is not thread-safe
+            page_path = staged_dir / f"p{page_idx:05d}" / file_name
+            page_path.parent.mkdir(parents=True)
+            page_path.write_bytes(convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_data, page_idx, page_idx))
+            return page_idx, executor.submit(parse_page, str(page_path))
+
+        executor = ThreadPoolExecutor(max_workers=self.pages_per_chunk, thread_name_prefix="qocr-stream")
+        pending = deque()
+        try:
+            with self.artifact_store.workspace() as output_dir:
+                images_path = output_dir / "images"
+                images_path.mkdir()
+                pending.extend(submit(page_idx) for page_idx in islice(page_indices, self.pages_per_chunk))
+                while pending:
+                    if cancel_token is not None and cancel_token.stopped:
+                        raise ParseCancelled(cancel_token.reason)
+                    page_idx, future = pending.popleft()
+                    output = future.result()
+                    if (next_page := next(page_indices, None)) is not None:
+                        pending.append(submit(next_page))
+                    _link_images(output.images_path, str(images_path))
+                    self.artifact_store.release(output.workspace)
+                    yield PageOutput(
+                        page_idx=page_idx,
+                        markdown=output.markdown,
+                        # Pages were parsed as the first page of their own PDF
+                        content_list=[{**item, "page_num": page_idx} for item in output.content_list],
+                        images_path=str(images_path),
+                        workspace=str(output_dir),
+                    )
+        finally:
+            # Pages not handed to a worker yet are dropped, the running ones still read their PDF
+            executor.shutdown(wait=True, cancel_futures=True)
+            for _, future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    self.artifact_store.release(future.result().workspace)
+            shutil.rmtree(staged_dir, ignore_errors=True)
+
+    def _merge_parse_outputs(self, chunk_outputs: list[tuple[int, ParsePDFOutput]], merged: ParsePDFOutput) -> None:
+        """Merge per-range outputs in page order, shifting page indices by the first page of each range"""
+        markdown_parts = []
+        content_list = []
+        middle = None
+        for start_page, chunk in chunk_outputs:
+            _move_images(chunk.images_path, merged.images_path)
+
+            if os.path.exists(chunk.markdown):
+                with open(chunk.markdown, "r", encoding="utf-8") as f:
+                    markdown_parts.append(f.read().strip("\n"))
+
+            for item in _read_json(chunk.content_list_json) or []:
+                item["page_idx"] = item.get("page_idx", 0) + start_page
+                content_list.append(item)
+
+            chunk_middle = _read_json(chunk.middle_json)
+            if chunk_middle is not None:
+                for page_info in chunk_middle.get("pdf_info", []):
+                    page_info["page_idx"] = page_info.get("page_idx", 0) + start_page
+                if middle is None:
+                    middle = chunk_middle
+                else:
+                    middle["pdf_info"].extend(chunk_middle.get("pdf_info", []))
+
+        with open(merged.markdown, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(part for part in markdown_parts if part))
+        with open(merged.content_list_json, "w", encoding="utf-8") as f:
+            ujson.dump(content_list, f, ensure_ascii=False)
+        if middle is not None:
+            with open(merged.middle_json, "w", encoding="utf-8") as f:
+                ujson.dump(middle, f, ensure_ascii=False)
+
+        for field in ("layout_pdf", "span_pdf", "origin_pdf"):
+            parts = [getattr(chunk, field) for _, chunk in chunk_outputs if os.path.exists(getattr(chunk, field))]
+            if len(parts) != len(chunk_outputs):
+                continue
+            merged_pdf = pdfium.PdfDocument.new()
+            try:
+                for part in parts:
+                    part_pdf = pdfium.PdfDocument(part)
+                    merged_pdf.import_pages(part_pdf)
+                    part_pdf.close()
+                merged_pdf.save(getattr(merged, field))
+            finally:
+                merged_pdf.close()
+
+    def _replace_images(self, markdown_text: str, image_dir_path: str, image_mode: ImageMode) -> str:
+        if image_mode == "reference" and self.image_store is not None:
+            return self._replace_image_with_reference(markdown_text, image_dir_path)
+        # 이미지를 base64로 변환한 Markdown 생성
+        return self._replace_image_with_base64(markdown_text, image_dir_path)
+
+    def _replace_image_with_reference(self, markdown_text: str, image_dir_path: str) -> str:
+        """Link markdown images to their content-addressed copy in the image store"""
+        pattern = r"\!\[([^\]]*)\]\(([^)]+)\)"
+        stored: dict[str, str] = {}
+
+        def replace(match):
+            alt_text, relative_path = match.group(1), match.group(2)
+            if relative_path not in stored:
+                # mineru links images relative to the markdown file, i.e. as "images/<name>"
+                for full_path in (
+                    os.path.join(image_dir_path, relative_path),
+                    os.path.join(os.path.dirname(image_dir_path), relative_path),
+                ):
+                    if os.path.isfile(full_path):
+                        try:
+                            stored[relative_path] = self.image_store.put(full_path)
+                        except OSError as e:
+                            logger.warning(f"Failed to store image: {full_path}, error: {e}")
+                        break
+            if relative_path not in stored:
+                return match.group(0)
+            return f"![{alt_text}]({self.image_base_url}{stored[relative_path]})"
+
+        return re.sub(pattern, replace, markdown_text)
+
     def _replace_image_with_base64(self, markdown_text: str, image_dir_path: str) -> str:
         """Markdown의 이미지 링크를 base64로 변환"""
         # Markdown의 이미지 태그 매칭
@@ -225,71 +1447,3 @@ class ParseService:
 
         # 교체 적용
         return re.sub(pattern, replace, markdown_text)
-
-    def _extract_content_list(self, markdown_content: str, file_name: str) -> list[dict]:
-        """Extract content list from markdown for compatibility"""
-        try:
-            # 간단한 content list 생성 - 실제 구현에서는 더 정교한 파싱 필요
-            content_list = []
-
-            # 헤더들을 찾아서 content list 생성
-            lines = markdown_content.split("\n")
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line.startswith("#"):
-                    # 헤더 레벨 계산
-                    level = len(line) - len(line.lstrip("#"))
-                    title = line.lstrip("#").strip()
-
-                    if title:  # 빈 제목이 아닌 경우만
-                        content_list.append(
-                            {
-                                "type": "title",
-                                "level": level,
-                                "content": title,
-                                "page_num": 0,  # 실제 구현에서는 페이지 번호 추출 필요
-                                "bbox": [0, 0, 0, 0],  # 실제 구현에서는 실제 bbox 필요
-                            }
-                        )
-
-                # 이미지 찾기
-                elif "![" in line and "](" in line:
-                    # 이미지 정보 추출
-                    import re
-
-                    img_pattern = r"!\[([^\]]*)\]\(([^)]+)\)"
-                    matches = re.findall(img_pattern, line)
-                    for alt_text, img_src in matches:
-                        content_list.append(
-                            {
-                                "type": "image",
-                                "content": alt_text or "image",
-                                "img_path": img_src,
-                                "page_num": 0,
-                                "bbox": [0, 0, 0, 0],
-                            }
-                        )
-
-            # 최소한 하나의 항목은 있어야 함
-            if not content_list:
-                content_list.append(
-                    {
-                        "type": "document",
-                        "content": f"Processed document: {file_name}",
-                        "page_num": 0,
-                        "bbox": [0, 0, 0, 0],
-                    }
-                )
-
-            return content_list
-
-        except Exception as e:
-            logger.warning(f"Failed to extract content list: {e}")
-            return [
-                {
-                    "type": "document",
-                    "content": f"Processed document: {file_name}",
-                    "page_num": 0,
-                    "bbox": [0, 0, 0, 0],
-                }
-            ]
@@ -0,0 +1,208 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from .artifact_store import ArtifactStore
+
+PROFILE_FILE = "profile.json"
+COLLAPSED_FILE = "cpu.collapsed"
+# Stacks deeper than this are cut at the root side, mineru pipelines rarely get close
+MAX_STACK_DEPTH = 128
+# Traced memory growth over the last snapshot that makes the sampler take a new one, snapshots copy every trace
+PEAK_SNAPSHOT_GROWTH = 1.25
+PEAK_CHECK_EVERY = 20
+
+_active_lock = threading.Lock()
+_thread_start = threading.Thread.start
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when another request of the process is being profiled"""
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class RequestProfiler:
+    """CPU and memory profile of one request, written to an artifact workspace when stopped.
+
+    A sampling thread records the Python stack of the request thread, the thread calling `start()`, and of the
+    threads it starts meanwhile (and those they start) each `interval` seconds; threads started before, such as
+    other requests or long-lived pools, are left out. The samples are wall-clock: a thread blocked on a lock or
+    on a worker process shows up in the frame it waits in, so a parse running in another process is not profiled.
+    `tracemalloc` traces the allocations of the process meanwhile, and the sampler snapshots the top
+    allocations whenever traced memory grew past the previous snapshot, so the report shows them near the
+    peak rather than after the request freed them. Tracing is process-wide, so one request is profiled at a time
+    and the memory figures include whatever other requests of the process allocate meanwhile.
+
+    The workspace holds `profile.json`, a summary with the hottest functions, memory and stage timings, and
+    `cpu.collapsed`, the samples as collapsed stacks for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, store: ArtifactStore, interval: float = 0.005, top: int = 25) -> None:
+        self.store = store
+        self.interval = interval
+        self.top = top
+        # Seconds per pipeline stage of the request, reported with the samples
+        self.stages: dict[str, float] = {}
+        self.workspace: Path | None = None
+        self._samples: Counter[tuple[str, ...]] = Counter()
+        # Threads whose stacks are sampled: the request thread and the threads started from sampled ones
+        self._threads: set[int] = set()
+        self._peak_snapshot: tracemalloc.Snapshot | None = None
+        self._peak_snapshot_size = 0
+        self._started_tracing = False
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._stack = ExitStack()
+
+    @property
+    def profile_id(self) -> str:
+        return self.workspace.name
+
+    def start(self) -> "RequestProfiler":
+        if not _active_lock.acquire(blocking=False):
+            raise ProfilerBusy("Another request is being profiled")
+        self._stack.callback(_active_lock.release)
+        try:
+            # Leased until the profile is written, the id is handed out before
+            self.workspace = self._stack.enter_context(self.store.workspace())
+        except BaseException:
+            self._stack.close()
+            raise
+
+        self._threads.add(threading.get_ident())
+        sampled_threads = self._threads
+
+        def start_thread(thread: threading.Thread) -> None:
+            _thread_start(thread)
+            if threading.get_ident() in sampled_threads:
+                sampled_threads.add(thread.ident)
+
+        # Threads only learn who started them here, `_active_lock` keeps the patch to one profiler at a time
+        threading.Thread.start = start_thread
+        self._stack.callback(setattr, threading.Thread, "start", _thread_start)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._thread = threading.Thread(target=self._sample, name="qocr-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop sampling and tracing and write the profile, further calls do nothing"""
+        if self._thread is None or self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._thread.join()
+        wall_seconds = time.perf_counter() - self._started
+        cpu_seconds = time.process_time() - self._cpu_started
+        try:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = self._peak_snapshot or tracemalloc.take_snapshot()
+            if self._started_tracing:
+                tracemalloc.stop()
+            profile = {
+                "wall_seconds": round(wall_seconds, 4),
+                "cpu_seconds": round(cpu_seconds, 4),
+                "stages": {stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+                **self._cpu_summary(),
+                "memory": {
+                    "current_bytes": current,
+                    "peak_bytes": peak,
+                    "top_allocations": self._top_allocations(snapshot),
+                },
+            }
+            (self.workspace / PROFILE_FILE).write_text(json.dumps(profile, ensure_ascii=False, indent=2))
+            with open(self.workspace / COLLAPSED_FILE, "w") as collapsed:
+                for stack, count in self._samples.most_common():
+                    collapsed.write(f"{';'.join(stack)} {count}\n")
+        finally:
+            self._stack.close()
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        samples = 0
+        while not self._stopping.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or thread_id not in self._threads:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self._samples[tuple(reversed(stack))] += 1
+            samples += 1
+            if samples % PEAK_CHECK_EVERY == 0:
+                self._snapshot_peak()
+
+    def _snapshot_peak(self) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        if current > self._peak_snapshot_size * PEAK_SNAPSHOT_GROWTH:
+            self._peak_snapshot = tracemalloc.take_snapshot()
+            self._peak_snapshot_size = current
+
+    def _cpu_summary(self) -> dict:
+        threads: Counter[str] = Counter()
+        self_samples: Counter[str] = Counter()
+        total_samples: Counter[str] = Counter()
+        for stack, count in self._samples.items():
+            threads[stack[0]] += count
+            if len(stack) > 1:
+                self_samples[stack[-1]] += count
+            # Recursive functions count once per sample
+            for label in set(stack[1:]):
+                total_samples[label] += count
+        samples = sum(self._samples.values())
+
+        def top(counter: Counter[str]) -> list[dict]:
+            return [
+                {"function": label, "samples": count, "share": round(count / samples, 4)}
+                for label, count in counter.most_common(self.top)
+            ]
+
+        return {
+            "sample_interval": self.interval,
+            "samples": samples,
+            "threads": dict(threads.most_common()),
+            "top_self": top(self_samples),
+            "top_total": top(total_samples),
+        }
+
+    def _top_allocations(self, snapshot: tracemalloc.Snapshot) -> list[dict]:
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[: self.top]
+        ]
+
+
+def load_profile(store: ArtifactStore, profile_id: str, file_name: str = PROFILE_FILE) -> Path | None:
+    """File of a profile written by `RequestProfiler`, or None for unknown or expired ids"""
+    workspace = store.get(profile_id)
+    if workspace is None:
+        return None
+    path = workspace / file_name
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from importlib.metadata import PackageNotFoundError, version
+from itertools import chain
+from pathlib import Path
+
+from loguru import logger
+
+from ..model.entity import OCROutput, PageOutput
+
+OUTPUT_FILE = "output.json"
+PAGE_FILE = "page.json"
+ARCHIVE_FILE = "archive.b64"
+IMAGES_DIR = "images"
+# Bump when the shape of cached outputs changes, so older entries are no longer hit
+CACHE_FORMAT = 2
+# Relative image links of mineru markdown and content lists
+IMAGE_LINK_PATTERN = re.compile(r"images/([^)\s\"']+)")
+
+
+def _pipeline_version() -> str:
+    try:
+        return version("mineru")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file, read in chunks so large documents are never loaded at once"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _link_or_copy(source: str | Path, target: str | Path) -> None:
+    """Hardlink an image into a cache entry instead of copying its bytes, copy across file systems"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class ParseResultCache:
+    """Content-addressed on-disk cache of parse results with size-bounded LRU eviction.
+
+    Entries are keyed by the document bytes and every option that changes the output (normalized
+    invoke_config including model versions, parse flags, language and the mineru version). An entry holds
+    the `OCROutput`, a copy of the extracted images and, once built, the compressed archive. Entries are
+    written to a temporary directory and renamed into place, so concurrent writers never expose partial data.
+
+    Single pages are cached the same way, as a `PageOutput` with the images it links, under keys derived from
+    a fingerprint of the page instead of the whole document. Both kinds share the size bound, which `sweep()`
+    enforces periodically on the artifact sweeper thread rather than on every write.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._sweep_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(document_digest: str, config_key: str, **options) -> str:
+        payload = {
+            "document": document_digest,
+            "invoke_config": config_key,
+            "options": options,
+            "pipeline": _pipeline_version(),
+            "format": CACHE_FORMAT,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def get(self, key: str) -> OCROutput | None:
+        output_file = self._entry_dir(key) / OUTPUT_FILE
+        try:
+            output = OCROutput.model_validate_json(output_file.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Dropping unreadable parse cache entry {key}: {e}")
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            return None
+
+        # mtime of the output file is the LRU clock
+        os.utime(output_file)
+        return output.model_copy(update={"cached": True})
+
+    def put(self, key: str, output: OCROutput) -> OCROutput:
+        """Store `output` and return a copy that points at the cached images"""
+        entry_dir = self._entry_dir(key)
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging_dir = Path(tempfile.mkdtemp(dir=entry_dir.parent, prefix=f".{key[:8]}-"))
+        try:
+            images_dir = staging_dir / IMAGES_DIR
+            if output.images_path and os.path.isdir(output.images_path):
+                shutil.copytree(output.images_path, images_dir, copy_function=_link_or_copy)
+            else:
+                images_dir.mkdir()
+
+            model_pdf = ""
+            if output.model_pdf and os.path.exists(output.model_pdf):
+                model_pdf = str(entry_dir / Path(output.model_pdf).name)
+                shutil.copy2(output.model_pdf, staging_dir / Path(output.model_pdf).name)
+
+            cached = output.model_copy(
+                update={
+                    "images_path": str(entry_dir / IMAGES_DIR),
+                    "model_pdf": model_pdf,
+                    "cache_key": key,
+                    "workspace": None,
+                    "timings": {},
+                }
+            )
+            (staging_dir / OUTPUT_FILE).write_text(cached.model_dump_json(), encoding="utf-8")
+
+            try:
+                os.rename(staging_dir, entry_dir)
+            except OSError:
+                # Another worker stored the same document first
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        return cached
+
+    def get_page(self, key: str) -> PageOutput | None:
+        page_file = self._entry_dir(key) / PAGE_FILE
+        try:
+            page = PageOutput.model_validate_json(page_file.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Dropping unreadable page cache entry {key}: {e}")
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            return None
+
+        os.utime(page_file)
+        return page.model_copy(update={"images_path": str(self._entry_dir(key) / IMAGES_DIR)})
+
+    def put_page(self, key: str, page: PageOutput) -> None:
+        """Store `page` with the images its markdown and content list link to"""
+        entry_dir = self._entry_dir(key)
+        if entry_dir.is_dir():
+            return
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging_dir = Path(tempfile.mkdtemp(dir=entry_dir.parent, prefix=f".{key[:8]}-"))
+        try:
+            images_dir = staging_dir / IMAGES_DIR
+            images_dir.mkdir()
+            links = [page.markdown, *(item.get("img_path", "") for item in page.content_list)]
+            for name in {name for link in links for name in IMAGE_LINK_PATTERN.findall(link)}:
+                image_path = Path(page.images_path) / name
+                if image_path.is_file():
+                    _link_or_copy(image_path, images_dir / name)
+
+            cached = page.model_copy(update={"images_path": "", "workspace": None})
+            (staging_dir / PAGE_FILE).write_text(cached.model_dump_json(), encoding="utf-8")
+            try:
+                os.rename(staging_dir, entry_dir)
+            except OSError:
+                # Another worker stored the same page first
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+    def get_archive(self, key: str) -> str | None:
+        try:
+            return (self._entry_dir(key) / ARCHIVE_FILE).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put_archive(self, key: str, archive: str) -> None:
+        entry_dir = self._entry_dir(key)
+        if not entry_dir.is_dir():
+            return
+        tmp_file = entry_dir / f".{ARCHIVE_FILE}.{os.getpid()}"
+        tmp_file.write_text(archive, encoding="utf-8")
+        os.replace(tmp_file, entry_dir / ARCHIVE_FILE)
+
+    def sweep(self) -> None:
+        """Delete least recently used entries until the cache fits into `max_bytes`"""
+        with self._sweep_lock:
+            entries = []
+            total_size = 0
+            entry_files = chain(self.cache_dir.glob(f"*/*/{OUTPUT_FILE}"), self.cache_dir.glob(f"*/*/{PAGE_FILE}"))
+            for output_file in entry_files:
+                entry_dir = output_file.parent
+                try:
+                    last_used = output_file.stat().st_mtime
+                    size = sum(p.stat().st_size for p in entry_dir.rglob("*") if p.is_file())
+                except FileNotFoundError:
+                    continue
+                entries.append((last_used, size, entry_dir))
+                total_size += size
+
+            if total_size <= self.max_bytes:
+                return
+
+            for _, size, entry_dir in sorted(entries, key=lambda entry: entry[0]):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total_size -= size
+                logger.debug(f"Evicted parse cache entry {entry_dir.name} ({size} bytes)")
+                if total_size <= self.max_bytes:
+                    break
+
+
+_cache: ParseResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ParseResultCache | None:
+    """Process-wide parse result cache, or None when QOCR_CACHE_MAX_BYTES disables caching"""
+    global _cache
+    from django.conf import settings
+
+    from .artifact_store import get_artifact_store
+
+    max_bytes = getattr(settings, "QOCR_CACHE_MAX_BYTES", 0)
+    if max_bytes <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ParseResultCache(cache_dir=settings.QOCR_CACHE_DIR, max_bytes=max_bytes)
+            get_artifact_store().start_sweeper(settings.QOCR_ARTIFACT_SWEEP_INTERVAL, _cache)
+        return _cache
@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+
+from loguru import logger
+from PIL import Image
+
+from .ocr_engine import OCREngine, get_ocr_engine
+
+
+class _BatchedOCR:
+    """Drop-in for the `ocr()` call of mineru's PytorchPaddleOCR that routes through the shared OCR engine.
+
+    Tables recognized concurrently submit their cell OCR to the same engine, which batches the recognition
+    of all their crops together instead of each table running its own pass.
+    """
+
+    def __init__(self, engine: OCREngine, timeout: int) -> None:
+        self.engine = engine
+        self.timeout = timeout
+
+    def ocr(self, img, det: bool = True, rec: bool = True, mfd_res=None, tqdm_enable: bool = False):
+        if not det:
+            return [self.engine.recognize(list(img)).result(timeout=self.timeout)]
+        lines = self.engine.submit(img).result(timeout=self.timeout)
+        return [[[line.box, (line.text, line.score)] for line in lines]]
+
+
+class TableService:
+    """Table structure recognition on a bounded thread pool.
+
+    Every pool thread builds its table model once and keeps it, so a request with dozens of tables
+    spreads over `workers` threads without constructing models per request.
+    """
+
+    def __init__(self, workers: int = 4, ocr_engine: OCREngine | None = None, ocr_timeout: int = 120) -> None:
+        self.ocr = _BatchedOCR(ocr_engine or get_ocr_engine(), ocr_timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="qocr-table")
+        self._local = threading.local()
+
+    def table(self, image_bytes: bytes) -> "Future[str]":
+        """Recognize a table image, the future resolves to the table as HTML"""
+        return self._executor.submit(self._recognize, image_bytes)
+
+    def _model(self):
+        model = getattr(self._local, "model", None)
+        if model is None:
+            from mineru.model.table.rapid_table import RapidTableModel
+
+            model = RapidTableModel(self.ocr)
+            self._local.model = model
+            logger.debug(f"Loaded table model on {threading.current_thread().name}")
+        return model
+
+    def _recognize(self, image_bytes: bytes) -> str:
+        with Image.open(BytesIO(image_bytes)) as image:
+            rgb_image = image.convert("RGB")
+        result = self._model().predict(rgb_image)
+        # predict() returns the HTML first, followed by cell boxes and timings
+        html = result[0] if isinstance(result, tuple) else result
+        return html or ""
+
+
+_service: TableService | None = None
+_service_lock = threading.Lock()
+
+
+def get_table_service() -> TableService:
+    """Process-wide table service sized by QOCR_TABLE_WORKERS"""
+    global _service
+    from django.conf import settings
+
+    with _service_lock:
+        if _service is None:
+            _service = TableService(workers=settings.QOCR_TABLE_WORKERS, ocr_timeout=settings.QOCR_OCR_TIMEOUT)
+        return _service
@@ -0,0 +1,383 @@
+import atexit
+import ctypes
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+
+from loguru import logger
+from mineru.utils.enum_class import ModelInvokeConfigDict
+
+from ..metrics import stage_timer
+from ..model.entity import OCROutput
+from .cancellation import CancellationToken, ParseCancelled
+from .parse_service import REQUEST_ERRORS, ParseService, invoke_config_key
+
+
+def _blank_pdf_bytes() -> bytes:
+    """Build a minimal one-page PDF used to pull every model of the pipeline into memory"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << >> /Contents 4 0 R >>",
+        b"<< /Length 0 >>\nstream\n\nendstream",
+    ]
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{i} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref_offset = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return body
+
+
+def _warmup(output_dir: str, invoke_config: ModelInvokeConfigDict) -> None:
+    """Run a blank page through the pipeline so the layout and OCR det/rec models are loaded at boot"""
+    # mineru keeps models in process-wide singletons, the uncached service only exists to trigger loading
+    service = ParseService(output_dir=output_dir)
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as blank_pdf:
+        blank_pdf.write(_blank_pdf_bytes())
+        blank_pdf.flush()
+        output = service.process_document(
+            pdf_path=blank_pdf.name, max_pages=1, invoke_config=invoke_config, is_ocr=True
+        )
+    service.artifact_store.release(output.workspace)
+
+
+class _WorkerCancellationToken(CancellationToken):
+    """Token of a task on a pooled worker, cancelled by the pool through the worker's shared `cancelled_task`"""
+
+    def __init__(self, deadline: float | None, task_id: int, cancelled_task: ctypes.c_longlong) -> None:
+        super().__init__(deadline)
+        self._task_id = task_id
+        self._cancelled_task = cancelled_task
+
+    @property
+    def reason(self) -> str | None:
+        if self._reason is None and self._cancelled_task.value == self._task_id:
+            self.cancel("disconnect")
+        return super().reason
+
+
+def _worker_main(
+    invoke_config: ModelInvokeConfigDict,
+    output_dir: str,
+    task_queue: mp.Queue,
+    result_queue: mp.Queue,
+    cancelled_task: ctypes.c_longlong,
+) -> None:
+    """Entry point of a worker process: load the pipeline once, then serve documents until a sentinel arrives"""
+    service = ParseService.from_settings(output_dir=output_dir)
+    parent_pid = os.getppid()
+    started = time.monotonic()
+    try:
+        _warmup(output_dir, invoke_config)
+        logger.info(f"QOCR worker {os.getpid()} warmed up in {time.monotonic() - started:.1f}s")
+    except Exception as e:
+        logger.warning(f"QOCR worker {os.getpid()} warmup failed, models will load on first document: {e}")
+
+    while True:
+        try:
+            task = task_queue.get(timeout=5.0)
+        except queue.Empty:
+            # Workers are not daemonic (they may own a page pool), so exit on our own once the parent is gone
+            if os.getppid() != parent_pid:
+                break
+            continue
+        if task is None:
+            break
+        task_id, method, kwargs, cancellable, deadline = task
+        if cancellable:
+            kwargs["cancel_token"] = _WorkerCancellationToken(deadline, task_id, cancelled_task)
+        try:
+            # Stage timings travel back with the output and are recorded by the web process
+            with stage_timer(observe=False) as timer:
+                output = getattr(service, method)(invoke_config=invoke_config, **kwargs)
+            if isinstance(output, list):
+                if output:
+                    # A batch is timed as a whole, the first output carries the timings
+                    output[0].timings = timer.stages
+                result_queue.put((task_id, True, [item.model_dump() for item in output]))
+            else:
+                output.timings = timer.stages
+                result_queue.put((task_id, True, output.model_dump()))
+        except (ParseCancelled, *REQUEST_ERRORS) as e:
+            # Raised as they are in the web process, which answers them like an in-process parse
+            result_queue.put((task_id, False, e))
+        except Exception as e:
+            result_queue.put((task_id, False, f"{type(e).__name__}: {e}"))
+
+
+class WorkerPoolError(RuntimeError):
+    """Raised when a pooled worker fails or dies while processing a document"""
+
+
+@dataclass
+class _Worker:
+    key: str
+    process: mp.Process
+    task_queue: mp.Queue
+    # Task the worker is asked to stop, read by the worker at page range boundaries
+    cancelled_task: ctypes.c_longlong
+    inflight: set[int] = field(default_factory=set)
+    last_used: float = field(default_factory=time.monotonic)
+    retiring: bool = False
+
+
+class ParseWorkerPool:
+    """Pool of long-lived parse processes keyed by the resolved invoke_config.
+
+    Every worker loads the mineru pipeline for exactly one invoke_config when it boots and keeps it in memory,
+    so web workers neither pay model startup latency nor hold model weights. Documents are routed to an idle
+    worker of the same config; when none is idle a new worker is started while the pool has free slots, else the
+    least loaded matching worker is used. When every slot holds another config, the least loaded worker is
+    retired and the document waits until it has exited, so no more than `size` processes ever hold models.
+    Callers wait for documents with `wait()`, which gives up after `task_timeout` seconds.
+    """
+
+    def __init__(self, size: int, output_dir: str = "/label-studio/output", task_timeout: float = 3600) -> None:
+        if size < 1:
+            raise ValueError("Worker pool size must be at least 1")
+        self.size = size
+        self.output_dir = output_dir
+        self.task_timeout = task_timeout
+
+        self._ctx = mp.get_context("spawn")
+        self._result_queue = self._ctx.Queue()
+        self._workers: list[_Worker] = []
+        self._pending: dict[int, tuple[Future, _Worker | None]] = {}
+        # Tasks waiting for a slot held by another config: (config key, invoke_config, task)
+        self._backlog: deque[tuple[str, ModelInvokeConfigDict, tuple]] = deque()
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._collector = threading.Thread(target=self._collect_results, name="qocr-pool-collector", daemon=True)
+        self._collector.start()
+
+    def submit(
+        self, invoke_config: ModelInvokeConfigDict, cancel_token: CancellationToken | None = None, **kwargs
+    ) -> "Future[OCROutput]":
+        """Queue a document for `ParseService.process_document` on a worker warmed up for `invoke_config`.
+
+        The worker stops the document at a page range boundary once its deadline passed or `cancel_token`
+        was cancelled in this process, failing the future with `ParseCancelled` in the latter case.
+        """
+        return self._submit("process_document", invoke_config, kwargs, cancel_token)
+
+    def submit_batch(self, invoke_config: ModelInvokeConfigDict, **kwargs) -> "Future[list[OCROutput]]":
+        """Queue several documents for one `ParseService.process_documents` call"""
+        return self._submit("process_documents", invoke_config, kwargs)
+
+    def wait(self, future: Future):
+        """Result of a submitted task, `WorkerPoolError` once it took longer than `task_timeout` seconds"""
+        try:
+            return future.result(timeout=self.task_timeout)
+        except FutureTimeoutError:
+            raise WorkerPoolError(f"QOCR worker did not finish the document within {self.task_timeout}s") from None
+
+    def _submit(
+        self,
+        method: str,
+        invoke_config: ModelInvokeConfigDict,
+        kwargs: dict,
+        cancel_token: CancellationToken | None = None,
+    ) -> Future:
+        key = invoke_config_key(invoke_config)
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise WorkerPoolError("Worker pool is shut down")
+            task_id = next(self._task_ids)
+            deadline = cancel_token.deadline if cancel_token is not None else None
+            task = (task_id, method, kwargs, cancel_token is not None, deadline)
+            worker = self._select_worker(key, invoke_config)
+            if worker is None:
+                self._pending[task_id] = (future, None)
+                self._backlog.append((key, invoke_config, task))
+            else:
+                self._dispatch(worker, task, future)
+        if cancel_token is not None:
+            cancel_token.on_cancel(lambda reason: self._cancel(task_id, reason))
+        return future
+
+    def _dispatch(self, worker: _Worker, task: tuple, future: Future) -> None:
+        task_id = task[0]
+        worker.inflight.add(task_id)
+        worker.last_used = time.monotonic()
+        self._pending[task_id] = (future, worker)
+        worker.task_queue.put(task)
+
+    def _cancel(self, task_id: int, reason: str) -> None:
+        with self._lock:
+            future, worker = self._pending.get(task_id, (None, None))
+            if future is None:
+                return
+            if worker is not None:
+                # One slot per worker: of several cancelled tasks queued on the same worker only the last one stops
+                # early
+                worker.cancelled_task.value = task_id
+                return
+            # Still waiting for a slot, it never reaches a worker
+            self._pending.pop(task_id)
+            self._backlog = deque(entry for entry in self._backlog if entry[2][0] != task_id)
+        future.set_exception(ParseCancelled(reason))
+
+    def loaded_configs(self) -> list[str]:
+        """Keys of the invoke_configs whose models a worker holds"""
+        with self._lock:
+            return sorted({w.key for w in self._workers if not w.retiring})
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+            backlog, self._backlog = self._backlog, deque()
+            waiting = [self._pending.pop(task[0])[0] for _, _, task in backlog]
+        for future in waiting:
+            future.set_exception(WorkerPoolError("Worker pool is shut down"))
+        for worker in workers:
+            worker.task_queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.process.join(timeout=30)
+        for worker in workers:
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def _select_worker(self, key: str, invoke_config: ModelInvokeConfigDict) -> _Worker | None:
+        """Worker for a document of `key`, None when the document has to wait for a slot of another config"""
+        candidates = [w for w in self._workers if w.key == key and not w.retiring]
+        idle = [w for w in candidates if not w.inflight]
+        if idle:
+            return idle[0]
+
+        # Retiring workers still hold their models until they exit, so they count against the size
+        if len(self._workers) < self.size and not self._backlog:
+            return self._spawn(key, invoke_config)
+
+        if candidates:
+            return min(candidates, key=lambda w: len(w.inflight))
+
+        self._retire_for_backlog()
+        return None
+
+    def _retire_for_backlog(self) -> None:
+        """Retire the least loaded worker for the backlog, unless one is on its way out already"""
+        if any(w.retiring for w in self._workers):
+            return
+        active = [w for w in self._workers if not w.retiring]
+        if active:
+            self._retire(min(active, key=lambda w: (len(w.inflight), w.last_used)))
+
+    def _drain_backlog(self) -> None:
+        """Start workers for waiting tasks in the slots freed by exited workers"""
+        while self._backlog and len(self._workers) < self.size and not self._closed:
+            key, invoke_config, _ = self._backlog[0]
+            worker = self._spawn(key, invoke_config)
+            waiting = [entry for entry in self._backlog if entry[0] == key]
+            self._backlog = deque(entry for entry in self._backlog if entry[0] != key)
+            for _, _, task in waiting:
+                self._dispatch(worker, task, self._pending[task[0]][0])
+        if self._backlog:
+            self._retire_for_backlog()
+
+    def _spawn(self, key: str, invoke_config: ModelInvokeConfigDict) -> _Worker:
+        task_queue = self._ctx.Queue()
+        cancelled_task = self._ctx.Value("q", -1, lock=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(invoke_config, self.output_dir, task_queue, self._result_queue, cancelled_task),
+            name=f"qocr-worker-{key[:8]}",
+        )
+        process.start()
+        worker = _Worker(key=key, process=process, task_queue=task_queue, cancelled_task=cancelled_task)
+        self._workers.append(worker)
+        logger.info(f"Started QOCR worker {process.pid} for config {key[:8]} ({len(self._workers)}/{self.size})")
+        return worker
+
+    def _retire(self, worker: _Worker) -> None:
+        # The sentinel is queued behind any in-flight documents, so the worker finishes them before exiting
+        worker.retiring = True
+        worker.task_queue.put(None)
+        logger.info(f"Retiring QOCR worker {worker.process.pid} for config {worker.key[:8]}")
+
+    def _collect_results(self) -> None:
+        while True:
+            try:
+                self._deliver(*self._result_queue.get(timeout=1.0))
+            except queue.Empty:
+                pass
+            except (EOFError, OSError):
+                return
+            # Checked after every result too, under steady traffic the queue is never empty for long
+            self._reap_dead_workers()
+
+    def _deliver(self, task_id: int, ok: bool, payload) -> None:
+        with self._lock:
+            future, worker = self._pending.pop(task_id, (None, None))
+            if worker is not None:
+                worker.inflight.discard(task_id)
+        if future is None:
+            return
+        if ok and isinstance(payload, list):
+            future.set_result([OCROutput.model_validate(item) for item in payload])
+        elif ok:
+            future.set_result(OCROutput.model_validate(payload))
+        elif isinstance(payload, Exception):
+            future.set_exception(payload)
+        else:
+            future.set_exception(WorkerPoolError(payload))
+
+    def _reap_dead_workers(self) -> None:
+        if any(not w.process.is_alive() and w.inflight for w in self._workers):
+            # A worker may have answered right before it died, its results are read before its tasks fail
+            while True:
+                try:
+                    self._deliver(*self._result_queue.get_nowait())
+                except queue.Empty:
+                    break
+        with self._lock:
+            dead = [w for w in self._workers if not w.process.is_alive()]
+            for worker in dead:
+                self._workers.remove(worker)
+                for task_id in list(worker.inflight):
+                    future, _ = self._pending.pop(task_id)
+                    future.set_exception(
+                        WorkerPoolError(f"QOCR worker {worker.process.pid} exited with code {worker.process.exitcode}")
+                    )
+                worker.inflight.clear()
+                if not worker.retiring:
+                    logger.warning(f"QOCR worker {worker.process.pid} died with exit code {worker.process.exitcode}")
+            self._drain_backlog()
+
+
+_pool: ParseWorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParseWorkerPool | None:
+    """Process-wide worker pool, or None when QOCR_WORKER_POOL_SIZE disables pooling"""
+    global _pool
+    from django.conf import settings
+
+    size = getattr(settings, "QOCR_WORKER_POOL_SIZE", 0)
+    if size <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParseWorkerPool(
+                size=size, output_dir=settings.QOCR_OUTPUT_DIR, task_timeout=settings.QOCR_WORKER_TASK_TIMEOUT
+            )
+            atexit.register(_pool.shutdown, wait=False)
+        return _pool
@@ -0,0 +1,177 @@
+import threading
+import time
+
+import pytest
+from qocr.service.admission import AdmissionController, AdmissionRejected
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+class _Waiters:
+    """Requests queued one after another in threads, recording the order they are admitted in"""
+
+    def __init__(self, controller: AdmissionController) -> None:
+        self.controller = controller
+        self.granted: list[tuple[str, str, object]] = []
+        self.rejected: list[tuple[str, str, str]] = []
+        self._lock = threading.Lock()
+
+    def queue(self, user: str, priority: str = "default") -> None:
+        queued = self.controller._queued
+
+        def run() -> None:
+            try:
+                ticket = self.controller.acquire(user, priority)
+            except AdmissionRejected as e:
+                with self._lock:
+                    self.rejected.append((user, priority, e.reason))
+                return
+            with self._lock:
+                self.granted.append((user, priority, ticket))
+
+        threading.Thread(target=run, daemon=True).start()
+        _wait_for(lambda: self.controller._queued > queued or self.rejected)
+
+    def drain(self, holder) -> list[tuple[str, str]]:
+        """Release `holder`, then every admitted request in turn, and return who was admitted in which order"""
+        expected = self.controller._queued + len(self.granted)
+        holder.release()
+        admitted = 0
+        while admitted < expected:
+            _wait_for(lambda: len(self.granted) > admitted)
+            self.granted[admitted][2].release()
+            admitted += 1
+        return [(user, priority) for user, priority, _ in self.granted]
+
+
+def test_free_slot_is_taken_immediately():
+    controller = AdmissionController(max_concurrent=2)
+    with controller.acquire("a"), controller.acquire("b"):
+        assert controller._in_flight == 2
+    assert controller._in_flight == 0
+
+
+def test_unknown_priority_is_refused():
+    controller = AdmissionController(max_concurrent=1)
+    with pytest.raises(ValueError):
+        controller.acquire("a", "urgent")
+
+
+def test_users_of_a_class_take_turns():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, aging_seconds=3600)
+    waiters = _Waiters(controller)
+    holder = controller.acquire("a")
+    for user in ("a", "a", "a", "b"):
+        waiters.queue(user)
+    assert [user for user, _ in waiters.drain(holder)] == ["a", "b", "a", "a"]
+
+
+def test_classes_share_slots_by_weight():
+    controller = AdmissionController(max_concurrent=1, max_queue=20, aging_seconds=3600)
+    waiters = _Waiters(controller)
+    holder = controller.acquire("x")
+    for i in range(6):
+        waiters.queue(f"h{i}", "high")
+        waiters.queue(f"d{i}", "default")
+    order = [priority for _, priority in waiters.drain(holder)]
+    # `high` weighs 4 against 2 for `default`
+    assert order[:6].count("high") == 4
+    assert order[:3] == ["high", "default", "high"]
+
+
+def test_aged_class_is_served_first():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, aging_seconds=0.2)
+    waiters = _Waiters(controller)
+    holder = controller.acquire("x")
+    waiters.queue("bulk", "low")
+    time.sleep(0.3)
+    waiters.queue("ui", "critical")
+    assert waiters.drain(holder) == [("bulk", "low"), ("ui", "critical")]
+
+
+def test_urgent_class_is_served_first_before_aging():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, aging_seconds=3600)
+    waiters = _Waiters(controller)
+    holder = controller.acquire("x")
+    waiters.queue("bulk", "low")
+    waiters.queue("ui", "critical")
+    assert waiters.drain(holder) == [("ui", "critical"), ("bulk", "low")]
+
+
+def test_reserved_slots_only_admit_interactive_requests():
+    controller = AdmissionController(max_concurrent=2, max_queue=0, reserved_slots=1, queue_timeout=0.1)
+    with controller.acquire("bulk", "low"):
+        with pytest.raises(AdmissionRejected) as e:
+            controller.acquire("bulk", "default")
+        assert e.value.reason == "queue_full"
+        with controller.acquire("ui", "high") as ticket:
+            assert ticket.slot == 1
+
+
+def test_full_queue_displaces_newest_waiter_of_a_lower_class():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, aging_seconds=3600)
+    waiters = _Waiters(controller)
+    holder = controller.acquire("x")
+    waiters.queue("bulk1", "low")
+    waiters.queue("bulk2", "low")
+    waiters.queue("ui", "high")
+    _wait_for(lambda: waiters.rejected)
+    assert waiters.rejected == [("bulk2", "low", "displaced")]
+    assert waiters.drain(holder) == [("ui", "high"), ("bulk1", "low")]
+
+
+def test_full_queue_displaces_the_user_holding_most_entries():
+    controller = AdmissionController(max_concurrent=1, max_queue=3, aging_seconds=3600)
+    waiters = _Waiters(controller)
+    holder = controller.acquire("x")
+    for _ in range(3):
+        waiters.queue("flood")
+    waiters.queue("other")
+    _wait_for(lambda: waiters.rejected)
+    assert waiters.rejected == [("flood", "default", "displaced")]
+    assert [user for user, _ in waiters.drain(holder)] == ["flood", "other", "flood"]
+
+
+def test_full_queue_rejects_newcomer_without_anyone_to_displace():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, aging_seconds=3600)
+    waiters = _Waiters(controller)
+    holder = controller.acquire("x")
+    waiters.queue("a", "high")
+    with pytest.raises(AdmissionRejected) as e:
+        controller.acquire("b", "low")
+    assert e.value.reason == "queue_full"
+    assert e.value.retry_after >= 1
+    waiters.drain(holder)
+
+
+def test_waiter_times_out():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.1)
+    with controller.acquire("a"):
+        with pytest.raises(AdmissionRejected) as e:
+            controller.acquire("b")
+    assert e.value.reason == "timeout"
+    assert controller._queued == 0
+
+
+def test_slots_are_shared_through_the_slots_dir(tmp_path):
+    # Two controllers stand in for two web processes of a host
+    first = AdmissionController(max_concurrent=1, max_queue=1, slots_dir=str(tmp_path), poll_interval=0.05)
+    second = AdmissionController(
+        max_concurrent=1, max_queue=1, queue_timeout=0.2, slots_dir=str(tmp_path), poll_interval=0.05
+    )
+    holder = first.acquire("a")
+    with pytest.raises(AdmissionRejected):
+        second.acquire("b")
+
+    second.queue_timeout = 5
+    waiters = _Waiters(second)
+    waiters.queue("b")
+    holder.release()
+    _wait_for(lambda: waiters.granted)
+    waiters.granted[0][2].release()
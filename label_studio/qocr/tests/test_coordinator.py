@@ -0,0 +1,144 @@
+import pickle
+import time
+
+import pytest
+from qocr.service.coordinator import (
+    CoordinatorBackend,
+    CoordinatorError,
+    LocalCoordinatorBackend,
+    NodeStatus,
+    ParseCoordinator,
+    _pick_node,
+)
+from qocr.service.parse_service import invoke_config_key
+
+CONFIG = {"layout": "layout-v1"}
+OTHER_CONFIG = {"layout": "layout-v2"}
+
+
+def _job(job_id: str, invoke_config: dict = CONFIG, attempts: int = 0) -> dict:
+    return {
+        "job_id": job_id,
+        "method": "process_document",
+        "invoke_config": invoke_config,
+        "kwargs": {"pdf_path": f"/shared/{job_id}.pdf"},
+        "cancellable": False,
+        "deadline": None,
+        "attempts": attempts,
+    }
+
+
+def _heartbeat(backend, node_id: str, models: tuple = (), capacity: int = 1, ttl: float = 60, accepting=True):
+    status = {"capacity": capacity, "models": [invoke_config_key(c) for c in models], "accepting": accepting}
+    backend.heartbeat(node_id, status, ttl)
+
+
+def _queued_job_ids(backend: LocalCoordinatorBackend, node_id: str) -> list[str]:
+    return [pickle.loads(job)["job_id"] for job in backend._jobs[node_id]]
+
+
+@pytest.fixture
+def backend():
+    return LocalCoordinatorBackend()
+
+
+@pytest.fixture
+def coordinator(backend, tmp_path):
+    return ParseCoordinator(backend, str(tmp_path), str(tmp_path / "uploads"), job_timeout=1, max_attempts=2)
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CoordinatorBackend()
+
+
+def test_pick_node_prefers_free_node_with_models():
+    key = invoke_config_key(CONFIG)
+    nodes = [NodeStatus("cold", 4, []), NodeStatus("warm", 2, [key], in_flight=1)]
+    assert _pick_node(nodes, key).node_id == "warm"
+
+
+def test_pick_node_loads_models_on_freest_node_when_warm_nodes_are_busy():
+    key = invoke_config_key(CONFIG)
+    nodes = [NodeStatus("warm", 1, [key], in_flight=1), NodeStatus("a", 2, [], in_flight=1), NodeStatus("b", 3, [])]
+    assert _pick_node(nodes, key).node_id == "b"
+
+
+def test_pick_node_queues_at_least_loaded_warm_node_when_all_are_busy():
+    key = invoke_config_key(CONFIG)
+    nodes = [
+        NodeStatus("cold", 1, [], in_flight=1),
+        NodeStatus("warm-busy", 1, [key], in_flight=1, queued=2),
+        NodeStatus("warm", 2, [key], in_flight=2, queued=1),
+    ]
+    assert _pick_node(nodes, key).node_id == "warm"
+
+
+def test_route_skips_stopping_nodes(backend, coordinator):
+    _heartbeat(backend, "stopping", models=(CONFIG,), accepting=False)
+    _heartbeat(backend, "cold")
+    assert coordinator.route(_job("j1")) == "cold"
+
+
+def test_route_without_nodes_fails(coordinator):
+    with pytest.raises(CoordinatorError):
+        coordinator.route(_job("j1"))
+
+
+def test_reap_routes_jobs_of_dead_node_to_live_node(backend, coordinator):
+    _heartbeat(backend, "dead", models=(CONFIG,), capacity=2, ttl=0.05)
+    backend.push("dead", pickle.dumps(_job("running")))
+    backend.push("dead", pickle.dumps(_job("queued")))
+    assert pickle.loads(backend.pop("dead", 1))["job_id"] == "running"
+    _heartbeat(backend, "live", capacity=2)
+    time.sleep(0.1)
+
+    coordinator.reap()
+
+    assert sorted(_queued_job_ids(backend, "live")) == ["queued", "running"]
+    attempts = {job["job_id"]: job["attempts"] for job in map(pickle.loads, backend._jobs["live"])}
+    # Only the job the dead node had started counts as an attempt
+    assert attempts == {"running": 1, "queued": 0}
+    assert backend.dead_nodes() == []
+
+
+def test_reap_gives_up_after_max_attempts(backend, coordinator):
+    _heartbeat(backend, "dead", ttl=0.05)
+    backend.push("dead", pickle.dumps(_job("lost", attempts=1)))
+    backend.pop("dead", 1)
+    _heartbeat(backend, "live")
+    time.sleep(0.1)
+
+    coordinator.reap()
+
+    assert _queued_job_ids(backend, "live") == []
+    status, message = pickle.loads(backend.wait_result("lost", 1))
+    assert status == "error"
+    assert "lost with 2 worker nodes" in message
+
+
+def test_reap_answers_jobs_nobody_can_take(backend, coordinator):
+    _heartbeat(backend, "dead", ttl=0.05)
+    backend.push("dead", pickle.dumps(_job("orphan")))
+    time.sleep(0.1)
+
+    coordinator.reap()
+
+    status, message = pickle.loads(backend.wait_result("orphan", 1))
+    assert status == "error"
+    assert "No QOCR worker node is alive" in message
+
+
+def test_hand_over_moves_queued_jobs_and_keeps_running_ones(backend, coordinator):
+    _heartbeat(backend, "stopping", models=(CONFIG,), capacity=2)
+    backend.push("stopping", pickle.dumps(_job("running")))
+    backend.push("stopping", pickle.dumps(_job("queued", OTHER_CONFIG)))
+    backend.pop("stopping", 1)
+    _heartbeat(backend, "stopping", models=(CONFIG,), capacity=2, accepting=False)
+    _heartbeat(backend, "other")
+
+    coordinator.hand_over("stopping")
+
+    assert _queued_job_ids(backend, "other") == ["queued"]
+    assert _queued_job_ids(backend, "stopping") == []
+    assert [pickle.loads(job)["job_id"] for job in backend._running["stopping"]] == ["running"]
@@ -6,6 +6,16 @@ app_name = "qocr"
 # QOCR API endpoints
 _api_urlpatterns = [
     path("parse-document/", views.ParseDocumentView.as_view(), name="parse_document"),
+    path("parse-documents/", views.ParseDocumentBatchView.as_view(), name="parse_documents"),
+    path("parse-document/jobs/", views.ParseDocumentJobView.as_view(), name="parse_document_jobs"),
+    path(
+        "parse-document/jobs/<str:job_id>/",
+        views.ParseDocumentJobDetailView.as_view(),
+        name="parse_document_job_detail",
+    ),
+    path("images/<str:name>/", views.ImageView.as_view(), name="image"),
+    path("archives/<str:archive_id>/", views.ArchiveView.as_view(), name="archive"),
+    path("profiles/<str:profile_id>/", views.ProfileView.as_view(), name="profile"),
     path("layout/", views.LayoutView.as_view(), name="layout"),
     path("ocr/", views.OCRView.as_view(), name="ocr"),
     path("table/", views.TableView.as_view(), name="table"),
@@ -1,19 +1,30 @@
 import json
+import mimetypes
 import re
+import shutil
+import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from tempfile import NamedTemporaryFile
+from typing import Iterator
 from uuid import uuid4 as uuid
 
+import django_rq
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, HttpResponseNotFound, StreamingHttpResponse
+from django.utils.http import content_disposition_header
 from drf_yasg import openapi
 
 # Label Studio uses drf-yasg for API documentation
 from drf_yasg.utils import swagger_auto_schema
-from mineru.utils.enum_class import ModelInvokeConfig as MineruModelInvokeConfig
+from ranged_fileresponse import RangedFileResponse
 from rest_framework import status
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
 
 try:
     from loguru import logger
@@ -25,7 +36,23 @@ except ImportError:
 
 # Use local shared service
 try:
-    from .service.parse_service import ParseService
+    from .functions import (
+        parse_document,
+        parse_document_job,
+        parse_documents,
+        resolve_invoke_config,
+        stream_parse_document,
+    )
+    from .service.archive import iter_zip_archive, load_archive
+    from .service.artifact_store import get_artifact_store
+    from .service.cancellation import CancellationToken, ParseCancelled, client_socket, get_disconnect_monitor
+    from .service.coordinator import CoordinatorError
+    from .service.image_store import get_image_store
+    from .service.layout_service import get_layout_service
+    from .service.ocr_engine import decode_image, get_ocr_engine
+    from .service.parse_service import PageRangeError, ParseService, count_pages
+    from .service.profiler import COLLAPSED_FILE, PROFILE_FILE, ProfilerBusy, RequestProfiler, load_profile
+    from .service.table_service import get_table_service
 except ImportError:
     logger.warning("service.parse_service module not found, using mock ParseService")
     ParseService = None
@@ -37,6 +64,7 @@ from .docs import (
     TABLE_DESCRIPTION_DETAIL,
 )
 from .file_handler import compress_markdown_images
+from .metrics import stage_timer, timed
 from .serializers import (
     ErrorResponse,
     ImageOCRResponse,
@@ -44,6 +72,8 @@ from .serializers import (
     ParseDocumentRequest,
     ParseDocumentResponse,
 )
+from .service.admission import PRIORITIES, AdmissionRejected, AdmissionTicket, get_admission_controller
+from .service.model_registry import ModelRegistryError, get_model_registry
 
 SUPPORTED_MIME_TYPES = {
     # PDF
@@ -67,150 +97,531 @@ SUPPORTED_MIME_TYPES = {
     "application/vnd.ms-powerpoint",  # .ppt
 }
 
+DEFAULT_INVOKE_CONFIG = {
+    "layout": {"type": "layout", "name": "RTDETR", "version": "1.0.0"},
+    "ocr_cls": {"type": "ocr", "sub_type": "cls", "name": "unused_model", "version": "0.1.0"},
+    "ocr_det": {
+        "type": "ocr",
+        "sub_type": "det",
+        "name": "PP-OCRv4_det_server_finetune_v2(ko)",
+        "version": "2.0.0",
+    },
+    "ocr_rec": {
+        "type": "ocr",
+        "sub_type": "rec",
+        "name": "PP-OCRv4_rec_doc_finetune_v3(ko)",
+        "version": "3.0.0",
+    },
+}
 
-def convert_to_mineru_config(config):
-    """Convert local ModelInvokeConfig to mineru ModelInvokeConfig format"""
-    return MineruModelInvokeConfig.model_validate(
-        {
-            "model_type": config["type"],
-            "model_subtype": config.get("sub_type"),
-            "model_name": config["name"],
-            "model_version": config["version"],
-        }
+DEFAULT_INVOKE_CONFIG_JSON = json.dumps(DEFAULT_INVOKE_CONFIG)
+
+PARSE_DOCUMENT_PARAMETERS = [
+    openapi.Parameter(
+        name="file",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_FILE,
+        description="PDF, 이미지 또는 오피스 문서",
+        required=True,
+    ),
+    openapi.Parameter(
+        name="invoke_config",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_STRING,
+        description="JSON 형태의 모델 설정",
+        default=DEFAULT_INVOKE_CONFIG_JSON,
+    ),
+    openapi.Parameter(
+        name="apply_fig",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_BOOLEAN,
+        description="그림 적용 여부",
+        default=True,
+    ),
+    openapi.Parameter(
+        name="apply_table",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_BOOLEAN,
+        description="테이블 적용 여부",
+        default=True,
+    ),
+    openapi.Parameter(
+        name="debug_pdfs",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_BOOLEAN,
+        description=(
+            "레이아웃/스팬 박스를 그린 디버그 PDF 생성 여부. 생성된 레이아웃 PDF 는 `archive=download` "
+            "압축 파일에 포함됩니다."
+        ),
+        default=False,
+    ),
+    openapi.Parameter(
+        name="image_mode",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_STRING,
+        enum=["base64", "reference"],
+        description=(
+            "마크다운 이미지 표현 방식. `base64` 는 이미지를 마크다운에 인라인하고, "
+            "`reference` 는 콘텐츠 해시 기반 `/api/qocr/images/{name}/` 링크로 참조합니다."
+        ),
+        default="base64",
+    ),
+    openapi.Parameter(
+        name="archive",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_STRING,
+        enum=["inline", "download"],
+        description=(
+            "결과 압축 파일 전달 방식. `inline` 은 base64 로 인코딩한 압축 파일을 `file_data` 에 담고, "
+            "`download` 는 `archive_id` 와 `/api/qocr/archives/{archive_id}/` 다운로드 링크만 반환합니다."
+        ),
+        default="inline",
+    ),
+    openapi.Parameter(
+        name="start_page",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_INTEGER,
+        description="파싱할 첫 페이지 번호 (1부터 시작)",
+        default=1,
+    ),
+    openapi.Parameter(
+        name="end_page",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_INTEGER,
+        description="파싱할 마지막 페이지 번호 (포함), 생략하면 문서 끝까지 파싱합니다.",
+        required=False,
+    ),
+    openapi.Parameter(
+        name="priority",
+        in_=openapi.IN_FORM,
+        type=openapi.TYPE_STRING,
+        enum=["critical", "high", "default", "low"],
+        description=(
+            "처리 우선순위. 생략하면 이미지, 스트리밍, 적은 페이지 요청은 `high`, 일괄 처리는 `low`, 그 외는 "
+            "`default` 입니다. 비동기 작업은 같은 이름의 RQ 큐에 등록되며, `critical` 은 관리자만 지정할 수 있습니다."
+        ),
+        required=False,
+    ),
+]
+
+IMAGE_MODES = ("base64", "reference")
+ARCHIVE_MODES = ("inline", "download")
+
+IMAGE_MIME_TYPES = {"image/jpeg", "image/jpg", "image/png"}
+
+STREAM_PARAMETER = openapi.Parameter(
+    name="stream",
+    in_=openapi.IN_FORM,
+    type=openapi.TYPE_STRING,
+    enum=["ndjson", "sse"],
+    description=(
+        "페이지 단위 스트리밍 응답 형식. 각 페이지가 완료되는 즉시 `page` 레코드를 보내고, "
+        "마지막에 압축 파일을 포함한 `summary` 레코드를 보냅니다."
+    ),
+    required=False,
+)
+
+DEADLINE_PARAMETER = openapi.Parameter(
+    name="deadline",
+    in_=openapi.IN_FORM,
+    type=openapi.TYPE_NUMBER,
+    description=(
+        "파싱 제한 시간(초). 대기 시간을 포함하며, 초과하면 다음 페이지 구간 경계에서 중단하고 그때까지 파싱한 "
+        "페이지를 `partial: true` 와 이어서 파싱할 `next_page` 와 함께 반환합니다. 서버 설정보다 길게 지정할 수 없습니다."
+    ),
+    required=False,
+)
+
+PROFILE_PARAMETER = openapi.Parameter(
+    name="profile",
+    in_=openapi.IN_FORM,
+    type=openapi.TYPE_BOOLEAN,
+    description=(
+        "관리자 전용. 요청 처리 동안 CPU 샘플링 프로파일과 tracemalloc 메모리 통계를 수집해 `profile_url` 에서 "
+        "내려받을 수 있게 저장합니다. 스트리밍 응답과 함께 쓸 수 없고, 워커 풀이나 코디네이터로 파싱하는 서버에서는 "
+        "400 을 반환하며, 한 번에 한 요청만 프로파일링합니다."
+    ),
+    default=False,
+)
+
+STREAM_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _bad_request(message: str) -> Response:
+    return Response({"status_code": 400, "message": message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _node_unavailable(e: Exception) -> Response:
+    logger.error(f"Parse could not be run on a worker node: {e}")
+    return Response(
+        {"status_code": 503, "message": "파싱 작업 노드를 사용할 수 없습니다."},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
     )
 
 
+def _validate_upload(file) -> Response | None:
+    """Return an error response when the uploaded document is missing or of an unsupported type"""
+    if not file:
+        return _bad_request("파일이 제공되지 않았습니다.")
+
+    if file.content_type not in SUPPORTED_MIME_TYPES:
+        return _bad_request(
+            "지원되지 않는 파일 형식입니다. PDF, 이미지, 오피스 문서(.pdf, .jpg, .jpeg, .png, .ppt, .pptx, .doc, .docx, .xls, .xlsx)를 업로드해주세요."
+        )
+    return None
+
+
+def _normalize_filename(file) -> str:
+    filename = file.name
+    if not filename:
+        filename = f"{uuid().hex}{Path(file.name).suffix if file.name else ''}"
+
+    # Replace all empty spaces from the filename to underscore
+    return re.sub(r"\s", "_", filename)
+
+
+def _upload_source(file, filename: str) -> tuple[str, bytes | None]:
+    """Where the parser reads the upload from: Django's temporary upload file, or the in-memory bytes"""
+    if hasattr(file, "temporary_file_path"):
+        return file.temporary_file_path(), None
+    return filename, file.read()
+
+
+def _store_upload(file, target_path: Path) -> None:
+    """Persist an upload beyond the request, moving Django's temporary upload file instead of copying it"""
+    if hasattr(file, "temporary_file_path"):
+        shutil.move(file.temporary_file_path(), target_path)
+        return
+    with open(target_path, "wb") as f:
+        for chunk in file.chunks():
+            f.write(chunk)
+
+
+def _encode_stream_record(record: dict, stream_format: str) -> bytes:
+    payload = json.dumps(record, ensure_ascii=False, default=str)
+    if stream_format == "sse":
+        return f"event: {record['type']}\ndata: {payload}\n\n".encode("utf-8")
+    return f"{payload}\n".encode("utf-8")
+
+
+class _AdmittedStream:
+    """Streamed response body holding an admission ticket until the server closes the response.
+
+    The server calls `close()` when the stream is done, when the client goes away and also when the stream was
+    never started, which a `finally` in a generator would miss.
+    """
+
+    def __init__(self, records: Iterator[dict], stream_format: str, ticket: "AdmissionTicket | None") -> None:
+        self._records = records
+        self._stream_format = stream_format
+        self._ticket = ticket
+
+    def __iter__(self) -> "_AdmittedStream":
+        return self
+
+    def __next__(self) -> bytes:
+        return _encode_stream_record(next(self._records), self._stream_format)
+
+    def close(self) -> None:
+        try:
+            self._records.close()
+        finally:
+            if self._ticket is not None:
+                self._ticket.release()
+
+
+def _admit(request, priority: str) -> tuple["AdmissionTicket | None", Response | None]:
+    """Wait for a parse slot, or build the 429 response when the admission queue is full"""
+    controller = get_admission_controller()
+    if controller is None:
+        return None, None
+    user = request.user
+    user_key = f"user:{user.pk}" if user.is_authenticated else f"ip:{request.META.get('REMOTE_ADDR', '')}"
+    try:
+        return controller.acquire(user_key, priority), None
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected parse request of {user_key}: {e}")
+        return None, Response(
+            {"status_code": 429, "message": "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요."},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+def _is_interactive(
+    file, page_count: int | None, start_page: int, max_pages: int, stream_format: str | None = None
+) -> bool:
+    """Whether a parse looks like a preview from the labeling UI: an image, a stream or a few pages.
+
+    The pages are those of the document from `start_page` on, at most `max_pages`; documents whose `page_count`
+    is unknown before conversion count by `max_pages` alone.
+    """
+    if stream_format or file.content_type.startswith("image/"):
+        return True
+    pages = max_pages if max_pages > 0 else None
+    if page_count is not None:
+        pages = min(pages or page_count, page_count - start_page)
+    return pages is not None and 0 < pages <= settings.QOCR_INTERACTIVE_MAX_PAGES
+
+
+def _load_priority(request, default: str) -> tuple[str | None, Response | None]:
+    """Priority class of the `priority` field, `default` when it is not given"""
+    priority = request.data.get("priority") or default
+    if priority not in PRIORITIES:
+        return None, _bad_request(f"지원되지 않는 우선순위입니다: {priority}")
+    if priority == "critical" and priority != default and not request.user.is_superuser:
+        return None, Response(
+            {"status_code": 403, "message": "`critical` 우선순위는 관리자만 지정할 수 있습니다."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return priority, None
+
+
+def _load_image_mode(request) -> tuple[str | None, Response | None]:
+    image_mode = request.data.get("image_mode", "base64")
+    if image_mode not in IMAGE_MODES:
+        return None, _bad_request(f"지원되지 않는 이미지 모드입니다: {image_mode}")
+    return image_mode, None
+
+
+def _load_archive_mode(request) -> tuple[str | None, Response | None]:
+    archive_mode = request.data.get("archive", "inline")
+    if archive_mode not in ARCHIVE_MODES:
+        return None, _bad_request(f"지원되지 않는 압축 파일 전달 방식입니다: {archive_mode}")
+    return archive_mode, None
+
+
+def _form_flag(request, name: str, default: bool) -> bool:
+    value = request.data.get(name)
+    if value is None or value == "":
+        return default
+    return str(value).lower() == "true"
+
+
+def _load_parse_options(request) -> dict:
+    """Pipeline stages requested by the `apply_fig`, `apply_table` and `debug_pdfs` fields"""
+    return {
+        "figure_enable": _form_flag(request, "apply_fig", True),
+        "table_enable": _form_flag(request, "apply_table", True),
+        "debug_pdfs": _form_flag(request, "debug_pdfs", False),
+    }
+
+
+def _load_page_range(request) -> tuple[int, int, Response | None]:
+    """First page index and page count of the 1-based, inclusive `start_page`/`end_page` fields, 0 pages is all"""
+    try:
+        start_page = int(request.data.get("start_page") or 1)
+        end_page = int(request.data.get("end_page") or 0)
+    except (TypeError, ValueError):
+        return 0, 0, _bad_request("페이지 번호는 정수여야 합니다.")
+    if start_page < 1 or (end_page and end_page < start_page):
+        return 0, 0, _bad_request(f"잘못된 페이지 범위입니다: {start_page}-{end_page or ''}")
+    return start_page - 1, end_page - start_page + 1 if end_page else 0, None
+
+
+def _load_deadline(request) -> tuple[float, Response | None]:
+    """Seconds the parse may take, from the `deadline` field capped by QOCR_PARSE_DEADLINE, 0 is unbounded"""
+    try:
+        deadline = float(request.data.get("deadline") or 0)
+    except (TypeError, ValueError):
+        return 0, _bad_request("제한 시간은 초 단위 숫자여야 합니다.")
+    if deadline < 0:
+        return 0, _bad_request(f"잘못된 제한 시간입니다: {deadline}")
+    limit = settings.QOCR_PARSE_DEADLINE
+    if limit > 0:
+        deadline = min(deadline, limit) if deadline else limit
+    return deadline, None
+
+
+def _load_profile(request) -> tuple[bool, Response | None]:
+    """Whether the `profile` field asks to profile the request, which superusers may do for non-streamed parses
+    running in the web process"""
+    if not _form_flag(request, "profile", False):
+        return False, None
+    if not request.user.is_superuser:
+        return False, Response(
+            {"status_code": 403, "message": "프로파일링은 관리자만 요청할 수 있습니다."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    if request.data.get("stream"):
+        return False, _bad_request("스트리밍 응답은 프로파일링할 수 없습니다.")
+    # The profiler samples the threads of this process, a parse on a pooled worker or another node only shows up
+    # as the request thread waiting for it
+    if settings.QOCR_WORKER_POOL_SIZE > 0 or settings.QOCR_COORDINATOR:
+        return False, _bad_request("워커 프로세스에서 파싱하는 서버는 프로파일링할 수 없습니다.")
+    return True, None
+
+
+def _profile_handle(profile_id: str) -> dict:
+    return {"profile_id": profile_id, "profile_url": f"{settings.QOCR_PROFILE_BASE_URL}{profile_id}/"}
+
+
+@contextmanager
+def _cancellation(request, deadline_at: float | None) -> Iterator["CancellationToken | None"]:
+    """Token stopping the parse of the request at `deadline_at` or when the client disconnects, if either applies"""
+    monitor = get_disconnect_monitor()
+    sock = client_socket(request.META) if monitor is not None else None
+    if sock is None:
+        yield CancellationToken(deadline_at) if deadline_at else None
+        return
+    token = CancellationToken(deadline_at)
+    with sock, monitor.watch(sock, token):
+        yield token
+
+
+def _serialize_result(result: dict) -> dict:
+    """`ParseDocumentResponse` data of a parse result; results with a download handle have no `file_data`"""
+    if "archive_id" in result:
+        return result
+    response_serializer = ParseDocumentResponse(data=result)
+    response_serializer.is_valid(raise_exception=True)
+    if result.get("partial"):
+        return {**response_serializer.data, "partial": True, "next_page": result["next_page"]}
+    return response_serializer.data
+
+
+class _InvalidInvokeConfig(ValueError):
+    pass
+
+
+def _validate_invoke_config(invoke_config_str: str) -> dict:
+    """Validated `ParseDocumentRequest` payload of an `invoke_config` field"""
+    # Parse JSON string to dict
+    try:
+        invoke_config_dict = json.loads(invoke_config_str)
+        # Validate with serializer
+        serializer = ParseDocumentRequest(data=invoke_config_dict)
+        if not serializer.is_valid():
+            raise _InvalidInvokeConfig(f"잘못된 설정 형식입니다: {serializer.errors}")
+        invoke_config_validated = serializer.validated_data
+    except _InvalidInvokeConfig:
+        raise
+    except (json.JSONDecodeError, ValueError) as e:
+        raise _InvalidInvokeConfig(f"잘못된 JSON 형식입니다: {str(e)}")
+
+    # Ensure invoke_config_validated is a dict for type safety
+    return invoke_config_validated if isinstance(invoke_config_validated, dict) else {}
+
+
+def _resolve_invoke_config(invoke_config_str: str) -> tuple[dict, dict]:
+    """Validated payload of an `invoke_config` field and the invoke_config mineru expects"""
+    config = _validate_invoke_config(invoke_config_str)
+    try:
+        weights = get_model_registry().weights(config)
+    except ModelRegistryError as e:
+        raise _InvalidInvokeConfig(f"등록되지 않은 모델입니다: {e}")
+    return config, resolve_invoke_config(config, weights)
+
+
+def _load_invoke_config(request) -> tuple[dict | None, dict | None, Response | None]:
+    """Read the `invoke_config` form field, validate it and resolve it against the model registry.
+
+    Resolutions are memoized per field value until a model version is registered, so repeated
+    configurations (above all the default one) skip parsing and validation.
+    """
+    invoke_config_str = request.data.get("invoke_config", DEFAULT_INVOKE_CONFIG_JSON)
+    try:
+        if not ParseService:
+            # Mock answers only need a valid field, the registry and mineru's config are not importable
+            return _validate_invoke_config(invoke_config_str), None, None
+        config, invoke_config = get_model_registry().memoize(
+            invoke_config_str, lambda: _resolve_invoke_config(invoke_config_str)
+        )
+    except _InvalidInvokeConfig as e:
+        return None, None, _bad_request(str(e))
+    return config, invoke_config, None
+
+
 class ParseDocumentView(APIView):
     """문서 OCR 및 마크다운 변환"""
 
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = (IsAuthenticated,)
+    # Profiler of a request sent with `profile`, stopped once the response is rendered
+    _profiler: "RequestProfiler | None" = None
 
     @swagger_auto_schema(
         tags=["QOCR ML"],
         operation_summary="문서 OCR 및 마크다운 변환",
         operation_description=PARSE_DOCUMENT_DESCRIPTION_DETAIL,
-        manual_parameters=[
-            openapi.Parameter(
-                name="file",
-                in_=openapi.IN_FORM,
-                type=openapi.TYPE_FILE,
-                description="PDF, 이미지 또는 오피스 문서",
-                required=True,
-            ),
-            openapi.Parameter(
-                name="invoke_config",
-                in_=openapi.IN_FORM,
-                type=openapi.TYPE_STRING,
-                description="JSON 형태의 모델 설정",
-                default=json.dumps(
-                    {
-                        "layout": {"type": "layout", "name": "RTDETR", "version": "1.0.0"},
-                        "ocr_cls": {"type": "ocr", "sub_type": "cls", "name": "unused_model", "version": "0.1.0"},
-                        "ocr_det": {
-                            "type": "ocr",
-                            "sub_type": "det",
-                            "name": "PP-OCRv4_det_server_finetune_v2(ko)",
-                            "version": "2.0.0",
-                        },
-                        "ocr_rec": {
-                            "type": "ocr",
-                            "sub_type": "rec",
-                            "name": "PP-OCRv4_rec_doc_finetune_v3(ko)",
-                            "version": "3.0.0",
-                        },
-                    }
-                ),
-            ),
-            openapi.Parameter(
-                name="apply_fig",
-                in_=openapi.IN_FORM,
-                type=openapi.TYPE_BOOLEAN,
-                description="그림 적용 여부",
-                default=True,
-            ),
-            openapi.Parameter(
-                name="apply_table",
-                in_=openapi.IN_FORM,
-                type=openapi.TYPE_BOOLEAN,
-                description="테이블 적용 여부",
-                default=True,
-            ),
-        ],
+        manual_parameters=[*PARSE_DOCUMENT_PARAMETERS, DEADLINE_PARAMETER, STREAM_PARAMETER, PROFILE_PARAMETER],
         responses={
             200: ParseDocumentResponse,
             400: ErrorResponse,
+            403: ErrorResponse,
+            409: ErrorResponse,
+            429: ErrorResponse,
+            499: ErrorResponse,
+            503: ErrorResponse,
         },
     )
     def post(self, request, *args, **kwargs):
-        file = request.FILES.get("file")
-        if not file:
-            return Response(
-                {"status_code": 400, "message": "파일이 제공되지 않았습니다."}, status=status.HTTP_400_BAD_REQUEST
-            )
+        profile, error_response = _load_profile(request)
+        if error_response:
+            return error_response
+        if not profile or not ParseService:
+            return self._parse(request)
 
-        if file.content_type not in SUPPORTED_MIME_TYPES:
+        try:
+            self._profiler = RequestProfiler(
+                get_artifact_store(), interval=settings.QOCR_PROFILE_SAMPLE_INTERVAL_MS / 1000
+            ).start()
+        except ProfilerBusy:
             return Response(
-                {
-                    "status_code": 400,
-                    "message": "지원되지 않는 파일 형식입니다. PDF, 이미지, 오피스 문서(.pdf, .jpg, .jpeg, .png, .ppt, .pptx, .doc, .docx, .xls, .xlsx)를 업로드해주세요.",
-                },
-                status=status.HTTP_400_BAD_REQUEST,
+                {"status_code": 409, "message": "다른 요청을 프로파일링하고 있습니다. 잠시 후 다시 시도해 주세요."},
+                status=status.HTTP_409_CONFLICT,
             )
+        try:
+            with stage_timer() as timer:
+                response = self._parse(request)
+        except BaseException:
+            self._profiler.stop()
+            raise
+        self._profiler.stages.update(timer.stages)
+        response.data.update(_profile_handle(self._profiler.profile_id))
+        return response
 
-        filename = file.name
-        if not filename:
-            filename = f"{uuid().hex}{Path(file.name).suffix if file.name else ''}"
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._profiler is not None:
+            # Rendering the JSON body, base64 archive included, is part of the profiled request
+            started = time.perf_counter()
+            try:
+                response.render()
+            finally:
+                self._profiler.stages["render"] = time.perf_counter() - started
+                self._profiler.stop()
+        return response
 
-        # Replace all empty spaces from the filename to underscore
-        filename = re.sub(r"\s", "_", filename)
-        logger.debug(f"Uploaded file: {filename}")
-
-        file_bytes = file.read()
-        suffix = Path(filename).suffix
-
-        # Get invoke_config from request
-        invoke_config_str = request.data.get(
-            "invoke_config",
-            json.dumps(
-                {
-                    "layout": {"type": "layout", "name": "RTDETR", "version": "1.0.0"},
-                    "ocr_cls": {"type": "ocr", "sub_type": "cls", "name": "unused_model", "version": "0.1.0"},
-                    "ocr_det": {
-                        "type": "ocr",
-                        "sub_type": "det",
-                        "name": "PP-OCRv4_det_server_finetune_v2(ko)",
-                        "version": "2.0.0",
-                    },
-                    "ocr_rec": {
-                        "type": "ocr",
-                        "sub_type": "rec",
-                        "name": "PP-OCRv4_rec_doc_finetune_v3(ko)",
-                        "version": "3.0.0",
-                    },
-                }
-            ),
-        )
+    def _parse(self, request):
+        file = request.FILES.get("file")
+        if error_response := _validate_upload(file):
+            return error_response
 
-        apply_fig = request.data.get("apply_fig", "true").lower() == "true"
-        apply_table = request.data.get("apply_table", "true").lower() == "true"
+        filename = _normalize_filename(file)
+        logger.debug(f"Uploaded file: {filename}")
 
-        # Parse JSON string to dict
-        try:
-            invoke_config_dict = json.loads(invoke_config_str)
-            # Validate with serializer
-            serializer = ParseDocumentRequest(data=invoke_config_dict)
-            if not serializer.is_valid():
-                return Response(
-                    {"status_code": 400, "message": f"잘못된 설정 형식입니다: {serializer.errors}"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            invoke_config_validated = serializer.validated_data
-        except (json.JSONDecodeError, ValueError) as e:
-            return Response(
-                {"status_code": 400, "message": f"잘못된 JSON 형식입니다: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        _, invoke_config, error_response = _load_invoke_config(request)
+        if error_response:
+            return error_response
+        image_mode, error_response = _load_image_mode(request)
+        if error_response:
+            return error_response
+        archive_mode, error_response = _load_archive_mode(request)
+        if error_response:
+            return error_response
+        start_page, max_pages, error_response = _load_page_range(request)
+        if error_response:
+            return error_response
+        parse_options = _load_parse_options(request)
+        deadline, error_response = _load_deadline(request)
+        if error_response:
+            return error_response
+        # The deadline counts from the arrival of the request, like the timeout of a proxy in front of it
+        deadline_at = time.time() + deadline if deadline else None
 
         # Check if ParseService is available
         if not ParseService:
@@ -235,45 +646,464 @@ class ParseDocumentView(APIView):
             response_serializer.is_valid(raise_exception=True)
             return Response(response_serializer.data)
 
-        # Create new temp file for each request
-        with NamedTemporaryFile(suffix=suffix, mode="wb+", delete=False) as temp_file:
-            temp_file.write(file_bytes)
-            temp_file.seek(0)  # Reset file pointer
-
-            # Initialize ParseService
-            parse_service = ParseService()
-
-            # Parse document using the new temp file
-            # Ensure invoke_config_validated is a dict for type safety
-            config = invoke_config_validated if isinstance(invoke_config_validated, dict) else {}
-            output = parse_service.process_document(
-                pdf_path=temp_file.name,
-                max_pages=0,
-                invoke_config={
-                    "layout": convert_to_mineru_config(config.get("layout", {})),
-                    "ocrcls": convert_to_mineru_config(config.get("ocr_cls", {})),
-                    "ocrdet": convert_to_mineru_config(config.get("ocr_det", {})),
-                    "ocrrec": convert_to_mineru_config(config.get("ocr_rec", {})),
-                },
+        # Hand the upload to the parser without copying it: large uploads are already spooled to disk by
+        # Django and are parsed in place, small ones stay in memory
+        file_path, file_bytes = _upload_source(file, filename)
+
+        stream_format = request.data.get("stream")
+        if stream_format and stream_format not in STREAM_CONTENT_TYPES:
+            return _bad_request(f"지원되지 않는 스트리밍 형식입니다: {stream_format}")
+        interactive = _is_interactive(file, count_pages(file_path, file_bytes), start_page, max_pages, stream_format)
+        priority, error_response = _load_priority(request, "high" if interactive else "default")
+        if error_response:
+            return error_response
+
+        ticket, error_response = _admit(request, priority)
+        if error_response:
+            return error_response
+
+        if stream_format:
+            records = stream_parse_document(
+                file_path,
+                filename,
+                invoke_config,
+                max_pages=max_pages,
+                file_bytes=file_bytes,
+                image_mode=image_mode,
+                archive_mode=archive_mode,
+                start_page=start_page,
+                table_enable=parse_options["table_enable"],
+                figure_enable=parse_options["figure_enable"],
+                # A disconnect is noticed by the server when it fails to send the next page and closes the stream
+                cancel_token=CancellationToken(deadline_at) if deadline_at else None,
             )
+            # The slot is held while pages are produced
+            response = StreamingHttpResponse(
+                _AdmittedStream(records, stream_format, ticket), content_type=STREAM_CONTENT_TYPES[stream_format]
+            )
+            # Deliver each page immediately instead of letting a proxy buffer the stream
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"
+            return response
+
+        with ticket or nullcontext(), _cancellation(request, deadline_at) as cancel_token, stage_timer() as timer:
+            try:
+                response_data = parse_document(
+                    file_path,
+                    filename,
+                    invoke_config,
+                    max_pages=max_pages,
+                    file_bytes=file_bytes,
+                    image_mode=image_mode,
+                    archive_mode=archive_mode,
+                    start_page=start_page,
+                    **parse_options,
+                    cancel_token=cancel_token,
+                )
+            except PageRangeError as e:
+                return _bad_request(f"잘못된 페이지 범위입니다: {e}")
+            except ParseCancelled:
+                # Nobody reads this answer, the status marks the request in the access log like nginx does
+                return Response({"status_code": 499, "message": "클라이언트 연결이 끊어졌습니다."}, status=499)
+            except CoordinatorError as e:
+                return _node_unavailable(e)
+
+            with timed("serialize"):
+                response = Response(_serialize_result(response_data))
+        response["Server-Timing"] = timer.server_timing()
+        return response
+
+
+class ParseDocumentBatchView(APIView):
+    """여러 문서 일괄 OCR 및 마크다운 변환"""
+
+    parser_classes = (MultiPartParser, FormParser)
+    permission_classes = (IsAuthenticated,)
 
-        # Zip archive with markdown & images
-        encoded_compressed_file = compress_markdown_images(
-            file_name=filename,
-            markdown=output.markdown,
-            content_list=output.content_list,
-            images_base_path=output.images_path,
+    @swagger_auto_schema(
+        tags=["QOCR ML"],
+        operation_summary="여러 문서 일괄 OCR 및 마크다운 변환",
+        operation_description=(
+            "여러 문서를 한 번의 파싱 호출로 처리하여 모델 추론 비용을 문서 간에 분산합니다. "
+            "결과는 업로드 순서대로 파일별로 반환됩니다."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                name="files",
+                in_=openapi.IN_FORM,
+                type=openapi.TYPE_FILE,
+                description="PDF, 이미지 또는 오피스 문서 리스트",
+                required=True,
+            ),
+            *PARSE_DOCUMENT_PARAMETERS[1:],
+        ],
+        responses={
+            200: openapi.Response(
+                description="Per-file parse results",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "file_name": openapi.Schema(type=openapi.TYPE_STRING),
+                            "markdown": openapi.Schema(type=openapi.TYPE_STRING),
+                            "file_data": openapi.Schema(type=openapi.TYPE_STRING),
+                            "archive_id": openapi.Schema(type=openapi.TYPE_STRING),
+                            "archive_url": openapi.Schema(type=openapi.TYPE_STRING),
+                            "model_info": openapi.Schema(type=openapi.TYPE_OBJECT),
+                        },
+                    ),
+                ),
+            ),
+            400: ErrorResponse,
+            403: ErrorResponse,
+            429: ErrorResponse,
+            503: ErrorResponse,
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        files = request.FILES.getlist("files")
+        if not files:
+            return _bad_request("파일이 제공되지 않았습니다.")
+        for file in files:
+            if error_response := _validate_upload(file):
+                return error_response
+
+        _, invoke_config, error_response = _load_invoke_config(request)
+        if error_response:
+            return error_response
+        image_mode, error_response = _load_image_mode(request)
+        if error_response:
+            return error_response
+        archive_mode, error_response = _load_archive_mode(request)
+        if error_response:
+            return error_response
+        start_page, max_pages, error_response = _load_page_range(request)
+        if error_response:
+            return error_response
+        parse_options = _load_parse_options(request)
+
+        # Batches are bulk work unless they ask otherwise
+        priority, error_response = _load_priority(request, "low")
+        if error_response:
+            return error_response
+
+        if not ParseService:
+            return Response(
+                {"status_code": 503, "message": "ParseService is not available."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        ticket, error_response = _admit(request, priority)
+        if error_response:
+            return error_response
+
+        filenames = [_normalize_filename(file) for file in files]
+        file_paths = []
+        with ticket or nullcontext(), stage_timer() as timer:
+            with get_artifact_store().workspace(keep=False) as upload_dir:
+                with timed("upload"):
+                    for i, (file, filename) in enumerate(zip(files, filenames)):
+                        # Spooled uploads are parsed in place, only small in-memory ones need a file for the batch
+                        if hasattr(file, "temporary_file_path"):
+                            file_paths.append(file.temporary_file_path())
+                            continue
+                        file_path = upload_dir / f"{i}_{filename}"
+                        _store_upload(file, file_path)
+                        file_paths.append(str(file_path))
+
+                try:
+                    results = parse_documents(
+                        file_paths,
+                        filenames,
+                        invoke_config,
+                        max_pages=max_pages,
+                        image_mode=image_mode,
+                        archive_mode=archive_mode,
+                        start_page=start_page,
+                        **parse_options,
+                    )
+                except PageRangeError as e:
+                    return _bad_request(f"잘못된 페이지 범위입니다: {e}")
+                except CoordinatorError as e:
+                    return _node_unavailable(e)
+
+            with timed("serialize"):
+                response_data = [
+                    {"file_name": filename, **_serialize_result(result)}
+                    for filename, result in zip(filenames, results)
+                ]
+                response = Response(response_data)
+        response["Server-Timing"] = timer.server_timing()
+        return response
+
+
+class ParseDocumentJobView(APIView):
+    """문서 OCR 비동기 작업 등록"""
+
+    parser_classes = (MultiPartParser, FormParser)
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(
+        tags=["QOCR ML"],
+        operation_summary="문서 OCR 비동기 작업 등록",
+        operation_description=(
+            "문서를 업로드하고 즉시 작업 ID를 반환합니다. "
+            "처리 결과는 `/api/qocr/parse-document/jobs/{job_id}/` 에서 조회합니다. "
+            "작업 결과는 `archive` 와 관계없이 항상 `archive_id` 와 다운로드 링크로 압축 파일을 전달합니다."
+        ),
+        manual_parameters=PARSE_DOCUMENT_PARAMETERS,
+        responses={
+            202: openapi.Response(
+                description="Job accepted",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "job_id": openapi.Schema(type=openapi.TYPE_STRING),
+                        "status": openapi.Schema(type=openapi.TYPE_STRING),
+                    },
+                ),
+            ),
+            400: ErrorResponse,
+            403: ErrorResponse,
+            503: ErrorResponse,
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        file = request.FILES.get("file")
+        if error_response := _validate_upload(file):
+            return error_response
+
+        filename = _normalize_filename(file)
+        config, _, error_response = _load_invoke_config(request)
+        if error_response:
+            return error_response
+        image_mode, error_response = _load_image_mode(request)
+        if error_response:
+            return error_response
+        start_page, max_pages, error_response = _load_page_range(request)
+        if error_response:
+            return error_response
+        parse_options = _load_parse_options(request)
+
+        if not ParseService:
+            return Response(
+                {"status_code": 503, "message": "ParseService is not available."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        # The priority class names the RQ queue of the job, `PriorityWorker` serves the queues by weight
+        file_path, file_bytes = _upload_source(file, filename)
+        interactive = _is_interactive(file, count_pages(file_path, file_bytes), start_page, max_pages)
+        priority, error_response = _load_priority(request, "high" if interactive else settings.QOCR_JOB_QUEUE)
+        if error_response:
+            return error_response
+
+        # The upload must outlive the request, it is removed by the job when parsing finishes
+        upload_dir = Path(settings.QOCR_UPLOAD_DIR)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        upload_path = upload_dir / f"{uuid().hex}{Path(filename).suffix}"
+        _store_upload(file, upload_path)
+
+        try:
+            queue = django_rq.get_queue(priority)
+            job = queue.enqueue(
+                parse_document_job,
+                str(upload_path),
+                filename,
+                config,
+                max_pages=max_pages,
+                image_mode=image_mode,
+                start_page=start_page,
+                **parse_options,
+                job_timeout=settings.QOCR_JOB_TIMEOUT,
+                result_ttl=settings.QOCR_JOB_RESULT_TTL,
+                failure_ttl=settings.QOCR_JOB_RESULT_TTL,
+                meta={"user_id": request.user.id, "file_name": filename, "priority": priority},
+            )
+        except Exception as e:
+            logger.exception(f"Failed to enqueue parse job for {filename}: {e}")
+            upload_path.unlink(missing_ok=True)
+            return Response(
+                {"status_code": 503, "message": "작업 큐에 연결할 수 없습니다."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        return Response({"job_id": job.id, "status": job.get_status()}, status=status.HTTP_202_ACCEPTED)
+
+
+class ParseDocumentJobDetailView(APIView):
+    """문서 OCR 비동기 작업 상태 및 결과 조회"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(
+        tags=["QOCR ML"],
+        operation_summary="문서 OCR 비동기 작업 상태 및 결과 조회",
+        operation_description="작업 상태를 반환하며, 완료된 작업은 `result` 에 파싱 결과를 포함합니다.",
+        responses={
+            200: openapi.Response(
+                description="Job status",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "job_id": openapi.Schema(type=openapi.TYPE_STRING),
+                        "status": openapi.Schema(type=openapi.TYPE_STRING),
+                        "file_name": openapi.Schema(type=openapi.TYPE_STRING),
+                        "enqueued_at": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                        "started_at": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                        "ended_at": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                        "result": openapi.Schema(type=openapi.TYPE_OBJECT),
+                        "error": openapi.Schema(type=openapi.TYPE_STRING),
+                    },
+                ),
+            ),
+            404: ErrorResponse,
+        },
+    )
+    def get(self, request, job_id, *args, **kwargs):
+        queue = django_rq.get_queue(settings.QOCR_JOB_QUEUE)
+        try:
+            job = Job.fetch(job_id, connection=queue.connection)
+        except NoSuchJobError:
+            job = None
+
+        # Jobs of other users are reported as missing
+        if job is None or job.meta.get("user_id") != request.user.id:
+            return Response(
+                {"status_code": 404, "message": "작업을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        job_status = job.get_status()
+        response_data = {
+            "job_id": job.id,
+            "status": job_status,
+            "file_name": job.meta.get("file_name"),
+            "enqueued_at": job.enqueued_at,
+            "started_at": job.started_at,
+            "ended_at": job.ended_at,
+        }
+        if job_status == "finished":
+            response_data["result"] = job.return_value()
+        elif job_status == "failed":
+            # Only the last traceback line, e.g. "RuntimeError: ..."
+            exc_lines = (job.exc_info or "").strip().splitlines()
+            response_data["error"] = exc_lines[-1] if exc_lines else None
+        return Response(response_data)
+
+
+class ImageView(APIView):
+    """파싱 결과 이미지 조회"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(
+        tags=["QOCR ML"],
+        operation_summary="파싱 결과 이미지 조회",
+        operation_description=(
+            "`image_mode=reference` 로 파싱한 마크다운이 참조하는 이미지를 반환합니다. "
+            "이름이 콘텐츠 해시이므로 응답은 영구 캐시 가능하며, Range 요청을 지원합니다."
+        ),
+        responses={200: openapi.Response(description="Image"), 304: "Not Modified", 404: "Not Found"},
+    )
+    def get(self, request, name, *args, **kwargs):
+        if not ParseService:
+            return HttpResponseNotFound()
+        image_path = get_image_store().get(name)
+        if image_path is None:
+            return HttpResponseNotFound()
+
+        # The name is the sha256 of the content, so it is a strong validator that never changes
+        etag = f'"{Path(name).stem}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            response = RangedFileResponse(request, open(image_path, mode="rb"), content_type)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, max-age=31536000, immutable"
+        return response
+
+
+class ArchiveView(APIView):
+    """파싱 결과 압축 파일 다운로드"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(
+        tags=["QOCR ML"],
+        operation_summary="파싱 결과 압축 파일 다운로드",
+        operation_description=(
+            "`archive=download` 로 파싱한 결과의 마크다운, 콘텐츠 리스트, 이미지를 zip 으로 스트리밍합니다. "
+            "PNG/JPEG 이미지는 재압축하지 않고 저장되며, 링크는 작업 공간이 만료될 때까지 유효합니다."
+        ),
+        responses={200: openapi.Response(description="Zip archive"), 404: "Not Found"},
+    )
+    def get(self, request, archive_id, *args, **kwargs):
+        if not ParseService:
+            return HttpResponseNotFound()
+        manifest = load_archive(get_artifact_store(), archive_id)
+        if manifest is None:
+            return HttpResponseNotFound()
+
+        response = StreamingHttpResponse(
+            iter_zip_archive(
+                manifest["file_name"],
+                manifest["markdown"],
+                manifest["content_list"],
+                manifest["images_path"],
+                manifest.get("model_pdf"),
+            ),
+            content_type="application/zip",
         )
+        response["Content-Disposition"] = content_disposition_header(True, f"{Path(manifest['file_name']).stem}.zip")
+        response["Cache-Control"] = "private, no-store"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class ProfileView(APIView):
+    """요청 프로파일 다운로드"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(
+        tags=["QOCR ML"],
+        operation_summary="요청 프로파일 다운로드",
+        operation_description=(
+            "`profile=true` 로 파싱한 요청의 프로파일을 내려받습니다. 기본은 가장 오래 걸린 함수, 메모리 최대 사용량과 "
+            "할당 위치, 단계별 시간을 담은 JSON 이며, `format=collapsed` 는 flamegraph.pl 이나 speedscope 에서 열 수 "
+            "있는 접힌 스택입니다. 관리자만 사용할 수 있고, 작업 공간이 만료될 때까지 유효합니다."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                name="format",
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                enum=["json", "collapsed"],
+                default="json",
+            )
+        ],
+        responses={200: openapi.Response(description="Profile"), 403: "Forbidden", 404: "Not Found"},
+    )
+    def get(self, request, profile_id, *args, **kwargs):
+        if not request.user.is_superuser:
+            return HttpResponseForbidden()
+        if not ParseService:
+            return HttpResponseNotFound()
+        collapsed = request.query_params.get("format") == "collapsed"
+        profile_path = load_profile(get_artifact_store(), profile_id, COLLAPSED_FILE if collapsed else PROFILE_FILE)
+        if profile_path is None:
+            return HttpResponseNotFound()
 
-        response_serializer = ParseDocumentResponse(
-            data={
-                "markdown": output.markdown,
-                "file_data": encoded_compressed_file,
-                "model_info": {"name": "Q-OCR", "version": "2025-04-21"},
-            }
+        response = FileResponse(
+            open(profile_path, mode="rb"),
+            as_attachment=True,
+            filename=f"qocr-profile-{profile_id}.{'collapsed.txt' if collapsed else 'json'}",
+            content_type="text/plain; charset=utf-8" if collapsed else "application/json",
         )
-        response_serializer.is_valid(raise_exception=True)
-        return Response(response_serializer.data)
+        response["Cache-Control"] = "private, no-store"
+        return response
 
 
 class LayoutView(APIView):
@@ -282,11 +1112,16 @@ class LayoutView(APIView):
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = (IsAuthenticated,)
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Spool every image to disk while the multipart body is read, before authentication touches
+        # request.POST, so hundreds of page images never sit in memory at once
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
     @swagger_auto_schema(
         tags=["QOCR ML"],
         operation_summary="이미지 레이아웃 정보 추출",
         operation_description=LAYOUT_DESCRIPTION_DETAIL,
-        deprecated=True,
         manual_parameters=[
             openapi.Parameter(
                 name="files",
@@ -295,53 +1130,40 @@ class LayoutView(APIView):
                 description="이미지 파일 리스트",
                 required=True,
             ),
+            PARSE_DOCUMENT_PARAMETERS[1],
         ],
         responses={
             200: LayoutResponse(many=True),
             400: ErrorResponse,
-            501: openapi.Response(description="Not Implemented"),
+            503: ErrorResponse,
         },
     )
     def post(self, request, *args, **kwargs):
-        # This endpoint is deprecated and not implemented
-        # Keeping the commented implementation for reference
-
-        # files = request.FILES.getlist('files')
-        # if not files:
-        #     return Response(
-        #         {"status_code": 400, "message": "파일이 주어지지 않았습니다. 파일을 추가하고 다시 시도해주세요."},
-        #         status=status.HTTP_400_BAD_REQUEST
-        #     )
-
-        # if files[0].content_type not in ["image/jpeg", "image/png"]:
-        #     return Response(
-        #         {"status_code": 400, "message": "지원되지 않는 파일 형식입니다. 이미지 파일(.jpg, .jpeg, .png)을 업로드해주세요."},
-        #         status=status.HTTP_400_BAD_REQUEST
-        #     )
-
-        # file_bytes = [f.read() for f in files]
-
-        # # Initialize LayoutService if available
-        # from shared.service import LayoutService
-        # layout_service = LayoutService()
-        #
-        # layout_results = layout_service.layout(images=file_bytes)
-        #
-        # response_data = []
-        # for f, layout_result_group in zip(files, layout_results):
-        #     response_data.append({
-        #         "file_name": f.name or "Unknown Filename",
-        #         "results": [
-        #             layout_result_item.model_dump()
-        #             for layout_result_item in layout_result_group.root or []
-        #         ],
-        #     })
-        #
-        # return Response(response_data)
-
-        return Response(
-            {"detail": "This endpoint is deprecated and not implemented"}, status=status.HTTP_501_NOT_IMPLEMENTED
-        )
+        files = request.FILES.getlist("files")
+        if not files:
+            return _bad_request("파일이 주어지지 않았습니다. 파일을 추가하고 다시 시도해주세요.")
+
+        if any(f.content_type not in IMAGE_MIME_TYPES for f in files):
+            return _bad_request("지원되지 않는 파일 형식입니다. 이미지 파일(.jpg, .jpeg, .png)을 업로드해주세요.")
+
+        _, invoke_config, error_response = _load_invoke_config(request)
+        if error_response:
+            return error_response
+
+        if not ParseService:
+            return Response(
+                {"status_code": 503, "message": "Layout service is not available."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        # Images are read from their spooled files chunk by chunk and inferred in batches
+        layout_service = get_layout_service(invoke_config)
+        layout_results = layout_service.layout(f.temporary_file_path() for f in files)
+
+        response_data = []
+        for f, blocks in zip(files, layout_results):
+            response_data.append({"file_name": f.name or "Unknown Filename", "results": blocks})
+        return Response(response_data)
 
 
 class OCRView(APIView):
@@ -354,7 +1176,6 @@ class OCRView(APIView):
         tags=["QOCR ML"],
         operation_summary="이미지 OCR 텍스트 추출",
         operation_description=OCR_DESCRIPTION_DETAIL,
-        deprecated=True,
         manual_parameters=[
             openapi.Parameter(
                 name="files",
@@ -367,52 +1188,54 @@ class OCRView(APIView):
         responses={
             200: ImageOCRResponse(many=True),
             400: ErrorResponse,
-            501: openapi.Response(description="Not Implemented"),
+            503: ErrorResponse,
         },
     )
     def post(self, request, *args, **kwargs):
-        # This endpoint is deprecated and not implemented
-        # Keeping the commented implementation for reference
-
-        # files = request.FILES.getlist('files')
-        # if not files:
-        #     return Response(
-        #         {"status_code": 400, "message": "파일이 주어지지 않았습니다. 파일을 추가하고 다시 시도해주세요."},
-        #         status=status.HTTP_400_BAD_REQUEST
-        #     )
-
-        # if files[0].content_type not in ["image/jpeg", "image/png"]:
-        #     return Response(
-        #         {"status_code": 400, "message": "지원되지 않는 파일 형식입니다. 이미지 파일(.jpg, .jpeg, .png)을 업로드해주세요."},
-        #         status=status.HTTP_400_BAD_REQUEST
-        #     )
-
-        # file_bytes = [f.read() for f in files]
-
-        # # Initialize OCRService if available
-        # from shared.service import OCRService
-        # ocr_service = OCRService()
-        #
-        # ocr_results = ocr_service.ocr(
-        #     images=file_bytes,
-        #     ocr_det_model=OCR_DET_MODEL_NAMES.PPOCRv4_SERVER_FTv2,
-        #     ocr_rec_model=OCR_REC_MODEL_NAMES.PPOCRv4_SERVER_FTv3,
-        # )
-        #
-        # response_data = []
-        # for f, ocr_result_group in zip(files, ocr_results):
-        #     response_data.append({
-        #         "file_name": f.name or "Unknown Filename",
-        #         "results": [
-        #             ocr_result_item.text for ocr_result_item in ocr_result_group.root or []
-        #         ],
-        #     })
-        #
-        # return Response(response_data)
-
-        return Response(
-            {"detail": "This endpoint is deprecated and not implemented"}, status=status.HTTP_501_NOT_IMPLEMENTED
-        )
+        files = request.FILES.getlist("files")
+        if not files:
+            return _bad_request("파일이 주어지지 않았습니다. 파일을 추가하고 다시 시도해주세요.")
+
+        if any(f.content_type not in IMAGE_MIME_TYPES for f in files):
+            return _bad_request("지원되지 않는 파일 형식입니다. 이미지 파일(.jpg, .jpeg, .png)을 업로드해주세요.")
+
+        if not ParseService:
+            return Response(
+                {"status_code": 503, "message": "OCR engine is not available."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        # Images are queued on the shared engine as soon as they are decoded, so they are batched
+        # with each other and with the images of concurrent requests
+        ocr_engine = get_ocr_engine()
+        futures = []
+        for f in files:
+            try:
+                futures.append(ocr_engine.submit(decode_image(f.read())))
+            except ValueError:
+                for future in futures:
+                    future.cancel()
+                return _bad_request(f"이미지를 읽을 수 없습니다: {f.name}")
+
+        response_data = []
+        try:
+            for f, future in zip(files, futures):
+                lines = future.result(timeout=settings.QOCR_OCR_TIMEOUT)
+                response_data.append(
+                    {
+                        "file_name": f.name or "Unknown Filename",
+                        "results": [line.text for line in lines],
+                    }
+                )
+        except TimeoutError:
+            for future in futures:
+                future.cancel()
+            return Response(
+                {"status_code": 503, "message": "OCR 처리 시간이 초과되었습니다."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        return Response(response_data)
 
 
 class TableView(APIView):
@@ -425,7 +1248,6 @@ class TableView(APIView):
         tags=["QOCR ML"],
         operation_summary="이미지 테이블 구조 및 텍스트 추출",
         operation_description=TABLE_DESCRIPTION_DETAIL,
-        deprecated=True,
         manual_parameters=[
             openapi.Parameter(
                 name="files",
@@ -441,44 +1263,32 @@ class TableView(APIView):
                 schema=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING)),
             ),
             400: ErrorResponse,
-            501: openapi.Response(description="Not Implemented"),
+            503: ErrorResponse,
         },
     )
     def post(self, request, *args, **kwargs):
-        # This endpoint is deprecated and not implemented
-        # Keeping the commented implementation for reference
-
-        # files = request.FILES.getlist('files')
-        # if not files:
-        #     return Response(
-        #         {"status_code": 400, "message": "파일이 주어지지 않았습니다. 파일을 추가하고 다시 시도해주세요."},
-        #         status=status.HTTP_400_BAD_REQUEST
-        #     )
-
-        # if files[0].content_type not in ["image/jpeg", "image/png"]:
-        #     return Response(
-        #         {"status_code": 400, "message": "지원되지 않는 파일 형식입니다. 이미지 파일(.jpg, .jpeg, .png)을 업로드해주세요."},
-        #         status=status.HTTP_400_BAD_REQUEST
-        #     )
-
-        # file_bytes = [f.read() for f in files]
-
-        # # Initialize TableService and OCRService if available
-        # from shared.service import TableService, OCRService
-        # table_service = TableService()
-        # ocr_service = OCRService()
-        #
-        # outputs = []
-        # for file_bytes in file_bytes:
-        #     result = table_service.table(
-        #         image_bytes=file_bytes,
-        #         ocr_engine=ocr_service.get_model(),
-        #         sub_model_name=TABLE_SUBMODULE_NAMES.SLANET_PLUS_250512,
-        #     )
-        #     outputs.append(result)
-        #
-        # return Response(outputs)
-
-        return Response(
-            {"detail": "This endpoint is deprecated and not implemented"}, status=status.HTTP_501_NOT_IMPLEMENTED
-        )
+        files = request.FILES.getlist("files")
+        if not files:
+            return _bad_request("파일이 주어지지 않았습니다. 파일을 추가하고 다시 시도해주세요.")
+
+        if any(f.content_type not in IMAGE_MIME_TYPES for f in files):
+            return _bad_request("지원되지 않는 파일 형식입니다. 이미지 파일(.jpg, .jpeg, .png)을 업로드해주세요.")
+
+        if not ParseService:
+            return Response(
+                {"status_code": 503, "message": "Table service is not available."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        # Tables are recognized concurrently, their cell OCR is batched on the shared OCR engine
+        table_service = get_table_service()
+        futures = [table_service.table(f.read()) for f in files]
+        try:
+            outputs = [future.result() for future in futures]
+        except OSError as e:
+            # PIL raises OSError subclasses for unreadable images
+            for future in futures:
+                future.cancel()
+            return _bad_request(f"이미지를 읽을 수 없습니다: {e}")
+
+        return Response(outputs)